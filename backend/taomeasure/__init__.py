@@ -51,8 +51,18 @@ def _register_services(app: Flask) -> None:
     """初始化业务服务并存入扩展字典。"""
 
     services: Dict[str, Any] = {
-        "gps_converter": GPSAltitudeConverter(),
-        "coordinate_universal": UniversalCoordinateService(),
+        "gps_converter": GPSAltitudeConverter(
+            registry_size=app.config.get("GPS_MODEL_REGISTRY_SIZE", 64),
+            grid_dir=app.config.get("GPS_GRID_DIR") or None,
+            tile_workers=app.config.get("COORDINATE_SHARD_WORKERS") or None,
+            tile_threshold=app.config.get("GPS_TILE_THRESHOLD", 200_000),
+            geoid_dir=app.config.get("GPS_GEOID_DIR") or None,
+        ),
+        "coordinate_universal": UniversalCoordinateService(
+            system_cache_size=app.config.get("COORDINATE_SYSTEM_CACHE_SIZE", 128),
+            shard_workers=app.config.get("COORDINATE_SHARD_WORKERS") or None,
+            shard_threshold=app.config.get("COORDINATE_SHARD_THRESHOLD", 500_000),
+        ),
         "curve_designer": CurveDesign(),
         "file_handler": FileHandler(),
     }
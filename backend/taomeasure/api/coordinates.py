@@ -4,12 +4,21 @@ from __future__ import annotations
 
 import logging
 import math
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from flask import current_app, jsonify, request
 
 from . import api_bp
-from taomeasure.domain.universal_coordinate import PointRecord, UniversalCoordinateService, parse_float
+from taomeasure.domain.plane_transform import PlaneTransformation
+from taomeasure.domain.covariance import covariance_payload, stack_covariances
+from taomeasure.domain.universal_coordinate import (
+    CARTESIAN_AXES,
+    PointRecord,
+    UniversalCoordinateService,
+    columns_from_records,
+    parse_float,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +39,94 @@ def coordinate_metadata():
     return jsonify({"success": True, "data": service.get_reference_data()})
 
 
+@api_bp.route("/coordinate/universal/systems", methods=["POST"])
+def coordinate_register_system():
+    """Parse a coordinate system once and return its id for later requests."""
+
+    payload = request.get_json(silent=True) or {}
+    service = _get_service()
+    try:
+        system = service.build_system(payload.get("system") or payload, "source")
+        return jsonify({"success": True, "data": system.to_dict()})
+    except ValueError as exc:
+        logger.warning("Coordinate system registration failed: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+
+
+@api_bp.route("/coordinate/universal/pair-points", methods=["POST"])
+def coordinate_pair_points():
+    """Build ``common_points`` from two unpaired control lists (name, then proximity)."""
+
+    payload = request.get_json(silent=True) or {}
+    raw_source = payload.get("source_points") or []
+    raw_target = payload.get("target_points") or []
+
+    if not raw_source or not raw_target:
+        return jsonify({"success": False, "error": "Both source_points and target_points are required"}), 400
+
+    service = _get_service()
+    try:
+        source_points = [service.build_point(raw) for raw in raw_source]
+        target_points = [service.build_point(raw) for raw in raw_target]
+        if payload.get("auto_fill", True):
+            for points, key in ((source_points, "source_system"), (target_points, "target_system")):
+                if payload.get(key) is not None:
+                    system = service.build_system(payload.get(key), key.split("_")[0])
+                    points[:] = [service.fill_point_components(point, system) for point in points]
+        data = service.pair_common_points(
+            source_points,
+            target_points,
+            tolerance=parse_float(payload.get("tolerance")) or 1.0,
+            space=str(payload.get("space") or "auto").lower(),
+            match_by_name=bool(payload.get("match_by_name", True)),
+        )
+        return jsonify({"success": True, "data": data})
+    except ValueError as exc:
+        logger.warning("Common point pairing failed: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Common point pairing raised unexpected error: %s", exc)
+        return jsonify({"success": False, "error": f"Point pairing failed: {exc}"}), 500
+
+
+@api_bp.route("/coordinate/universal/projection-optimise", methods=["POST"])
+def coordinate_projection_optimise():
+    """Search central meridian and projection height that keep length distortion minimal."""
+
+    payload = request.get_json(silent=True) or {}
+    raw_points = payload.get("points") or []
+
+    if not raw_points and not payload.get("bounds"):
+        return jsonify({"success": False, "error": "Either points or bounds must be provided"}), 400
+
+    service = _get_service()
+    try:
+
+        def value_range(key: str) -> Tuple[float, float] | None:
+            raw = payload.get(key)
+            return (float(raw[0]), float(raw[1])) if raw else None
+
+        data = service.optimise_local_projection(
+            [service.build_point(raw) for raw in raw_points],
+            payload.get("system"),
+            bounds=payload.get("bounds"),
+            mean_elevation=parse_float(payload.get("mean_elevation")),
+            meridian_range=value_range("meridian_range"),
+            meridian_step=parse_float(payload.get("meridian_step")) or 1 / 60,
+            height_range=value_range("height_range"),
+            height_step=parse_float(payload.get("height_step")) or 10.0,
+            tolerance_ppm=parse_float(payload.get("tolerance_ppm")) or 25.0,
+            grid_size=int(parse_float(payload.get("grid_size")) or 25),
+        )
+        return jsonify({"success": True, "data": data})
+    except (ValueError, KeyError, TypeError) as exc:
+        logger.warning("Projection optimisation failed: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Projection optimisation raised unexpected error: %s", exc)
+        return jsonify({"success": False, "error": f"Projection optimisation failed: {exc}"}), 500
+
+
 @api_bp.route("/coordinate/universal/process", methods=["POST"])
 def coordinate_process():
     """Main entry: fill datasets, estimate parameters, and execute conversions."""
@@ -44,9 +141,18 @@ def coordinate_process():
         logger.exception("坐标系统参数解析失败: %s", exc)
         return jsonify({"success": False, "error": f"坐标系统参数解析失败: {exc}"}), 400
 
+    try:
+        columnar, decimals, include_dms = _output_options(payload)
+    except ValueError as exc:
+        return jsonify({"success": False, "error": str(exc)}), 400
+
     options = payload.get("options") or {}
     auto_fill = options.get("auto_fill", True)
     auto_parameters = options.get("auto_parameters", True)
+    projection_factors = bool(options.get("projection_factors", False))
+    target_epoch = parse_float(options.get("target_epoch"))
+    # Columnar output drops per-point diagnostics/meta unless explicitly requested.
+    omitted = () if options.get("include_diagnostics", not columnar) else ("diagnostics", "meta")
 
     raw_common: List[Dict[str, Any]] = payload.get("common_points") or []
     common_pairs: List[Tuple[PointRecord, PointRecord]] = []
@@ -62,7 +168,11 @@ def coordinate_process():
             src_point = service.fill_point_components(src_point, source_system)
             tgt_point = service.fill_point_components(tgt_point, target_system)
         enriched_common.append(
-            {"name": name, "source": src_point.to_payload(), "target": tgt_point.to_payload()}
+            {
+                "name": name,
+                "source": src_point.to_payload(include_dms),
+                "target": tgt_point.to_payload(include_dms),
+            }
         )
         common_pairs.append((src_point, tgt_point))
 
@@ -109,45 +219,156 @@ def coordinate_process():
         four_solution = _parse_manual_four_parameters(four_input)
         four_source = "manual"
 
+    plane_input = provided_params.get("plane") or {}
+    plane_solution: Dict[str, Any] = {}
+    plane_source = "none"
+    if plane_input and plane_input.get("enabled", True):
+        try:
+            if plane_input.get("mode") == "manual":
+                plane_solution = PlaneTransformation.from_dict(plane_input).to_dict()
+                plane_source = "manual"
+            elif auto_parameters:
+                plane_solution = service.solve_plane_parameters(
+                    common_pairs, str(plane_input.get("model", "affine")).lower()
+                )
+                plane_source = "computed"
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("平面转换参数解算失败: %s", exc)
+            messages.append(f"平面转换参数解算失败: {exc}")
+            plane_solution = {}
+            plane_source = "error"
+
+    regional_input = provided_params.get("regional") or {}
+    regional = None
+    regional_summary: Dict[str, Any] = {"source": "none"}
+    if regional_input and regional_input.get("enabled", True):
+        try:
+            leaf_size = parse_float(regional_input.get("leaf_size"))
+            regional = service.solve_regional_parameters(
+                common_pairs,
+                str(regional_input.get("model", "seven")).lower(),
+                leaf_size=int(leaf_size) if leaf_size else None,
+                overlap=parse_float(regional_input.get("overlap")) or 0.0,
+                blend=int(parse_float(regional_input.get("blend")) or 1),
+            )
+            regional_summary = {**regional.to_dict(), "source": "computed"}
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("分区参数解算失败: %s", exc)
+            messages.append(f"分区参数解算失败: {exc}")
+            regional_summary = {"source": "error"}
+
     points_payload: List[Dict[str, Any]] = payload.get("points") or []
     enriched_points: List[Dict[str, Any]] = []
     conversion_results: List[Dict[str, Any]] = []
 
+    working_points: List[PointRecord] = []
     for raw_point in points_payload:
         point = service.build_point(raw_point, raw_point.get("name", ""))
         if auto_fill:
             point = service.fill_point_components(point, source_system)
-        enriched_points.append(point.to_payload())
-
+        enriched_points.append(point.to_payload(include_dms))
+        working_points.append(_working_point(service, point, source_system, projection_factors))
+
+    seven_for_points = seven_solution if seven_source in {"manual", "computed"} else {}
+    four_for_points = four_solution if four_source in {"manual", "computed"} else {}
+    if regional is not None and regional.model == "seven":
+        spatial_mode = "seven"
+    elif seven_for_points.get("rates"):
+        spatial_mode = "fourteen"
+    elif seven_for_points and all(key in seven_for_points for key in ("dx", "dy", "dz")):
+        spatial_mode = "seven"
+    else:
+        spatial_mode = "none"
+    time_dependent = spatial_mode == "fourteen"
+
+    # Global, fourteen-parameter or (blended) regional parameters are applied to
+    # the whole point array in one pass; only the target completion runs per point.
+    xyz = np.array([[point.X, point.Y, point.Z] for point in working_points], dtype=float).reshape(-1, 3)
+    spatial_error: Optional[str] = None
+    covariance: Optional[np.ndarray] = None
+    try:
+        transformed, positions, parameter_rows = service.transform_cartesian_array(
+            xyz,
+            seven_for_points if spatial_mode != "none" else {},
+            regional=regional,
+            epochs=[point.epoch for point in working_points] if time_dependent else None,
+            velocities=[point.velocity or (math.nan,) * 3 for point in working_points] if time_dependent else None,
+            target_epoch=target_epoch if time_dependent else None,
+        )
+        # Point covariances (``sigma``/``covariance`` along X/Y/Z) and the
+        # covariance of a solved or supplied global parameter set reach the target XYZ.
+        global_parameters = spatial_mode != "none" and (regional is None or regional.model != "seven")
+        covariance = service.propagate_bursa_wolf_covariance(
+            positions,
+            parameter_rows,
+            stack_covariances(points_payload, CARTESIAN_AXES),
+            seven_for_points.get("covariance") if global_parameters else None,
+        )
+    except ValueError as exc:
+        spatial_error = str(exc)
+        transformed = np.full_like(xyz, np.nan)
+
+    four_xy: Optional[np.ndarray] = None
+    if four_for_points or (regional is not None and regional.model == "four"):
+        xy = np.array([[point.x, point.y] for point in working_points], dtype=float).reshape(-1, 2)
+        four_xy, four_rows = service.transform_plane_array(xy, four_for_points, regional=regional)
+
+    # Affine/polynomial plane models map the source grid straight onto the target
+    # grid; they are applied to all points in one array pass and supply target x/y.
+    plane_xy: Optional[np.ndarray] = None
+    if plane_source in {"manual", "computed"} and working_points:
+        source_xy = np.array([[point.x, point.y] for point in working_points], dtype=float)  # None -> NaN
+        plane_xy = service.apply_plane_parameters(source_xy, plane_solution)
+
+    for index, point in enumerate(working_points):
         try:
-            result_payload = _compute_conversion(
+            if spatial_error is not None and (plane_xy is None or np.isnan(plane_xy[index]).any()):
+                raise ValueError(spatial_error)
+            result_payload = _conversion_payload(
                 service,
                 point,
-                source_system,
+                transformed[index],
                 target_system,
-                seven_solution if seven_source in {"manual", "computed"} else {},
-                four_solution if four_source in {"manual", "computed"} else {},
+                spatial_mode,
+                plane_xy=plane_xy[index] if plane_xy is not None else None,
+                plane_model=plane_solution.get("model"),
+                projection_factors=projection_factors,
+                target_epoch=target_epoch,
+                include_dms=include_dms,
             )
+            if covariance is not None and not np.isnan(covariance[index]).any():
+                result_payload["target"].update(covariance_payload(covariance[index], CARTESIAN_AXES))
+            if four_xy is not None and not np.isnan(four_xy[index]).any():
+                rotation, scale = four_rows[index, 2:]
+                result_payload["plane_from_four_parameters"] = {
+                    "x": float(four_xy[index, 0]),
+                    "y": float(four_xy[index, 1]),
+                    "rotation_arcsec": float(rotation) * (180 / math.pi) * 3600,
+                    "scale_factor": 1.0 + float(scale),
+                }
             conversion_results.append(result_payload)
         except Exception as exc:  # noqa: BLE001
             logger.warning("点 %s 转换失败: %s", point.name or "UNKNOWN", exc)
             messages.append(f"{point.name or '未命名'} 转换失败: {exc}")
             conversion_results.append({"name": point.name, "error": str(exc)})
 
-    response = {
-        "success": True,
-        "data": {
-            "source_system": source_system.to_dict(),
-            "target_system": target_system.to_dict(),
-            "common_points": enriched_common,
-            "seven_parameters": {**seven_solution, "source": seven_source},
-            "four_parameters": {**four_solution, "source": four_source},
-            "points": enriched_points,
-            "results": conversion_results,
-        },
-        "messages": messages,
+    data: Dict[str, Any] = {
+        "source_system": source_system.to_dict(),
+        "target_system": target_system.to_dict(),
+        "common_points": enriched_common,
+        "seven_parameters": {**seven_solution, "source": seven_source},
+        "four_parameters": {**four_solution, "source": four_source},
+        "plane_parameters": {**plane_solution, "source": plane_source},
+        "regional_parameters": regional_summary,
+        "points": enriched_points,
+        "results": conversion_results,
     }
-    return jsonify(response)
+    if columnar:
+        for key in ("common_points", "points", "results"):
+            data[key] = columns_from_records(data[key], decimals, omitted)
+        data["format"] = "columnar"
+
+    return jsonify({"success": True, "data": data, "messages": messages})
 
 
 # --------------------------------------------------------------------------- #
@@ -168,7 +389,10 @@ def coordinate_batch_geodetic_to_cartesian():
 
     service = _get_service()
     try:
-        data = service.batch_geodetic_to_cartesian(rows, ellipsoid)
+        columnar, decimals, include_dms = _output_options(payload)
+        data = service.batch_geodetic_to_cartesian(
+            rows, ellipsoid, include_dms=include_dms, columnar=columnar, decimals=decimals
+        )
         return jsonify({"success": True, "data": data})
     except ValueError as exc:
         logger.warning("Batch BLH to XYZ failed: %s", exc)
@@ -191,7 +415,10 @@ def coordinate_batch_cartesian_to_geodetic():
 
     service = _get_service()
     try:
-        data = service.batch_cartesian_to_geodetic(rows, ellipsoid)
+        columnar, decimals, include_dms = _output_options(payload)
+        data = service.batch_cartesian_to_geodetic(
+            rows, ellipsoid, include_dms=include_dms, columnar=columnar, decimals=decimals
+        )
         return jsonify({"success": True, "data": data})
     except ValueError as exc:
         logger.warning("Batch XYZ to BLH failed: %s", exc)
@@ -201,11 +428,168 @@ def coordinate_batch_cartesian_to_geodetic():
         return jsonify({"success": False, "error": f"Batch conversion failed: {exc}"}), 500
 
 
+@api_bp.route("/coordinate/batch/gauss-forward", methods=["POST"])
+def coordinate_batch_gauss_forward():
+    """Batch Gauss forward projection with optional covariance propagation."""
+
+    return _batch_gauss_projection("forward")
+
+
+@api_bp.route("/coordinate/batch/gauss-inverse", methods=["POST"])
+def coordinate_batch_gauss_inverse():
+    """Batch Gauss inverse projection with optional covariance propagation."""
+
+    return _batch_gauss_projection("inverse")
+
+
+def _batch_gauss_projection(direction: str):
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get("points") or []
+
+    if not rows:
+        return jsonify({"success": False, "error": "No points were provided for conversion"}), 400
+
+    service = _get_service()
+    try:
+        columnar, decimals, include_dms = _output_options(payload)
+        data = service.batch_gauss_projection(
+            rows, payload.get("system"), direction, include_dms=include_dms, columnar=columnar, decimals=decimals
+        )
+        return jsonify({"success": True, "data": data})
+    except ValueError as exc:
+        logger.warning("Batch Gauss %s projection failed: %s", direction, exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Batch Gauss %s projection raised unexpected error: %s", direction, exc)
+        return jsonify({"success": False, "error": f"Batch conversion failed: {exc}"}), 500
+
+
+@api_bp.route("/coordinate/batch/time-dependent", methods=["POST"])
+def coordinate_batch_time_dependent():
+    """Batch apply the 14-parameter model to epoch-tagged XYZ positions."""
+
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get("points") or []
+    raw_params = payload.get("parameters") or {}
+
+    if not rows:
+        return jsonify({"success": False, "error": "No points were provided for conversion"}), 400
+
+    service = _get_service()
+    try:
+        columnar, decimals, _ = _output_options(payload)
+        params = _parse_manual_seven_parameters(raw_params)
+        data = service.batch_time_dependent_transform(
+            rows,
+            params,
+            target_epoch=parse_float(payload.get("target_epoch")),
+            ellipsoid_name=payload.get("ellipsoid"),
+            columnar=columnar,
+            decimals=decimals,
+        )
+        data["parameters"] = params
+        return jsonify({"success": True, "data": data})
+    except ValueError as exc:
+        logger.warning("Batch time-dependent transformation failed: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Batch time-dependent transformation raised unexpected error: %s", exc)
+        return jsonify({"success": False, "error": f"Batch conversion failed: {exc}"}), 500
+
+
+@api_bp.route("/coordinate/batch/plane-transform", methods=["POST"])
+def coordinate_batch_plane_transform():
+    """Batch apply an affine/polynomial plane transformation, solving it first if needed."""
+
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get("points") or []
+
+    if not rows:
+        return jsonify({"success": False, "error": "No points were provided for conversion"}), 400
+
+    service = _get_service()
+    try:
+        columnar, decimals, _ = _output_options(payload)
+        raw_common = payload.get("common_points") or []
+        if raw_common:
+            pairs = [
+                (
+                    service.build_point(entry.get("source"), entry.get("name", "")),
+                    service.build_point(entry.get("target"), entry.get("name", "")),
+                )
+                for entry in raw_common
+            ]
+            params = service.solve_plane_parameters(pairs, str(payload.get("model", "affine")).lower())
+        else:
+            params = PlaneTransformation.from_dict(payload.get("parameters") or {}).to_dict()
+        data = service.batch_plane_transform(rows, params, columnar=columnar, decimals=decimals)
+        data["parameters"] = params
+        return jsonify({"success": True, "data": data})
+    except ValueError as exc:
+        logger.warning("Batch plane transformation failed: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Batch plane transformation raised unexpected error: %s", exc)
+        return jsonify({"success": False, "error": f"Batch conversion failed: {exc}"}), 500
+
+
+@api_bp.route("/coordinate/batch/distance-reduction", methods=["POST"])
+def coordinate_batch_distance_reduction():
+    """Batch reduce measured distances between ground and Gauss grid."""
+
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get("pairs") or []
+    direction = payload.get("direction") or "ground_to_grid"
+
+    if not rows:
+        return jsonify({"success": False, "error": "No point pairs were provided for reduction"}), 400
+
+    service = _get_service()
+    try:
+        columnar, decimals, _ = _output_options(payload)
+        data = service.batch_reduce_distances(
+            rows, payload.get("system"), direction, columnar=columnar, decimals=decimals
+        )
+        return jsonify({"success": True, "data": data})
+    except ValueError as exc:
+        logger.warning("Batch distance reduction failed: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Batch distance reduction raised unexpected error: %s", exc)
+        return jsonify({"success": False, "error": f"Distance reduction failed: {exc}"}), 500
+
+
 # --------------------------------------------------------------------------- #
 # Helper routines
 # --------------------------------------------------------------------------- #
 
 
+def _output_options(payload: Dict[str, Any]) -> Tuple[bool, Optional[int], bool]:
+    """Read ``format``/``decimals``/``include_dms`` from the payload or its options.
+
+    Records stay the default; DMS strings default on for records and off for
+    the columnar format.
+    """
+
+    options = payload.get("options") or {}
+
+    def option(key: str) -> Any:
+        return payload[key] if payload.get(key) is not None else options.get(key)
+
+    output_format = str(option("format") or "records").lower()
+    if output_format not in {"records", "columnar"}:
+        raise ValueError(f"未支持的输出格式: {output_format}")
+    columnar = output_format == "columnar"
+
+    decimals = parse_float(option("decimals"))
+    include_dms = option("include_dms")
+    return (
+        columnar,
+        int(decimals) if decimals is not None else None,
+        not columnar if include_dms is None else bool(include_dms),
+    )
+
+
 def _parse_manual_seven_parameters(raw: Dict[str, Any]) -> Dict[str, Any]:
     dx = parse_float(raw.get("dx")) or 0.0
     dy = parse_float(raw.get("dy")) or 0.0
@@ -240,7 +624,7 @@ def _parse_manual_seven_parameters(raw: Dict[str, Any]) -> Dict[str, Any]:
         else:
             scale_delta = 0.0
 
-    return {
+    parsed = {
         "dx": dx,
         "dy": dy,
         "dz": dz,
@@ -252,6 +636,17 @@ def _parse_manual_seven_parameters(raw: Dict[str, Any]) -> Dict[str, Any]:
         "rotation_arcsec": {axis: value * (180 / math.pi) * 3600 for axis, value in {"rx": rx, "ry": ry, "rz": rz}.items()},
     }
 
+    # 14-parameter form: rates share the units of the static values, per year.
+    raw_rates = raw.get("rates")
+    if isinstance(raw_rates, dict) and raw_rates:
+        rates = _parse_manual_seven_parameters({"rotation_unit": unit, **raw_rates})
+        parsed["rates"] = {key: rates[key] for key in ("dx", "dy", "dz", "rx", "ry", "rz", "scale")}
+        parsed["reference_epoch"] = parse_float(raw.get("reference_epoch") or raw.get("t0"))
+    # Optional 7×7 parameter covariance in internal units (m, rad, unitless scale).
+    if raw.get("covariance") is not None:
+        parsed["covariance"] = raw.get("covariance")
+    return parsed
+
 
 def _parse_manual_four_parameters(raw: Dict[str, Any]) -> Dict[str, Any]:
     dx = parse_float(raw.get("dx")) or 0.0
@@ -292,52 +687,77 @@ def _parse_manual_four_parameters(raw: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _compute_conversion(
+_SPATIAL_DIAGNOSTICS = {
+    "fourteen": "XYZ 通过十四参数（含历元速率）转换获得。",
+    "seven": "XYZ 通过七参数转换获得。",
+    "none": "未提供七参数，直接沿用源空间坐标。",
+}
+
+_MISSING_XYZ = {
+    "fourteen": "Point lacks XYZ values for fourteen-parameter transformation.",
+    "seven": "Point lacks XYZ values for seven-parameter transformation.",
+    "none": "缺少七参数或源点 XYZ，无法完成空间坐标转换。",
+}
+
+
+def _working_point(
     service: UniversalCoordinateService,
     source_point: PointRecord,
     source_system,
-    target_system,
-    seven_parameters: Dict[str, Any],
-    four_parameters: Dict[str, Any],
-) -> Dict[str, Any]:
-    """Run the cascade of transformations for a single point."""
+    projection_factors: bool = False,
+) -> PointRecord:
+    """Complete the source side of a point before the array transformations."""
 
     working_point = source_point.clone()
-    if any(
+    if projection_factors or any(
         value is None
         for value in (working_point.B, working_point.L, working_point.X, working_point.Y, working_point.Z, working_point.x, working_point.y)
     ):
-        working_point = service.fill_point_components(working_point, source_system)
+        working_point = service.fill_point_components(
+            working_point, source_system, with_projection_factors=projection_factors
+        )
+    return working_point
 
-    target_point = PointRecord(name=working_point.name)
 
-    if seven_parameters and all(key in seven_parameters for key in ("dx", "dy", "dz")):
-        X, Y, Z = service.apply_seven_parameters(working_point, seven_parameters)
-        target_point.X, target_point.Y, target_point.Z = X, Y, Z
-        target_point.diagnostics.append("XYZ 通过七参数转换获得。")
-    else:
-        if None in (working_point.X, working_point.Y, working_point.Z):
-            raise ValueError("缺少七参数或源点 XYZ，无法完成空间坐标转换。")
-        target_point.X, target_point.Y, target_point.Z = working_point.X, working_point.Y, working_point.Z
-        target_point.diagnostics.append("未提供七参数，直接沿用源空间坐标。")
-
-    target_point = service.fill_point_components(target_point, target_system)
-
-    plane_four = None
-    if four_parameters and working_point.x is not None and working_point.y is not None:
-        plane_x, plane_y = service.apply_four_parameters(working_point, four_parameters)
-        plane_four = {
-            "x": plane_x,
-            "y": plane_y,
-            "rotation_arcsec": four_parameters.get("rotation_arcsec"),
-            "scale_factor": four_parameters.get("scale_factor", 1.0),
-        }
-
-    payload = {
+def _conversion_payload(
+    service: UniversalCoordinateService,
+    working_point: PointRecord,
+    transformed: np.ndarray,
+    target_system,
+    spatial_mode: str,
+    *,
+    plane_xy: Optional[np.ndarray] = None,
+    plane_model: Optional[str] = None,
+    projection_factors: bool = False,
+    target_epoch: float | None = None,
+    include_dms: bool = True,
+) -> Dict[str, Any]:
+    """Complete the target side of one point from its transformed XYZ and plane rows.
+
+    A plane model row, when present, provides the target x/y; points without
+    XYZ are then converted in the plane alone.
+    """
+
+    spatial = not np.isnan(transformed).any()
+    planar = plane_xy is not None and not np.isnan(plane_xy).any()
+    if not spatial and not planar:
+        raise ValueError(_MISSING_XYZ[spatial_mode])
+
+    target_point = PointRecord(name=working_point.name)
+    if spatial:
+        target_point.X, target_point.Y, target_point.Z = (float(value) for value in transformed)
+        if spatial_mode == "fourteen":
+            target_point.epoch = target_epoch if target_epoch is not None else working_point.epoch
+        target_point.diagnostics.append(_SPATIAL_DIAGNOSTICS[spatial_mode])
+    if planar:
+        target_point.x, target_point.y = float(plane_xy[0]), float(plane_xy[1])
+        target_point.diagnostics.append(f"x/y 通过 {plane_model} 平面转换获得。")
+
+    target_point = service.fill_point_components(
+        target_point, target_system, with_projection_factors=projection_factors
+    )
+    return {
         "name": working_point.name,
-        "source": working_point.to_payload(),
-        "target": target_point.to_payload(),
+        "source": working_point.to_payload(include_dms),
+        "target": target_point.to_payload(include_dms),
     }
-    if plane_four is not None:
-        payload["plane_from_four_parameters"] = plane_four
-    return payload
@@ -47,6 +47,8 @@ def design_curve():
             result = designer.circular_curve_design(parameters)
         elif curve_type == "compound":
             result = designer.compound_curve_design(parameters)
+        elif curve_type == "alignment":
+            result = designer.alignment_design(parameters)
         else:
             return jsonify({"success": False, "error": f"未支持的曲线类型: {curve_type}"}), 400
 
@@ -58,6 +60,34 @@ def design_curve():
         }
         return jsonify(response)
 
+    except ValueError as exc:
+        logger.warning("曲线设计参数无效: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
     except Exception as exc:  # noqa: BLE001
         logger.exception("曲线设计计算失败: %s", exc)
         return jsonify({"success": False, "error": str(exc)}), 500
+
+
+@api_bp.route("/curve-design/projection", methods=["POST"])
+def project_points():
+    """实测点对多交点线形反算里程与偏距。"""
+
+    payload = request.get_json(silent=True) or {}
+    if not payload:
+        return jsonify({"success": False, "error": "未提供有效的 JSON 数据"}), 400
+
+    try:
+        designer = _get_curve_designer()
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("曲线设计服务不可用: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 500
+
+    try:
+        result = designer.alignment_projection(payload.get("parameters", {}))
+        return jsonify({"success": True, "data": result, "timestamp": datetime.now().isoformat()})
+    except ValueError as exc:
+        logger.warning("里程偏距反算参数无效: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 400
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("里程偏距反算失败: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 500
@@ -2,15 +2,36 @@
 
 from __future__ import annotations
 
+import io
+import json
 import logging
 from datetime import datetime
-from flask import current_app, jsonify, request
+from urllib.parse import quote
+from flask import Response, current_app, jsonify, request, send_file, stream_with_context
 
+from ..domain.gps_stream import DEFAULT_CHUNK_SIZE, read_points
 from . import api_bp
 
 logger = logging.getLogger(__name__)
 
 
+def _get_gps_converter():
+    services = current_app.extensions.get("services", {})
+    gps_converter = services.get("gps_converter")
+    if gps_converter is None:
+        raise RuntimeError("GPS 转换服务未初始化")
+    return gps_converter
+
+
+def _error(exc: Exception, message: str):
+    """ValueError 视为请求错误，其余按服务端错误记录。"""
+
+    if isinstance(exc, ValueError):
+        return jsonify({"success": False, "error": str(exc)}), 400
+    logger.exception("%s: %s", message, exc)
+    return jsonify({"success": False, "error": str(exc), "timestamp": datetime.now().isoformat()}), 500
+
+
 @api_bp.route("/gps-altitude", methods=["POST"])
 def convert_gps_altitude():
     """执行 GPS 高程异常转换计算。"""
@@ -42,21 +63,17 @@ def convert_gps_altitude():
     )
 
     try:
-        if model == "vertical_translation":
-            result = gps_converter.vertical_translation_model(known_points, unknown_points)
-        elif model == "linear_basis":
-            result = gps_converter.linear_basis_fitting(known_points, unknown_points, model_params)
-        elif model == "surface_basis":
-            result = gps_converter.surface_basis_fitting(known_points, unknown_points, model_params)
-        else:
-            return jsonify({"success": False, "error": f"未支持的模型类型: {model}"}), 400
+        result = gps_converter.fit(model, known_points, unknown_points, model_params)
+        if "error" in result:
+            return jsonify({"success": False, "error": result["error"]}), 400
 
         logger.info("GPS 高程转换完成, 单位权中误差=%.3f", result.get("unit_weight_error", 0.0))
 
         response = {
             "success": True,
             "data": result.get("results", []),
-            "model": model,
+            "model": result.get("model", model),
+            "model_id": result.get("model_id"),
             "known_points_count": len(known_points),
             "unknown_points_count": len(unknown_points),
             "unit_weight_error": result.get("unit_weight_error", 0.0),
@@ -66,6 +83,9 @@ def convert_gps_altitude():
             "accuracy_assessment": result.get("accuracy_assessment", {}),
             "timestamp": datetime.now().isoformat(),
         }
+        for key in ("selection", "robust"):
+            if key in result:
+                response[key] = result[key]
         return jsonify(response)
 
     except Exception as exc:  # noqa: BLE001
@@ -80,3 +100,237 @@ def convert_gps_altitude():
             ),
             500,
         )
+
+
+@api_bp.route("/gps-altitude/predict", methods=["POST"])
+def predict_gps_altitude():
+    """使用已登记的高程异常模型（model_id）或高程异常格网（grid_id）计算待求点，无需重新拟合。"""
+
+    payload = request.get_json(silent=True) or {}
+    model_id = payload.get("model_id")
+    grid_id = payload.get("grid_id")
+    unknown_points = payload.get("unknown_points", [])
+    if not model_id and not grid_id:
+        return jsonify({"success": False, "error": "需提供 model_id 或 grid_id"}), 400
+    if not unknown_points:
+        return jsonify({"success": False, "error": "需至少提供一个待求点"}), 400
+
+    try:
+        if grid_id:
+            result = _get_gps_converter().predict_from_grid(grid_id, unknown_points)
+            logger.info("GPS 高程格网内插: 格网=%s, 待求点=%d", grid_id, len(unknown_points))
+            return jsonify(
+                {
+                    "success": True,
+                    "data": result["results"],
+                    "grid_id": grid_id,
+                    "grid": result["grid"],
+                    "unknown_points_count": len(unknown_points),
+                    "outside_count": result["outside_count"],
+                    "timestamp": datetime.now().isoformat(),
+                }
+            )
+
+        result = _get_gps_converter().predict(model_id, unknown_points)
+        logger.info("GPS 高程模型预测: 模型=%s, 待求点=%d", model_id, len(unknown_points))
+        return jsonify(
+            {
+                "success": True,
+                "data": result["results"],
+                "model": result["model"],
+                "model_id": result["model_id"],
+                "unknown_points_count": len(unknown_points),
+                "statistics": result["statistics"],
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "GPS 高程模型预测失败")
+
+
+@api_bp.route("/gps-altitude/models/<model_id>", methods=["GET"])
+def export_gps_altitude_model(model_id: str):
+    """导出已登记的模型定义文件。"""
+
+    try:
+        definition = _get_gps_converter().export_model(model_id)
+        return jsonify(
+            {
+                "success": True,
+                "data": {
+                    "model": definition,
+                    "content": json.dumps(definition, ensure_ascii=False, separators=(",", ":")),
+                    "content_type": "application/json",
+                    "filename": f"height_anomaly_model_{model_id}.json",
+                },
+            }
+        )
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "导出 GPS 高程模型失败")
+
+
+@api_bp.route("/gps-altitude/models", methods=["POST"])
+def import_gps_altitude_model():
+    """导入模型定义（content 为导出的文件内容，或直接提供 model 对象）。"""
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        definition = payload.get("model")
+        if definition is None and payload.get("content"):
+            try:
+                definition = json.loads(payload["content"])
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"模型文件不是有效的 JSON: {exc}") from exc
+        if not isinstance(definition, dict):
+            raise ValueError("需提供 model 对象或 content 模型文件内容")
+
+        gps_converter = _get_gps_converter()
+        model_id = gps_converter.import_model(definition)
+        return jsonify({"success": True, "data": gps_converter.export_model(model_id)})
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "导入 GPS 高程模型失败")
+
+
+@api_bp.route("/gps-altitude/geoid", methods=["POST"])
+def evaluate_gps_altitude_geoid():
+    """以球谐重力场模型计算各点高程异常（可选正常高）。"""
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        points = payload.get("points") or []
+        if not payload.get("geoid"):
+            raise ValueError("需提供重力场模型名称 geoid")
+        if not points:
+            raise ValueError("需至少提供一个点")
+        result = _get_gps_converter().geoid_anomalies(
+            payload["geoid"],
+            points,
+            max_degree=payload.get("max_degree"),
+            ellipsoid=payload.get("ellipsoid", "CGCS2000"),
+        )
+        return jsonify({"success": True, "data": result})
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "重力场模型计算失败")
+
+
+@api_bp.route("/gps-altitude/models/<model_id>/benchmarks", methods=["POST"])
+def add_gps_altitude_benchmarks(model_id: str):
+    """向分块曲面模型追加已知点，仅重新拟合受影响的分块。"""
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        known_points = payload.get("known_points") or []
+        if not known_points:
+            raise ValueError("需至少提供一个新增已知点")
+        return jsonify({"success": True, "data": _get_gps_converter().add_benchmarks(model_id, known_points)})
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "追加 GPS 水准点失败")
+
+
+@api_bp.route("/gps-altitude/grids", methods=["POST"])
+def create_gps_altitude_grid():
+    """由已登记模型生成高程异常格网，或上传已有格网文件（multipart 字段 file）。"""
+
+    try:
+        gps_converter = _get_gps_converter()
+        upload = request.files.get("file")
+        if upload is not None:
+            grid_id = gps_converter.grids.import_bytes(upload.read())
+            grid = gps_converter.grids.get(grid_id)
+            return jsonify({"success": True, "data": dict(grid.describe(), grid_id=grid_id)})
+
+        payload = request.get_json(silent=True) or {}
+        model_id = payload.get("model_id")
+        if not model_id:
+            return jsonify({"success": False, "error": "需提供 model_id"}), 400
+        options = {key: payload[key] for key in ("bounds", "spacing", "margin") if payload.get(key) is not None}
+        if "spacing" in options:
+            options["spacing"] = float(options["spacing"])
+        if "margin" in options:
+            options["margin"] = float(options["margin"])
+
+        result = gps_converter.build_grid(model_id, **options)
+        logger.info("生成高程异常格网: 模型=%s, 格网=%s, %d×%d", model_id, result["grid_id"], result["rows"], result["cols"])
+        return jsonify({"success": True, "data": result})
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "生成高程异常格网失败")
+
+
+@api_bp.route("/gps-altitude/grids/<grid_id>", methods=["GET"])
+def download_gps_altitude_grid(grid_id: str):
+    """下载二进制高程异常格网文件。"""
+
+    try:
+        gps_converter = _get_gps_converter()
+        gps_converter.grids.get(grid_id)
+        return send_file(
+            gps_converter.grids.path(grid_id),
+            as_attachment=True,
+            download_name=f"height_anomaly_grid_{grid_id}.tmag",
+            mimetype="application/octet-stream",
+        )
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "下载高程异常格网失败")
+
+
+@api_bp.route("/gps-altitude/stream", methods=["POST"])
+def stream_gps_altitude():
+    """
+    分块处理上传的待求点文件（multipart 字段 unknown_file），以文本流返回结果。
+
+    使用已登记模型（model_id）或格网（grid_id）；也可同时上传 known_file 并给出
+    model / model_params（JSON 字符串）先拟合模型。
+    """
+
+    unknown_file = request.files.get("unknown_file")
+    if unknown_file is None:
+        return jsonify({"success": False, "error": "需上传待求点文件 unknown_file"}), 400
+
+    form = request.form
+    try:
+        gps_converter = _get_gps_converter()
+        model_id = form.get("model_id")
+        grid_id = form.get("grid_id")
+        known_file = request.files.get("known_file")
+        if not model_id and not grid_id:
+            if known_file is None:
+                return jsonify({"success": False, "error": "需提供 model_id、grid_id 或已知点文件 known_file"}), 400
+            known_points = read_points(known_file.stream, with_anomaly=True)
+            model_params = json.loads(form.get("model_params") or "{}")
+            fitted = gps_converter.fit(form.get("model", "vertical_translation"), known_points, [], model_params)
+            if "error" in fitted:
+                return jsonify({"success": False, "error": fitted["error"]}), 400
+            model_id = fitted["model_id"]
+
+        # 请求上下文出栈时会关闭上传文件，而结果在响应阶段才逐块读取，
+        # 因此取出上传流自行管理，由生成器结束时关闭
+        upload_stream, unknown_file.stream = unknown_file.stream, io.BytesIO()
+        chunks = gps_converter.stream(
+            upload_stream,
+            model_id=model_id,
+            grid_id=grid_id,
+            chunk_size=int(form.get("chunk_size") or DEFAULT_CHUNK_SIZE),
+            decimals=int(form.get("decimals") or 4),
+        )
+    except Exception as exc:  # noqa: BLE001
+        return _error(exc, "GPS 高程文件处理失败")
+
+    def guarded():
+        # 响应已开始后无法再改状态码，文件中途的格式错误以注释行告知
+        try:
+            yield from chunks
+        except ValueError as exc:
+            logger.warning("GPS 高程文件处理中止: %s", exc)
+            yield f"# 错误: {exc}\n"
+        finally:
+            upload_stream.close()
+
+    logger.info("GPS 高程文件流式处理: 模型=%s, 格网=%s", model_id, grid_id)
+    source_name = (unknown_file.filename or "unknown").rsplit(".", 1)[0]
+    response = Response(stream_with_context(guarded()), mimetype="text/plain; charset=utf-8")
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=\"normal_height.txt\"; filename*=UTF-8''{quote(source_name)}_normal_height.txt"
+    )
+    if model_id:
+        response.headers["X-Model-Id"] = model_id
+    return response
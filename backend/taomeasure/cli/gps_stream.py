@@ -0,0 +1,94 @@
+"""
+Command-line streaming of GPS-leveling unknown-point files.
+
+Fits a height-anomaly model from a known-point file (or loads an exported
+model / binary anomaly grid), then reads the unknown-point file chunk by chunk
+and writes ``name lat lon H anomaly normal_height [normal_height_std]`` lines,
+so memory use does not grow with the file size.
+
+Example::
+
+    python -m taomeasure.cli.gps_stream unknown.txt -k known.txt -m surface_basis -t quadratic -o out.txt
+    python -m taomeasure.cli.gps_stream unknown.txt -k known.txt -m surface_basis \
+        --geoid-dir geoids -p '{"geoid": "EGM2008", "geoid_max_degree": 2190}' -o out.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from ..domain.anomaly_grid import AnomalyGrid
+from ..domain.gps_altitude import GPSAltitudeConverter
+from ..domain.gps_stream import DEFAULT_CHUNK_SIZE, read_points, stream_normal_heights
+
+
+def parse_cli() -> argparse.Namespace:
+    """Build and evaluate the argument parser."""
+    parser = argparse.ArgumentParser(description="Stream normal heights for a large unknown-point file.")
+    parser.add_argument("unknown", type=Path, help="Unknown-point file: name lat lon H")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-k", "--known", type=Path, help="Known-point file: name lat lon H anomaly")
+    source.add_argument("--model-file", type=Path, help="Model definition exported from /gps-altitude/models")
+    source.add_argument("--grid", type=Path, help="Binary height-anomaly grid (.tmag)")
+    parser.add_argument("-m", "--model", default="vertical_translation", help="Model used with --known")
+    parser.add_argument("-t", "--model-type", help="model_type for the chosen model")
+    parser.add_argument("-p", "--params", help="Extra model_params as a JSON object")
+    parser.add_argument("--geoid-dir", help="Directory of .gfc geopotential models referenced by model_params.geoid")
+    parser.add_argument("-o", "--output", type=Path, help="Output file (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Points per chunk")
+    parser.add_argument("--decimals", type=int, default=4, help="Decimals in the output values")
+    return parser.parse_args()
+
+
+def build_predictor(args: argparse.Namespace):
+    """Return a chunk predictor from the known points, model file or grid."""
+    converter = GPSAltitudeConverter(geoid_dir=args.geoid_dir)
+    if args.grid:
+        grid = AnomalyGrid.open(str(args.grid))
+        return lambda points: converter.grid_predict(grid, points)
+    if args.model_file:
+        definition = json.loads(args.model_file.read_text(encoding="utf-8"))
+        return converter.models.get(converter.import_model(definition)).predict
+
+    params = json.loads(args.params) if args.params else {}
+    if args.model_type:
+        params["model_type"] = args.model_type
+    with args.known.open(encoding="utf-8-sig") as handle:
+        known_points = read_points(handle, with_anomaly=True)
+    fitted = converter.fit(args.model, known_points, [], params)
+    if "error" in fitted:
+        raise ValueError(fitted["error"])
+    print(
+        f"model={fitted['model']} id={fitted['model_id']} unit_weight_error={fitted['unit_weight_error']:.4f}",
+        file=sys.stderr,
+    )
+    return converter.models.get(fitted["model_id"]).predict
+
+
+def main() -> None:
+    """Entry point: fit or load the model, then stream the unknown-point file."""
+    args = parse_cli()
+    try:
+        predict = build_predictor(args)
+    except ValueError as exc:
+        sys.exit(f"error: {exc}")
+
+    output = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with args.unknown.open(encoding="utf-8-sig") as handle:
+            for block in stream_normal_heights(
+                handle, predict, chunk_size=args.chunk_size, decimals=args.decimals
+            ):
+                output.write(block)
+    except ValueError as exc:
+        sys.exit(f"error: {exc}")
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,13 @@ class Config:
     CORS_SUPPORTS_CREDENTIALS: bool = True
     LOG_LEVEL: int = getattr(logging, os.getenv("TAOMEASURE_LOG_LEVEL", "INFO").upper(), logging.INFO)
     APP_VERSION: str = os.getenv("TAOMEASURE_VERSION", "2.0.0")
+    COORDINATE_SYSTEM_CACHE_SIZE: int = int(os.getenv("TAOMEASURE_SYSTEM_CACHE", "128"))  # 坐标系统缓存条目上限
+    COORDINATE_SHARD_WORKERS: int = int(os.getenv("TAOMEASURE_SHARD_WORKERS", "0"))  # 0 表示按 CPU 核数
+    COORDINATE_SHARD_THRESHOLD: int = int(os.getenv("TAOMEASURE_SHARD_THRESHOLD", "500000"))  # 超过该点数时多进程分片计算
+    GPS_MODEL_REGISTRY_SIZE: int = int(os.getenv("TAOMEASURE_GPS_MODELS", "64"))  # 高程异常模型登记表容量
+    GPS_GRID_DIR: str = os.getenv("TAOMEASURE_GPS_GRID_DIR", "")  # 高程异常格网目录，空则使用系统临时目录
+    GPS_TILE_THRESHOLD: int = int(os.getenv("TAOMEASURE_GPS_TILE_THRESHOLD", "200000"))  # 超过该已知点数时分块曲面并行拟合
+    GPS_GEOID_DIR: str = os.getenv("TAOMEASURE_GPS_GEOID_DIR", "")  # 球谐重力场模型（.gfc）目录，空则不启用
 
 
 def load_config() -> Config:
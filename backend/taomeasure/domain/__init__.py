@@ -2,16 +2,23 @@
 
 from __future__ import annotations
 
-from .gps_altitude import GPSAltitudeConverter
+from .gps_altitude import GPSAltitudeConverter, HeightAnomalyModel
 from .curve_design import CurveDesign
+from .alignment import HorizontalAlignment
 from .file_handler import FileHandler
 from .curve_dxf_builder import CurveDxfBuilder
 from .universal_coordinate import UniversalCoordinateService
+from .regional_transform import RegionalTransformation
+from .plane_transform import PlaneTransformation
 
 __all__ = [
     "GPSAltitudeConverter",
+    "HeightAnomalyModel",
     "CurveDesign",
+    "HorizontalAlignment",
     "FileHandler",
     "CurveDxfBuilder",
     "UniversalCoordinateService",
+    "RegionalTransformation",
+    "PlaneTransformation",
 ]
@@ -0,0 +1,407 @@
+"""Multi-intersection horizontal alignments with a cumulative-station index.
+
+An alignment runs from a start point through an ordered list of intersection
+points (JD) to an end point. Each JD carries a circular radius ``R`` and entry
+and exit clothoid lengths (``l0`` for both, or ``l0_in``/``l0_out``). The route
+is decomposed once into tangent, spiral and arc segments whose start stations
+form a sorted array, so any station is located by binary search and evaluated
+in closed form; station arrays are grouped by segment kind and evaluated as
+vectors. The inverse query (:meth:`HorizontalAlignment.project`) finds
+candidate stations through a k-d tree over points sampled along the route and
+refines them by Newton iteration on the exact segment geometry.
+
+Spiral coordinates come either from a Fresnel series (``series``) or from the
+Fresnel integrals themselves (``fresnel``, exact for any spiral angle).
+
+Coordinates follow :mod:`curve_design`: ``x`` north, ``y`` east, azimuths in
+radians clockwise from north.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.special import fresnel
+
+TANGENT, SPIRAL_IN, ARC, SPIRAL_OUT = range(4)
+SEGMENT_KINDS = ("tangent", "spiral_in", "arc", "spiral_out")
+SPIRAL_METHODS = ("series", "fresnel")
+_STATION_TOLERANCE = 1e-6
+_MIN_DEFLECTION = 1e-9
+_TWO_PI = 2 * math.pi
+_SAMPLE_SPACING = 10.0
+_MAX_SAMPLES = 1_000_000
+_NEWTON_ITERATIONS = 12
+_NEWTON_TOLERANCE = 1e-9
+
+
+def clothoid(l, R, l0, method: str = "series"):
+    """Clothoid coordinates along / across the start tangent at arc length ``l``.
+
+    ``series`` expands in ``τ = l² / (2·R·l0)`` to the seventh power, accurate
+    to well below a millimetre for spiral angles up to about one radian;
+    ``fresnel`` evaluates ``x = a·C(l/a)``, ``y = a·S(l/a)`` with
+    ``a = √(π·R·l0)`` exactly. Both accept arrays of ``l`` (and of ``R``/``l0``).
+    """
+
+    if method == "fresnel":
+        scale = np.sqrt(np.pi * R * l0)
+        S, C = fresnel(l / scale)
+        return scale * C, scale * S
+    tau = l * l / (2 * R * l0)
+    t2 = tau * tau
+    x = l * (1 - t2 / 10 + t2 * t2 / 216 - t2 * t2 * t2 / 9360)
+    y = l * tau * (1 / 3 - t2 / 42 + t2 * t2 / 1320 - t2 * t2 * t2 / 75600)
+    return x, y
+
+
+def _unit(azimuth: float) -> np.ndarray:
+    return np.array([math.cos(azimuth), math.sin(azimuth)])
+
+
+def _float(point: Dict, key: str, default: float = 0.0) -> float:
+    value = point.get(key)
+    if value is None:
+        return default
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{point.get('name') or '交点'} 的参数 {key} 必须为数值")
+    if not math.isfinite(value):
+        raise ValueError(f"{point.get('name') or '交点'} 的参数 {key} 必须为有限数值")
+    return value
+
+
+@dataclass
+class HorizontalAlignment:
+    """Segment table of an alignment; row ``i`` covers ``[starts[i], starts[i] + lengths[i])``.
+
+    ``origins``/``azimuths`` hold the segment start point and tangent azimuth,
+    except for exit spirals, which are evaluated backwards from their end point
+    (HZ) and store that point and the exit azimuth instead.
+    """
+
+    kinds: np.ndarray
+    starts: np.ndarray
+    lengths: np.ndarray
+    origins: np.ndarray
+    azimuths: np.ndarray
+    signs: np.ndarray
+    radii: np.ndarray
+    spirals: np.ndarray
+    centers: np.ndarray
+    curves: List[Dict] = field(default_factory=list)
+    spiral: str = "series"
+    _samples: Tuple = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_points(
+        cls, points: Sequence[Dict], start_station: float = 0.0, spiral: str = "series"
+    ) -> "HorizontalAlignment":
+        """Build the segment table from start point, JDs and end point, in route order."""
+
+        if spiral not in SPIRAL_METHODS:
+            raise ValueError(f"不支持的缓和曲线计算方式: {spiral}")
+        if len(points) < 2:
+            raise ValueError("线路至少需要起点和终点两个点")
+        coords = np.array([[_float(point, "x"), _float(point, "y")] for point in points])
+        legs = np.diff(coords, axis=0)
+        leg_lengths = np.hypot(legs[:, 0], legs[:, 1])
+        if np.any(leg_lengths < 1e-9):
+            raise ValueError("相邻交点坐标重合")
+        leg_azimuths = np.arctan2(legs[:, 1], legs[:, 0])
+
+        rows: List[Tuple] = []
+        curves: List[Dict] = []
+        station = float(start_station)
+        current = coords[0]
+        used = 0.0  # 当前边已被上一曲线占用的切线长
+
+        def add(kind, length, origin, azimuth, sign=0.0, radius=0.0, spiral=0.0, center=(np.nan, np.nan)):
+            nonlocal station
+            if length > 1e-9:
+                rows.append((kind, station, length, origin[0], origin[1], azimuth, sign, radius, spiral, *center))
+                station += float(length)
+
+        for index in range(1, len(points) - 1):
+            point = points[index]
+            name = point.get("name") or f"JD{index}"
+            az_in, az_out = leg_azimuths[index - 1], leg_azimuths[index]
+            deflection = math.remainder(az_out - az_in, _TWO_PI)
+            if abs(deflection) < _MIN_DEFLECTION:
+                # 交点在直线上，无需设曲线
+                add(TANGENT, leg_lengths[index - 1] - used, current, az_in)
+                current, used = coords[index], 0.0
+                continue
+            R = _float(point, "R")
+            if R <= 0:
+                raise ValueError(f"交点 {name} 的圆曲线半径 R 必须大于0")
+            l0 = _float(point, "l0")
+            l1, l2 = _float(point, "l0_in", l0), _float(point, "l0_out", l0)
+            if l1 < 0 or l2 < 0:
+                raise ValueError(f"交点 {name} 的缓和曲线长不能为负")
+
+            sign = 1.0 if deflection > 0 else -1.0
+            alpha = abs(deflection)
+            beta1, beta2 = l1 / (2 * R), l2 / (2 * R)
+            arc_angle = alpha - beta1 - beta2
+            if arc_angle < -1e-12:
+                raise ValueError(f"交点 {name} 的缓和曲线过长，圆曲线长度为负")
+            arc_angle = max(arc_angle, 0.0)
+
+            # 内移值与切线增量由缓和曲线终点坐标精确求得，保证各段首尾衔接
+            x1, y1 = (float(v) for v in clothoid(l1, R, l1, spiral)) if l1 > 0 else (0.0, 0.0)
+            x2, y2 = (float(v) for v in clothoid(l2, R, l2, spiral)) if l2 > 0 else (0.0, 0.0)
+            p1, q1 = y1 - R * (1 - math.cos(beta1)), x1 - R * math.sin(beta1)
+            p2, q2 = y2 - R * (1 - math.cos(beta2)), x2 - R * math.sin(beta2)
+            shift = (p1 - p2) / math.sin(alpha)
+            T1 = (R + p1) * math.tan(alpha / 2) + q1 - shift
+            T2 = (R + p2) * math.tan(alpha / 2) + q2 + shift
+
+            tangent = leg_lengths[index - 1] - used - T1
+            if tangent < -1e-6:
+                raise ValueError(f"交点 {name} 的曲线与前一曲线或线路起点重叠")
+            jd = coords[index]
+            u_in, u_out = _unit(az_in), _unit(az_out)
+            zh, hz = jd - T1 * u_in, jd + T2 * u_out
+            add(TANGENT, tangent, current, az_in)
+
+            start = station
+            add(SPIRAL_IN, l1, zh, az_in, sign, R, l1)
+            hy = zh + x1 * u_in + sign * y1 * _unit(az_in + math.pi / 2)
+            az_hy = az_in + sign * beta1
+            center = hy + R * _unit(az_hy + sign * math.pi / 2)
+            hy_station = station
+            add(ARC, R * arc_angle, hy, az_hy, sign, R, 0.0, center)
+            yh_station = station
+            add(SPIRAL_OUT, l2, hz, az_out, sign, R, l2)
+
+            length = l1 + R * arc_angle + l2
+            if l1 > 0 or l2 > 0:
+                main_points = {"ZH": start, "HY": hy_station, "QZ": start + length / 2,
+                               "YH": yh_station, "HZ": start + length}
+            else:
+                main_points = {"ZY": start, "QZ": start + length / 2, "YZ": start + length}
+            curves.append({
+                "name": name,
+                "x": float(jd[0]),
+                "y": float(jd[1]),
+                "deflection_deg": math.degrees(deflection),
+                "R": R,
+                "l0_in": l1,
+                "l0_out": l2,
+                "T_in": T1,
+                "T_out": T2,
+                "L": length,
+                "jd_station": start + T1,
+                "main_points": main_points,
+            })
+            current, used = hz, T2
+
+        tangent = leg_lengths[-1] - used
+        if tangent < -1e-6:
+            raise ValueError("最后一条曲线超出线路终点")
+        add(TANGENT, tangent, current, leg_azimuths[-1])
+        if not rows:
+            raise ValueError("线路长度为零")
+
+        table = np.array(rows, dtype=float)
+        return cls(
+            kinds=table[:, 0].astype(np.int8),
+            starts=table[:, 1],
+            lengths=table[:, 2],
+            origins=table[:, 3:5],
+            azimuths=table[:, 5],
+            signs=table[:, 6],
+            radii=table[:, 7],
+            spirals=table[:, 8],
+            centers=table[:, 9:11],
+            curves=curves,
+            spiral=spiral,
+        )
+
+    @property
+    def start_station(self) -> float:
+        return float(self.starts[0])
+
+    @property
+    def end_station(self) -> float:
+        return float(self.starts[-1] + self.lengths[-1])
+
+    def main_points(self) -> Dict[str, float]:
+        """Stations of the start (BP), every curve main point and the end (EP)."""
+
+        stations = {"BP": self.start_station}
+        for curve in self.curves:
+            for key, value in curve["main_points"].items():
+                stations[f"{curve['name']}.{key}"] = value
+        stations["EP"] = self.end_station
+        return stations
+
+    def segment_index(self, stations) -> np.ndarray:
+        """Segment row of every station, by binary search over the start stations."""
+
+        stations = np.asarray(stations, dtype=float)
+        if stations.size and (
+            stations.min() < self.start_station - _STATION_TOLERANCE
+            or stations.max() > self.end_station + _STATION_TOLERANCE
+            or np.isnan(stations).any()
+        ):
+            raise ValueError(f"里程超出线路范围 [{self.start_station:.3f}, {self.end_station:.3f}]")
+        index = np.searchsorted(self.starts, stations, side="right") - 1
+        return np.clip(index, 0, len(self.starts) - 1)
+
+    def locate(self, stations, offset=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Coordinates and tangent azimuths at the given stations.
+
+        ``offset`` (scalar or per station) moves the point along the normal
+        ``azimuth + π/2`` (to the right of the direction of travel).
+        """
+
+        stations = np.asarray(stations, dtype=float).reshape(-1)
+        x, y, azimuth, _ = self._evaluate(stations, self.segment_index(stations))
+        if np.any(offset):
+            x -= offset * np.sin(azimuth)
+            y += offset * np.cos(azimuth)
+        return x, y, azimuth
+
+    def _evaluate(self, stations: np.ndarray, index: np.ndarray):
+        """Coordinates, azimuth and signed curvature (positive turning right) on given segment rows."""
+
+        distance = np.clip(stations - self.starts[index], 0.0, self.lengths[index])
+        x = np.empty(len(stations))
+        y = np.empty(len(stations))
+        azimuth = np.empty(len(stations))
+        curvature = np.zeros(len(stations))
+
+        for kind in range(len(SEGMENT_KINDS)):
+            mask = self.kinds[index] == kind
+            if not mask.any():
+                continue
+            rows = index[mask]
+            d = distance[mask]
+            origin_x, origin_y = self.origins[rows, 0], self.origins[rows, 1]
+            az0, sign = self.azimuths[rows], self.signs[rows]
+            if kind == TANGENT:
+                x[mask] = origin_x + d * np.cos(az0)
+                y[mask] = origin_y + d * np.sin(az0)
+                azimuth[mask] = az0
+            elif kind == ARC:
+                theta = az0 + sign * d / self.radii[rows]
+                normal = theta + sign * math.pi / 2
+                x[mask] = self.centers[rows, 0] - self.radii[rows] * np.cos(normal)
+                y[mask] = self.centers[rows, 1] - self.radii[rows] * np.sin(normal)
+                azimuth[mask] = theta
+                curvature[mask] = sign / self.radii[rows]
+            else:
+                # 第二缓和曲线自 HZ 反向量取，局部曲线长为至 HZ 的距离
+                l = d if kind == SPIRAL_IN else self.lengths[rows] - d
+                along, across = clothoid(l, self.radii[rows], self.spirals[rows], self.spiral)
+                direction = 1.0 if kind == SPIRAL_IN else -1.0
+                x[mask] = origin_x + direction * along * np.cos(az0) - sign * across * np.sin(az0)
+                y[mask] = origin_y + direction * along * np.sin(az0) + sign * across * np.cos(az0)
+                azimuth[mask] = az0 + direction * sign * l * l / (2 * self.radii[rows] * self.spirals[rows])
+                curvature[mask] = sign * l / (self.radii[rows] * self.spirals[rows])
+
+        return x, y, np.mod(azimuth, _TWO_PI), curvature
+
+    def _sample_index(self) -> Tuple[np.ndarray, cKDTree]:
+        """Stations sampled along the route (segment ends included) and a k-d tree of their points."""
+
+        if self._samples is None:
+            spacing = max(_SAMPLE_SPACING, (self.end_station - self.start_station) / _MAX_SAMPLES)
+            counts = np.maximum(np.ceil(self.lengths / spacing).astype(np.int64), 1)
+            row = np.repeat(np.arange(len(self.starts)), counts)
+            step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            stations = np.append(self.starts[row] + step * (self.lengths / counts)[row], self.end_station)
+            x, y, _ = self.locate(stations)
+            self._samples = (stations, cKDTree(np.column_stack((x, y))))
+        return self._samples
+
+    def project(self, x, y, candidates: int = 4) -> Dict[str, np.ndarray]:
+        """Station and perpendicular offset of arbitrary points relative to the centreline.
+
+        Each point starts from its ``candidates`` nearest samples; every start is
+        refined by Newton iteration on ``(P - C(s))·t(s) = 0`` over the exact
+        geometry, re-locating the segment by binary search after each step, and
+        the refined foot closest to the point wins. Feet are clamped to the
+        route's ends, where ``residual`` reports the remaining along-track
+        distance (zero for points opposite the route).
+
+        Returns:
+            Arrays ``station``, ``offset`` (positive to the right of travel),
+            ``segment`` (index into :data:`SEGMENT_KINDS`) and ``residual``.
+        """
+
+        px = np.asarray(x, dtype=float).reshape(-1)
+        py = np.asarray(y, dtype=float).reshape(-1)
+        if px.shape != py.shape:
+            raise ValueError("x 与 y 点数不一致")
+        if not (np.isfinite(px).all() and np.isfinite(py).all()):
+            raise ValueError("待投影点坐标必须为有限数值")
+        samples, tree = self._sample_index()
+        k = max(1, min(int(candidates), len(samples)))
+        _, nearest = tree.query(np.column_stack((px, py)), k=k)
+        nearest = nearest.reshape(len(px), k)
+
+        target_x = np.repeat(px, k)
+        target_y = np.repeat(py, k)
+        station = samples[nearest.reshape(-1)]
+        active = np.arange(len(station))
+        for _ in range(_NEWTON_ITERATIONS):
+            current = station[active]
+            cx, cy, azimuth, curvature = self._evaluate(current, self.segment_index(current))
+            dx, dy = target_x[active] - cx, target_y[active] - cy
+            along = dx * np.cos(azimuth) + dy * np.sin(azimuth)
+            offset = dy * np.cos(azimuth) - dx * np.sin(azimuth)
+            # f(s) = (P - C)·t，f'(s) = κ·offset - 1；点位于曲率中心外侧时退化为沿切线步进
+            slope = 1.0 - curvature * offset
+            step = np.where(slope > 0.1, along / np.maximum(slope, 0.1), along)
+            updated = np.clip(current + step, self.start_station, self.end_station)
+            station[active] = updated
+            # 已收敛或被夹在线路端点的不再迭代
+            active = active[np.abs(updated - current) >= _NEWTON_TOLERANCE]
+            if not len(active):
+                break
+
+        index = self.segment_index(station)
+        cx, cy, azimuth, _ = self._evaluate(station, index)
+        dx, dy = target_x - cx, target_y - cy
+        along = dx * np.cos(azimuth) + dy * np.sin(azimuth)
+        offset = dy * np.cos(azimuth) - dx * np.sin(azimuth)
+        best = np.argmin(np.hypot(dx, dy).reshape(len(px), k), axis=1)
+        pick = np.arange(len(px)) * k + best
+        return {
+            "station": station[pick],
+            "offset": offset[pick],
+            "segment": self.kinds[index[pick]].astype(np.int64),
+            "residual": np.abs(along[pick]),
+        }
+
+    def point(self, station: float, offset: float = 0.0) -> Dict:
+        """Single-station query: segment kind, coordinates and azimuth (degrees)."""
+
+        x, y, azimuth = self.locate([station], offset)
+        kind = int(self.kinds[self.segment_index([station])[0]])
+        return {
+            "station": float(station),
+            "segment": SEGMENT_KINDS[kind],
+            "x": float(x[0]),
+            "y": float(y[0]),
+            "azimuth": math.degrees(azimuth[0]),
+        }
+
+    def describe(self) -> Dict:
+        counts = np.bincount(self.kinds, minlength=len(SEGMENT_KINDS))
+        return {
+            "start_station": self.start_station,
+            "end_station": self.end_station,
+            "length": self.end_station - self.start_station,
+            "curves": len(self.curves),
+            "spiral": self.spiral,
+            "segments": {kind: int(count) for kind, count in zip(SEGMENT_KINDS, counts)},
+        }
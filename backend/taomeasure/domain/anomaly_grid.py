@@ -0,0 +1,207 @@
+"""Regular lat/lon height-anomaly grids stored as compact memory-mappable binaries.
+
+File layout: a 64-byte little-endian header (magic ``TMAG``, version, node
+origin, spacing and shape) followed by ``rows × cols`` float32 values in
+row-major order, south to north and west to east. Nodes outside the model's
+support are NaN.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import struct
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+MAGIC = b"TMAG"
+VERSION = 1
+HEADER = struct.Struct("<4sHH4d2I")
+HEADER_SIZE = 64
+MAX_NODES = 25_000_000
+SUFFIX = ".tmag"
+_GRID_ID = re.compile(r"[0-9a-f]{12}")
+_ROW_CHUNK_NODES = 262_144
+
+
+@dataclass
+class AnomalyGrid:
+    """Grid nodes at ``(lat0 + i·dlat, lon0 + j·dlon)`` with float32 anomalies."""
+
+    lat0: float
+    lon0: float
+    dlat: float
+    dlon: float
+    values: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def bounds(self) -> Dict[str, float]:
+        rows, cols = self.shape
+        return {
+            "min_lat": self.lat0,
+            "max_lat": self.lat0 + (rows - 1) * self.dlat,
+            "min_lon": self.lon0,
+            "max_lon": self.lon0 + (cols - 1) * self.dlon,
+        }
+
+    @classmethod
+    def build(
+        cls,
+        evaluate: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        bounds: Dict[str, float],
+        spacing: float,
+    ) -> "AnomalyGrid":
+        """Evaluate ``evaluate(lats, lons)`` on every node, a block of rows at a time."""
+
+        spacing = float(spacing)
+        min_lat, max_lat = float(bounds["min_lat"]), float(bounds["max_lat"])
+        min_lon, max_lon = float(bounds["min_lon"]), float(bounds["max_lon"])
+        if spacing <= 0 or max_lat <= min_lat or max_lon <= min_lon:
+            raise ValueError("格网范围或间距无效")
+        rows = int(math.ceil((max_lat - min_lat) / spacing - 1e-9)) + 1
+        cols = int(math.ceil((max_lon - min_lon) / spacing - 1e-9)) + 1
+        if rows * cols > MAX_NODES:
+            raise ValueError(f"格网节点数 {rows}×{cols} 超过上限 {MAX_NODES}，请增大格网间距")
+
+        lats = min_lat + np.arange(rows) * spacing
+        lons = min_lon + np.arange(cols) * spacing
+        values = np.empty((rows, cols), dtype=np.float32)
+        block = max(_ROW_CHUNK_NODES // cols, 1)
+        for start in range(0, rows, block):
+            grid_lat, grid_lon = np.meshgrid(lats[start:start + block], lons, indexing="ij")
+            anomalies = evaluate(grid_lat.ravel(), grid_lon.ravel())
+            values[start:start + block] = np.asarray(anomalies, dtype=float).reshape(grid_lat.shape)
+        return cls(lat0=min_lat, lon0=min_lon, dlat=spacing, dlon=spacing, values=values)
+
+    def interpolate(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Bilinear interpolation; points outside the grid or next to NaN nodes give NaN."""
+
+        rows, cols = self.shape
+        u = (np.asarray(lats, dtype=float) - self.lat0) / self.dlat
+        v = (np.asarray(lons, dtype=float) - self.lon0) / self.dlon
+        inside = (u >= 0) & (u <= rows - 1) & (v >= 0) & (v <= cols - 1)
+        i = np.clip(np.floor(np.where(inside, u, 0)).astype(np.intp), 0, max(rows - 2, 0))
+        j = np.clip(np.floor(np.where(inside, v, 0)).astype(np.intp), 0, max(cols - 2, 0))
+        fu = np.where(inside, u - i, 0.0)
+        fv = np.where(inside, v - j, 0.0)
+        i1 = np.minimum(i + 1, rows - 1)
+        j1 = np.minimum(j + 1, cols - 1)
+
+        grid = self.values
+        result = (
+            grid[i, j] * (1 - fu) * (1 - fv)
+            + grid[i1, j] * fu * (1 - fv)
+            + grid[i, j1] * (1 - fu) * fv
+            + grid[i1, j1] * fu * fv
+        ).astype(float)
+        result[~inside] = np.nan
+        return result
+
+    def header(self) -> bytes:
+        rows, cols = self.shape
+        packed = HEADER.pack(MAGIC, VERSION, 0, self.lat0, self.lon0, self.dlat, self.dlon, rows, cols)
+        return packed.ljust(HEADER_SIZE, b"\0")
+
+    def save(self, path: str) -> None:
+        """Write atomically so readers never map a half-written file."""
+
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        with open(partial, "wb") as handle:
+            handle.write(self.header())
+            handle.write(np.ascontiguousarray(self.values, dtype="<f4").tobytes())
+        os.replace(partial, path)
+
+    @classmethod
+    def open(cls, path: str) -> "AnomalyGrid":
+        """Memory-map a saved grid read-only."""
+
+        with open(path, "rb") as handle:
+            raw = handle.read(HEADER_SIZE)
+        lat0, lon0, dlat, dlon, rows, cols = cls._parse_header(raw)
+        if os.path.getsize(path) < HEADER_SIZE + 4 * rows * cols:
+            raise ValueError("格网文件长度与文件头不符")
+        values = np.memmap(path, dtype="<f4", mode="r", offset=HEADER_SIZE, shape=(rows, cols))
+        return cls(lat0=lat0, lon0=lon0, dlat=dlat, dlon=dlon, values=values)
+
+    @staticmethod
+    def _parse_header(raw: bytes) -> Tuple[float, float, float, float, int, int]:
+        if len(raw) < HEADER.size:
+            raise ValueError("格网文件头不完整")
+        magic, version, _, lat0, lon0, dlat, dlon, rows, cols = HEADER.unpack_from(raw)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("不是有效的高程异常格网文件")
+        if rows < 2 or cols < 2 or dlat <= 0 or dlon <= 0:
+            raise ValueError("格网文件头参数无效")
+        return lat0, lon0, dlat, dlon, rows, cols
+
+    def describe(self) -> Dict[str, object]:
+        rows, cols = self.shape
+        return {
+            "rows": rows,
+            "cols": cols,
+            "spacing": {"lat": self.dlat, "lon": self.dlon},
+            "bounds": self.bounds,
+            "size_bytes": HEADER_SIZE + 4 * rows * cols,
+        }
+
+
+class AnomalyGridStore:
+    """Grid files in one directory with an LRU cache of opened memory maps."""
+
+    def __init__(self, directory: str, capacity: int = 16) -> None:
+        self.directory = directory
+        self.capacity = max(int(capacity), 1)
+        self._grids: "OrderedDict[str, AnomalyGrid]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, grid_id: str) -> str:
+        if not _GRID_ID.fullmatch(str(grid_id)):
+            raise ValueError(f"无效的格网 id: {grid_id}")
+        return os.path.join(self.directory, f"{grid_id}{SUFFIX}")
+
+    def save(self, grid: AnomalyGrid) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        grid_id = uuid.uuid4().hex[:12]
+        grid.save(self.path(grid_id))
+        return grid_id
+
+    def import_bytes(self, data: bytes) -> str:
+        """Validate an uploaded grid file and store it under a new id."""
+
+        lat0, lon0, dlat, dlon, rows, cols = AnomalyGrid._parse_header(data[:HEADER_SIZE])
+        if len(data) != HEADER_SIZE + 4 * rows * cols:
+            raise ValueError("格网文件长度与文件头不符")
+        os.makedirs(self.directory, exist_ok=True)
+        grid_id = uuid.uuid4().hex[:12]
+        path = self.path(grid_id)
+        partial = f"{path}.part"
+        with open(partial, "wb") as handle:
+            handle.write(data)
+        os.replace(partial, path)
+        return grid_id
+
+    def get(self, grid_id: str) -> AnomalyGrid:
+        path = self.path(grid_id)
+        with self._lock:
+            grid = self._grids.get(grid_id)
+            if grid is not None:
+                self._grids.move_to_end(grid_id)
+                return grid
+        if not os.path.exists(path):
+            raise ValueError(f"未找到格网 {grid_id}")
+        grid = AnomalyGrid.open(path)
+        with self._lock:
+            self._grids[grid_id] = grid
+            while len(self._grids) > self.capacity:
+                self._grids.popitem(last=False)
+        return grid
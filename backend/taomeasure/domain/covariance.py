@@ -0,0 +1,164 @@
+"""Batched covariance propagation through the coordinate transformation chain.
+
+All Jacobians are evaluated in closed form for whole arrays of points and
+applied as ``J Σ Jᵀ`` with a single einsum. Geodetic covariances are expressed
+in metres along the local north/east/up axes, cartesian ones along X/Y/Z and
+grid ones along the Gauss x (north) / y (east) axes.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def covariance_from_row(raw: Dict[str, Any], axes: Sequence[str]) -> Optional[np.ndarray]:
+    """Read a per-point covariance from ``covariance`` (full matrix) or ``sigma``.
+
+    ``sigma`` may be a single number applied to every axis, a list with one
+    value per axis, or individual ``sigma_<axis>`` keys.
+    """
+
+    size = len(axes)
+    matrix = raw.get("covariance")
+    if matrix is not None:
+        values = np.asarray(matrix, dtype=float)
+        if values.shape != (size, size):
+            raise ValueError(f"协方差矩阵应为 {size}×{size}。")
+        return (values + values.T) / 2
+
+    sigma = raw.get("sigma")
+    if sigma is None:
+        per_axis = [raw.get(f"sigma_{axis}") for axis in axes]
+        if all(value is None for value in per_axis):
+            return None
+        sigma = [value or 0.0 for value in per_axis]
+    sigma_values = np.broadcast_to(np.asarray(sigma, dtype=float), (size,))
+    return np.diag(sigma_values**2)
+
+
+def stack_covariances(rows: List[Dict[str, Any]], axes: Sequence[str]) -> Optional[np.ndarray]:
+    """Collect row covariances into an (n, k, k) stack, NaN where a row has none."""
+
+    size = len(axes)
+    stack: Optional[np.ndarray] = None
+    for index, raw in enumerate(rows):
+        covariance = covariance_from_row(raw, axes)
+        if covariance is None:
+            continue
+        if stack is None:
+            stack = np.full((len(rows), size, size), np.nan)
+        stack[index] = covariance
+    return stack
+
+
+def propagate(jacobian: np.ndarray, covariance: np.ndarray) -> np.ndarray:
+    """Return ``J Σ Jᵀ`` for stacks of Jacobians and covariances."""
+
+    return np.einsum("nij,njk,nlk->nil", jacobian, covariance, jacobian)
+
+
+def local_to_cartesian_jacobian(B: np.ndarray, L: np.ndarray) -> np.ndarray:
+    """∂(X, Y, Z)/∂(n, e, u) for metric north/east/up offsets, shape (n, 3, 3).
+
+    This is ∂(X, Y, Z)/∂(B, L, H) with the B and L columns scaled by the
+    meridian (M + H) and prime-vertical ((N + H) cos B) radii, which reduces to
+    the local-to-geocentric rotation.
+    """
+
+    B_rad = np.radians(B)
+    L_rad = np.radians(L)
+    sin_B, cos_B = np.sin(B_rad), np.cos(B_rad)
+    sin_L, cos_L = np.sin(L_rad), np.cos(L_rad)
+    return np.stack(
+        (
+            np.column_stack((-sin_B * cos_L, -sin_L, cos_B * cos_L)),
+            np.column_stack((-sin_B * sin_L, cos_L, cos_B * sin_L)),
+            np.column_stack((cos_B, np.zeros_like(B_rad), sin_B)),
+        ),
+        axis=1,
+    )
+
+
+def cartesian_to_local_jacobian(B: np.ndarray, L: np.ndarray) -> np.ndarray:
+    """∂(n, e, u)/∂(X, Y, Z); the inverse of an orthonormal Jacobian is its transpose."""
+
+    return np.transpose(local_to_cartesian_jacobian(B, L), (0, 2, 1))
+
+
+def bursa_wolf_point_jacobian(params: np.ndarray) -> np.ndarray:
+    """∂(X', Y', Z')/∂(X, Y, Z) of the Bursa-Wolf model, shape (n, 3, 3)."""
+
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    rx, ry, rz, m = params[:, 3], params[:, 4], params[:, 5], params[:, 6]
+    ones = np.ones_like(rx)
+    rotation = np.stack(
+        (
+            np.column_stack((ones, -rz, ry)),
+            np.column_stack((rz, ones, -rx)),
+            np.column_stack((-ry, rx, ones)),
+        ),
+        axis=1,
+    )
+    return (1.0 + m)[:, None, None] * rotation
+
+
+def bursa_wolf_parameter_jacobian(xyz: np.ndarray) -> np.ndarray:
+    """∂(X', Y', Z')/∂(dx, dy, dz, rx, ry, rz, m), shape (n, 3, 7).
+
+    Column order matches the parameter vector of ``solve_seven_parameters``.
+    """
+
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    ones = np.ones_like(x)
+    zeros = np.zeros_like(x)
+    return np.stack(
+        (
+            np.column_stack((ones, zeros, zeros, zeros, z, -y, x)),
+            np.column_stack((zeros, ones, zeros, -z, zeros, x, y)),
+            np.column_stack((zeros, zeros, ones, y, -x, zeros, z)),
+        ),
+        axis=1,
+    )
+
+
+def gauss_jacobian(point_scale: np.ndarray, convergence_deg: np.ndarray) -> np.ndarray:
+    """∂(x, y)/∂(n, e) of the conformal Gauss projection, shape (n, 2, 2).
+
+    A conformal map scales by the point scale factor and rotates local north
+    onto the grid by the meridian convergence.
+    """
+
+    gamma = np.radians(convergence_deg)
+    cos_g, sin_g = np.cos(gamma), np.sin(gamma)
+    return point_scale[:, None, None] * np.stack(
+        (
+            np.column_stack((cos_g, sin_g)),
+            np.column_stack((-sin_g, cos_g)),
+        ),
+        axis=1,
+    )
+
+
+def covariance_columns(covariance: Optional[np.ndarray], axes: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Per-axis sigma columns plus the (n, k, k) stack, the columnar form of ``covariance_payload``."""
+
+    if covariance is None:
+        return {}
+    variances = np.diagonal(covariance, axis1=1, axis2=2)
+    columns: Dict[str, np.ndarray] = {
+        f"sigma_{axis}": np.sqrt(np.maximum(variances[:, index], 0.0)) for index, axis in enumerate(axes)
+    }
+    columns["covariance"] = covariance
+    return columns
+
+
+def covariance_payload(covariance: np.ndarray, axes: Sequence[str]) -> Dict[str, Any]:
+    """Serialise one propagated covariance as per-axis sigmas plus the full matrix."""
+
+    payload: Dict[str, Any] = {
+        f"sigma_{axis}": float(np.sqrt(max(covariance[index, index], 0.0))) for index, axis in enumerate(axes)
+    }
+    payload["covariance"] = covariance.tolist()
+    return payload
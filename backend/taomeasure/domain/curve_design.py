@@ -5,6 +5,15 @@
 import math
 from typing import List, Dict, Tuple, Optional
 
+import numpy as np
+
+from .alignment import SEGMENT_KINDS, SPIRAL_METHODS, HorizontalAlignment, clothoid
+
+# 桩号生成规则：whole 整桩号（取间距整倍数），start 自起点按间距递增
+STATION_METHODS = ('whole', 'start')
+# 单次生成桩号数上限，防止间距过小时占满内存
+MAX_STATIONS = 2_000_000
+
 
 class CurveDesign:
     """曲线测设计算类"""
@@ -128,6 +137,12 @@ class CurveDesign:
                 - azimuth_in: 进入方位角(度)，可选
                 - side_distance: 边距(m)，默认2.5
                 - test_mileages: 待测里程列表
+                - stations: 桩号生成规则，可代替 test_mileages，由服务端按间距生成桩号：
+                    interval 桩距(m)；method 为 whole（整桩号）或 start（起点递增），默认 whole；
+                    start/end 起止里程，默认曲线起终点；include_main_points 是否加入主点，
+                    默认 True；extra 需额外加桩的里程，与生成的桩号合并排序
+                - spiral_method: 缓和曲线坐标计算方式，series（级数取前两项，默认）
+                    或 fresnel（菲涅尔积分精确计算，适用于长而急的缓和曲线）
                 
         Returns:
             计算结果字典
@@ -145,12 +160,13 @@ class CurveDesign:
         azimuth_in = params.get('azimuth_in', 0)
         side_distance = params.get('side_distance', 2.5)
         test_mileages = params.get('test_mileages', [])
+        spiral_method = self._spiral_method(params)
         
         # 转换为弧度
         alpha = self.degrees_to_radians(alpha_deg)
         
         # 计算曲线要素
-        elements = self._calculate_curve_elements(alpha, R, l0)
+        elements = self._calculate_curve_elements(alpha, R, l0, spiral_method)
         
         # 计算主点里程
         main_points_mileage = self._calculate_main_points_mileage(
@@ -162,10 +178,14 @@ class CurveDesign:
             x_jd, y_jd, azimuth_in, elements, alpha
         )
         
+        # 按桩号规则生成测设里程
+        if params.get('stations') is not None:
+            test_mileages = self._station_sequence(params['stations'], main_points_mileage, test_mileages)
+        
         # 计算测设点坐标
         design_points = self._calculate_design_points(
             main_points_mileage, main_points_coords, elements,
-            test_mileages, side_distance, azimuth_in, alpha
+            test_mileages, side_distance, azimuth_in, alpha, spiral_method
         )
         
         return {
@@ -183,8 +203,8 @@ class CurveDesign:
         无缓和曲线的圆曲线测设
         
         Args:
-            params: 曲线参数字典
-                
+            params: 曲线参数字典，桩号可由 test_mileages 给出或按 stations 规则生成
+        
         Returns:
             计算结果字典
         """
@@ -217,6 +237,10 @@ class CurveDesign:
             x_jd, y_jd, azimuth_in, elements, alpha
         )
         
+        # 按桩号规则生成测设里程
+        if params.get('stations') is not None:
+            test_mileages = self._station_sequence(params['stations'], main_points_mileage, test_mileages)
+        
         # 计算测设点坐标
         design_points = self._calculate_circular_design_points(
             main_points_mileage, main_points_coords, elements,
@@ -233,19 +257,23 @@ class CurveDesign:
             'accuracy_assessment': self._assess_accuracy(params)
         }
     
-    def _calculate_curve_elements(self, alpha: float, R: float, l0: float) -> Dict:
-        """计算带缓和曲线的曲线要素"""
+    def _calculate_curve_elements(self, alpha: float, R: float, l0: float, spiral_method: str = 'series') -> Dict:
+        """计算带缓和曲线的曲线要素，内移值、切线增量与测设点采用同一缓和曲线计算方式"""
         # 缓和曲线参数
         A = math.sqrt(R * l0)  # 缓和曲线参数
         
+        # 圆曲线中央角
+        beta0 = l0 / (2 * R)  # 缓和曲线对应的圆心角
+        
+        # 内移值与切线增量由缓和曲线终点（HY）的切线坐标 x0、y0 导出，与测设点所用的
+        # 缓和曲线方程一致（p ≈ l0²/24R、q ≈ l0/2 - l0³/240R² 为其级数近似）
+        x0, y0 = self._spiral_offsets(l0, R, l0, spiral_method) if l0 > 0 else (0.0, 0.0)
+        
         # 缓和曲线内移值
-        p = l0**2 / (24 * R)
+        p = float(y0) - R * (1 - math.cos(beta0))
         
         # 缓和曲线切线增量
-        q = l0 / 2 - l0**3 / (240 * R**2)
-        
-        # 圆曲线中央角
-        beta0 = l0 / (2 * R)  # 缓和曲线对应的圆心角
+        q = float(x0) - R * math.sin(beta0)
         beta = alpha - 2 * beta0  # 圆曲线中央角
         
         # 切线长
@@ -359,16 +387,16 @@ class CurveDesign:
         x_zh = x_jd - T * math.cos(azimuth_rad)
         y_zh = y_jd - T * math.sin(azimuth_rad)
         
-        # HY点坐标（相对于ZH点）
-        x_hy_rel = q
-        y_hy_rel = p
+        # HY点坐标（缓和曲线终点，相对于ZH点的切线坐标 x0 = q + R·sinβ0、y0 = p + R(1 - cosβ0)）
+        beta0 = l0 / (2 * R)
+        x_hy_rel = q + R * math.sin(beta0)
+        y_hy_rel = p + R * (1 - math.cos(beta0))
         
         # 转换到绝对坐标系
         x_hy = x_zh + x_hy_rel * math.cos(azimuth_rad) - y_hy_rel * math.sin(azimuth_rad)
         y_hy = y_zh + x_hy_rel * math.sin(azimuth_rad) + y_hy_rel * math.cos(azimuth_rad)
         
         # 圆心坐标
-        beta0 = l0 / (2 * R)
         azimuth_hy = azimuth_rad + beta0
         
         x_center = x_hy - R * math.sin(azimuth_hy)
@@ -379,10 +407,10 @@ class CurveDesign:
         x_yh = x_center + R * math.sin(azimuth_yh)
         y_yh = y_center - R * math.cos(azimuth_yh)
         
-        # HZ点坐标
+        # HZ点坐标（自JD沿出口方位角量切线长）
         azimuth_out = azimuth_rad + alpha
-        x_hz = x_yh + q * math.cos(azimuth_out) - p * math.sin(azimuth_out)
-        y_hz = y_yh + q * math.sin(azimuth_out) + p * math.cos(azimuth_out)
+        x_hz = x_jd + T * math.cos(azimuth_out)
+        y_hz = y_jd + T * math.sin(azimuth_out)
         
         return {
             'JD': {'x': x_jd, 'y': y_jd},
@@ -424,10 +452,8 @@ class CurveDesign:
     
     def _calculate_design_points(self, main_points_mileage: Dict, main_points_coords: Dict,
                                elements: Dict, test_mileages: List[float], side_distance: float,
-                               azimuth_in: float, alpha: float) -> List[Dict]:
-        """计算测设点坐标"""
-        design_points = []
-        
+                               azimuth_in: float, alpha: float, spiral_method: str = 'series') -> List[Dict]:
+        """计算测设点坐标（按主点里程整体分段，各段成批计算）"""
         R = elements['R']
         l0 = elements['l0']
         
@@ -438,271 +464,242 @@ class CurveDesign:
         
         azimuth_rad = self.degrees_to_radians(azimuth_in)
         
-        for mileage in test_mileages:
-            if isinstance(mileage, str):
-                mileage = float(mileage)
-            
-            # 判断点位所在段落
-            if mileage < zh_mileage or mileage > hz_mileage:
-                # 直线段
-                point_coords = self._calculate_straight_point(
-                    mileage, main_points_mileage, main_points_coords, 
-                    side_distance, azimuth_in, alpha
-                )
-            elif mileage <= hy_mileage:
-                # 第一缓和曲线段
-                point_coords = self._calculate_transition_point(
-                    mileage, zh_mileage, main_points_coords['ZH'], 
-                    R, l0, side_distance, azimuth_rad, True
-                )
-            elif mileage <= yh_mileage:
-                # 圆曲线段
-                point_coords = self._calculate_circular_point(
-                    mileage, hy_mileage, main_points_coords['Center'],
-                    R, side_distance, azimuth_rad, l0 / (2 * R)
-                )
-            else:
-                # 第二缓和曲线段
-                point_coords = self._calculate_transition_point(
-                    mileage, hz_mileage, main_points_coords['HZ'],
-                    R, l0, side_distance, azimuth_rad + alpha, False
-                )
-            
-            design_points.append({
-                'mileage': mileage,
-                'center_x': point_coords['center']['x'],
-                'center_y': point_coords['center']['y'],
-                'left_x': point_coords['left']['x'],
-                'left_y': point_coords['left']['y'],
-                'right_x': point_coords['right']['x'],
-                'right_y': point_coords['right']['y']
-            })
-        
-        return design_points
+        mileages, values = self._mileage_array(test_mileages)
+        # 段号：0 ZH前直线，1 第一缓和曲线，2 圆曲线，3 第二缓和曲线，4 HZ后直线
+        segments = self._classify_mileages(
+            mileages, [zh_mileage, hy_mileage, yh_mileage, hz_mileage]
+        )
+        
+        x_center = np.empty(len(mileages))
+        y_center = np.empty(len(mileages))
+        normal_azimuth = np.empty(len(mileages))
+    
+        def assign(segment, columns):
+            mask = segments == segment
+            if mask.any():
+                x_center[mask], y_center[mask], normal_azimuth[mask] = columns(mileages[mask])
+        
+        # 直线段（出口方位角 = 入口方位角 + 转角，alpha 已为弧度并带转向符号）
+        azimuth_out = azimuth_rad + alpha
+        assign(0, lambda m: self._straight_segment(
+            zh_mileage - m, main_points_coords['ZH'], azimuth_rad, -1.0))
+        assign(4, lambda m: self._straight_segment(
+            m - hz_mileage, main_points_coords['HZ'], azimuth_out, 1.0))
+        # 第一缓和曲线段
+        assign(1, lambda m: self._transition_segment(
+            m - zh_mileage, main_points_coords['ZH'], R, l0, azimuth_rad, spiral_method))
+        # 圆曲线段
+        assign(2, lambda m: self._circular_segment(
+            m - hy_mileage, main_points_coords['Center'], R, azimuth_rad + l0 / (2 * R)))
+        # 第二缓和曲线段（自HZ逆线路方向量距）
+        assign(3, lambda m: self._transition_segment(
+            hz_mileage - m, main_points_coords['HZ'], R, l0, azimuth_rad + alpha, spiral_method, -1.0))
+        
+        return self._stake_rows(values, x_center, y_center, normal_azimuth, side_distance)
     
     def _calculate_circular_design_points(self, main_points_mileage: Dict, main_points_coords: Dict,
                                         elements: Dict, test_mileages: List[float], side_distance: float,
                                         azimuth_in: float, alpha: float) -> List[Dict]:
-        """计算无缓和曲线测设点坐标"""
-        design_points = []
-        
+        """计算无缓和曲线测设点坐标（按主点里程整体分段，各段成批计算）"""
         R = elements['R']
         zy_mileage = main_points_mileage['ZY']
         yz_mileage = main_points_mileage['YZ']
         
         azimuth_rad = self.degrees_to_radians(azimuth_in)
         
-        for mileage in test_mileages:
-            if isinstance(mileage, str):
-                mileage = float(mileage)
-            
-            # 判断点位所在段落
-            if mileage < zy_mileage or mileage > yz_mileage:
-                # 直线段
-                point_coords = self._calculate_straight_point_circular(
-                    mileage, main_points_mileage, main_points_coords,
-                    side_distance, azimuth_in, alpha
-                )
-            else:
-                # 圆曲线段
-                point_coords = self._calculate_circular_point_simple(
-                    mileage, zy_mileage, main_points_coords['Center'],
-                    R, side_distance, azimuth_rad
-                )
-            
-            design_points.append({
-                'mileage': mileage,
-                'center_x': point_coords['center']['x'],
-                'center_y': point_coords['center']['y'],
-                'left_x': point_coords['left']['x'],
-                'left_y': point_coords['left']['y'],
-                'right_x': point_coords['right']['x'],
-                'right_y': point_coords['right']['y']
-            })
-        
-        return design_points
-    
-    def _calculate_straight_point(self, mileage: float, main_points_mileage: Dict,
-                                main_points_coords: Dict, side_distance: float,
-                                azimuth_in: float, alpha: float) -> Dict:
-        """计算直线段点坐标"""
-        # 简化实现，返回基本坐标
-        zh_mileage = main_points_mileage['ZH']
-        hz_mileage = main_points_mileage['HZ']
+        mileages, values = self._mileage_array(test_mileages)
+        # 段号：0 ZY前直线，1 圆曲线，2 YZ后直线
+        segments = self._classify_mileages(mileages, [zy_mileage, yz_mileage])
         
-        azimuth_rad = self.degrees_to_radians(azimuth_in)
-        
-        if mileage < zh_mileage:
-            # ZH点前的直线段
-            distance = zh_mileage - mileage
-            x_center = main_points_coords['ZH']['x'] - distance * math.cos(azimuth_rad)
-            y_center = main_points_coords['ZH']['y'] - distance * math.sin(azimuth_rad)
-            normal_azimuth = azimuth_rad + math.pi / 2
-        else:
-            # HZ点后的直线段
-            distance = mileage - hz_mileage
-            azimuth_out = azimuth_rad + self.degrees_to_radians(alpha)
-            x_center = main_points_coords['HZ']['x'] + distance * math.cos(azimuth_out)
-            y_center = main_points_coords['HZ']['y'] + distance * math.sin(azimuth_out)
-            normal_azimuth = azimuth_out + math.pi / 2
-        
-        # 计算左右边桩坐标
-        x_left = x_center + side_distance * math.cos(normal_azimuth)
-        y_left = y_center + side_distance * math.sin(normal_azimuth)
-        x_right = x_center - side_distance * math.cos(normal_azimuth)
-        y_right = y_center - side_distance * math.sin(normal_azimuth)
+        x_center = np.empty(len(mileages))
+        y_center = np.empty(len(mileages))
+        normal_azimuth = np.empty(len(mileages))
+    
+        def assign(segment, columns):
+            mask = segments == segment
+            if mask.any():
+                x_center[mask], y_center[mask], normal_azimuth[mask] = columns(mileages[mask])
         
-        return {
-            'center': {'x': x_center, 'y': y_center},
-            'left': {'x': x_left, 'y': y_left},
-            'right': {'x': x_right, 'y': y_right}
-        }
+        azimuth_out = azimuth_rad + alpha
+        assign(0, lambda m: self._straight_segment(
+            zy_mileage - m, main_points_coords['ZY'], azimuth_rad, -1.0))
+        assign(2, lambda m: self._straight_segment(
+            m - yz_mileage, main_points_coords['YZ'], azimuth_out, 1.0))
+        assign(1, lambda m: self._circular_segment(
+            m - zy_mileage, main_points_coords['Center'], R, azimuth_rad))
+        
+        return self._stake_rows(values, x_center, y_center, normal_azimuth, side_distance)
     
-    def _calculate_straight_point_circular(self, mileage: float, main_points_mileage: Dict,
-                                         main_points_coords: Dict, side_distance: float,
-                                         azimuth_in: float, alpha: float) -> Dict:
-        """计算无缓和曲线直线段点坐标"""
-        zy_mileage = main_points_mileage['ZY']
-        yz_mileage = main_points_mileage['YZ']
+    def _mileage_array(self, test_mileages: List[float]) -> Tuple[np.ndarray, List[float]]:
+        """待测里程转为数组；字符串里程转为浮点数，其余原样用于输出"""
+        if isinstance(test_mileages, np.ndarray):
+            return test_mileages, test_mileages.tolist()
+        values = [float(mileage) if isinstance(mileage, str) else mileage for mileage in test_mileages]
+        return np.asarray(values, dtype=float).reshape(-1), values
+    
+    def _station_sequence(self, spec: Dict, main_points_mileage: Dict,
+                          extra: Optional[List[float]] = None) -> np.ndarray:
+        """
+        按桩号规则在服务端生成测设里程数组
         
-        azimuth_rad = self.degrees_to_radians(azimuth_in)
+        Args:
+            spec: 桩号规则，含 interval、method、start、end、include_main_points、extra
+            main_points_mileage: 主点里程，起止里程默认取首末主点（ZH/HZ 或 ZY/YZ）
+            extra: 请求中同时给出的 test_mileages，作为额外加桩合并
         
-        if mileage < zy_mileage:
-            # ZY点前的直线段
-            distance = zy_mileage - mileage
-            x_center = main_points_coords['ZY']['x'] - distance * math.cos(azimuth_rad)
-            y_center = main_points_coords['ZY']['y'] - distance * math.sin(azimuth_rad)
-            normal_azimuth = azimuth_rad + math.pi / 2
+        Returns:
+            升序且去除重合（相差不足1mm）的里程数组
+        """
+        if not isinstance(spec, dict):
+            raise ValueError('stations 应为桩号规则对象')
+        
+        def number(key: str, default: float, label: str) -> float:
+            # 显式给出 null 与缺省相同
+            value = spec.get(key)
+            if value is None:
+                return default
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f'{label} {key} 必须为数值')
+        
+        interval = number('interval', 20.0, '桩距')
+        if not math.isfinite(interval) or interval <= 0:
+            raise ValueError('桩距 interval 必须大于0')
+        method = spec.get('method') or 'whole'
+        if method not in STATION_METHODS:
+            raise ValueError(f'不支持的桩号生成方式: {method}')
+        
+        curve_points = {key: value for key, value in main_points_mileage.items() if key != 'JD'}
+        start = number('start', min(curve_points.values()), '起始里程')
+        end = number('end', max(curve_points.values()), '终止里程')
+        if not (math.isfinite(start) and math.isfinite(end)):
+            raise ValueError('起止里程必须为有限数值')
+        if end < start:
+            raise ValueError('终止里程不能小于起始里程')
+        
+        tolerance = 1e-3
+        if method == 'whole':
+            first = math.ceil((start - tolerance) / interval)
+            last = math.floor((end + tolerance) / interval)
         else:
-            # YZ点后的直线段
-            distance = mileage - yz_mileage
-            azimuth_out = azimuth_rad + self.degrees_to_radians(alpha)
-            x_center = main_points_coords['YZ']['x'] + distance * math.cos(azimuth_out)
-            y_center = main_points_coords['YZ']['y'] + distance * math.sin(azimuth_out)
-            normal_azimuth = azimuth_out + math.pi / 2
-        
-        # 计算左右边桩坐标
-        x_left = x_center + side_distance * math.cos(normal_azimuth)
-        y_left = y_center + side_distance * math.sin(normal_azimuth)
-        x_right = x_center - side_distance * math.cos(normal_azimuth)
-        y_right = y_center - side_distance * math.sin(normal_azimuth)
+            first, last = 0, math.floor((end - start) / interval + 1e-9)
+        if last - first + 1 > MAX_STATIONS:
+            raise ValueError(f'生成的桩号数超过上限 {MAX_STATIONS}，请增大桩距或缩短区间')
+        stations = np.arange(first, last + 1, dtype=float) * interval
+        if method == 'start':
+            stations += start
         
-        return {
-            'center': {'x': x_center, 'y': y_center},
-            'left': {'x': x_left, 'y': y_left},
-            'right': {'x': x_right, 'y': y_right}
-        }
+        try:
+            additions = [np.asarray(spec.get('extra') or [], dtype=float).reshape(-1)]
+            if extra:
+                additions.append(np.asarray([float(mileage) for mileage in extra]))
+        except (TypeError, ValueError):
+            raise ValueError('加桩里程必须为数值')
+        if spec.get('include_main_points', True):
+            additions.append(np.asarray(list(curve_points.values()), dtype=float))
+        merged = np.sort(np.concatenate([stations] + additions))
+        if len(merged) == 0:
+            return merged
+        # 加桩与生成的桩号重合时只保留一个
+        keep = np.concatenate(([True], np.diff(merged) >= tolerance))
+        return merged[keep]
     
-    def _calculate_transition_point(self, mileage: float, start_mileage: float,
-                                  start_coords: Dict, R: float, l0: float,
-                                  side_distance: float, azimuth: float, is_first: bool) -> Dict:
-        """计算缓和曲线段点坐标 - 修正版"""
-        if is_first:
-            distance = mileage - start_mileage
-        else:
-            distance = start_mileage - mileage
-        
-        l = distance
-        l2 = l * l
-        l3 = l2 * l
-        l5 = l3 * l2
-        l7 = l5 * l2
-        
-        R2 = R * R
-        R3 = R2 * R
-        l02 = l0 * l0
-        l03 = l02 * l0
+    def _classify_mileages(self, mileages: np.ndarray, stations: List[float]) -> np.ndarray:
+        """
+        按主点里程一次性划分各待测里程所在段落
         
-        # 标准缓和曲线参数方程 - 修正版
-        # x = l - l⁵/(40R²l0²) + l⁹/(3456R⁴l0⁴) - 取前两项
-        x_rel = l - l5 / (40 * R2 * l02)
+        与逐点判断一致：小于起点里程为 0，大于终点里程为 len(stations)，其余取首个
+        里程不小于该点的主点序号 i（起点里程本身归入第一段曲线）。主点里程取累计
+        最大值后单调，转向角为负时主点里程逆序也可直接用 searchsorted 划分。
+        """
+        stations = np.asarray(stations, dtype=float)
+        segments = np.searchsorted(np.maximum.accumulate(stations[1:]), mileages, side='left') + 1
+        segments[mileages > stations[-1]] = len(stations)
+        segments[mileages < stations[0]] = 0
+        return segments
+    
+    def _straight_segment(self, distance: np.ndarray, start_coords: Dict,
+                          azimuth: float, direction: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """直线段中桩坐标与法线方位角；direction 为 -1 时自起点逆方位角方向量距"""
+        x_center = start_coords['x'] + direction * distance * math.cos(azimuth)
+        y_center = start_coords['y'] + direction * distance * math.sin(azimuth)
+        normal_azimuth = np.full(len(distance), azimuth + math.pi / 2)
+        return x_center, y_center, normal_azimuth
+    
+    def _transition_segment(self, l: np.ndarray, start_coords: Dict, R: float, l0: float,
+                            azimuth: float, spiral_method: str = 'series',
+                            direction: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        缓和曲线段中桩坐标与法线方位角，l 为至缓和曲线起点（ZH/HZ）的曲线长
         
-        # y = l³/(6Rl0) - l⁷/(336R³l0³) + ... - 取前两项
-        y_rel = l3 / (6 * R * l0) - l7 / (336 * R3 * l03)
+        direction 为 -1 时自 HZ 逆出口方位角方向量距（第二缓和曲线），曲线仍偏向圆心一侧。
+        """
+        x_rel, y_rel = self._spiral_offsets(l, R, l0, spiral_method)
         
         # 转换到绝对坐标系
-        x_center = start_coords['x'] + x_rel * math.cos(azimuth) - y_rel * math.sin(azimuth)
-        y_center = start_coords['y'] + x_rel * math.sin(azimuth) + y_rel * math.cos(azimuth)
+        x_center = start_coords['x'] + direction * x_rel * math.cos(azimuth) - y_rel * math.sin(azimuth)
+        y_center = start_coords['y'] + direction * x_rel * math.sin(azimuth) + y_rel * math.cos(azimuth)
         
         # 法线方向（规范化处理）
-        tangent_azimuth = self.normalize_azimuth(azimuth + l2 / (2 * R * l0))
-        normal_azimuth = self.normalize_azimuth(tangent_azimuth + math.pi / 2)
-        
-        # 计算左右边桩坐标
-        x_left = x_center + side_distance * math.cos(normal_azimuth)
-        y_left = y_center + side_distance * math.sin(normal_azimuth)
-        x_right = x_center - side_distance * math.cos(normal_azimuth)
-        y_right = y_center - side_distance * math.sin(normal_azimuth)
-        
-        return {
-            'center': {'x': x_center, 'y': y_center},
-            'left': {'x': x_left, 'y': y_left},
-            'right': {'x': x_right, 'y': y_right}
-        }
+        tangent_azimuth = np.mod(azimuth + direction * l * l / (2 * R * l0), 2 * math.pi)
+        normal_azimuth = np.mod(tangent_azimuth + math.pi / 2, 2 * math.pi)
+        return x_center, y_center, normal_azimuth
     
-    def _calculate_circular_point(self, mileage: float, start_mileage: float,
-                                center_coords: Dict, R: float, side_distance: float,
-                                start_azimuth: float, beta0: float) -> Dict:
-        """计算圆曲线段点坐标"""
-        # 弧长
-        arc_length = mileage - start_mileage
-        
-        # 圆心角
-        central_angle = arc_length / R
-        
+    def _spiral_offsets(self, l, R: float, l0: float, spiral_method: str = 'series'):
+        """缓和曲线上曲线长 l 处沿、垂直于起点切线的坐标 (x, y)"""
+        l2 = l * l
+        if spiral_method == 'fresnel':
+            # 菲涅尔积分精确计算，不受缓和曲线角大小限制
+            x_rel, y_rel = clothoid(l, R, l0, 'fresnel')
+        else:
+            l3 = l2 * l
+            l5 = l3 * l2
+            l7 = l5 * l2
+            
+            R2 = R * R
+            R3 = R2 * R
+            l02 = l0 * l0
+            l03 = l02 * l0
+            
+            # 标准缓和曲线参数方程 - 修正版
+            # x = l - l⁵/(40R²l0²) + l⁹/(3456R⁴l0⁴) - 取前两项
+            x_rel = l - l5 / (40 * R2 * l02)
+            
+            # y = l³/(6Rl0) - l⁷/(336R³l0³) + ... - 取前两项
+            y_rel = l3 / (6 * R * l0) - l7 / (336 * R3 * l03)
+        return x_rel, y_rel
+    
+    def _circular_segment(self, arc_length: np.ndarray, center_coords: Dict, R: float,
+                          start_azimuth: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """圆曲线段中桩坐标与法线方位角，arc_length 为至圆曲线起点（HY/ZY）的弧长"""
         # 点在圆上的方位角（规范化处理）
-        point_azimuth = self.normalize_azimuth(start_azimuth + beta0 + central_angle)
+        point_azimuth = np.mod(start_azimuth + arc_length / R, 2 * math.pi)
         
         # 中桩坐标
-        x_center = center_coords['x'] + R * math.sin(point_azimuth)
-        y_center = center_coords['y'] - R * math.cos(point_azimuth)
+        x_center = center_coords['x'] + R * np.sin(point_azimuth)
+        y_center = center_coords['y'] - R * np.cos(point_azimuth)
         
         # 法线方向（指向圆心的反方向）
-        normal_azimuth = self.normalize_azimuth(point_azimuth + math.pi / 2)
-        
-        # 计算左右边桩坐标
-        x_left = x_center + side_distance * math.cos(normal_azimuth)
-        y_left = y_center + side_distance * math.sin(normal_azimuth)
-        x_right = x_center - side_distance * math.cos(normal_azimuth)
-        y_right = y_center - side_distance * math.sin(normal_azimuth)
-        
-        return {
-            'center': {'x': x_center, 'y': y_center},
-            'left': {'x': x_left, 'y': y_left},
-            'right': {'x': x_right, 'y': y_right}
-        }
+        normal_azimuth = np.mod(point_azimuth + math.pi / 2, 2 * math.pi)
+        return x_center, y_center, normal_azimuth
     
-    def _calculate_circular_point_simple(self, mileage: float, start_mileage: float,
-                                       center_coords: Dict, R: float, side_distance: float,
-                                       start_azimuth: float) -> Dict:
-        """计算无缓和曲线圆曲线段点坐标"""
-        # 弧长
-        arc_length = mileage - start_mileage
-        
-        # 圆心角
-        central_angle = arc_length / R
-        
-        # 点在圆上的方位角（规范化处理）
-        point_azimuth = self.normalize_azimuth(start_azimuth + central_angle)
-        
-        # 中桩坐标
-        x_center = center_coords['x'] + R * math.sin(point_azimuth)
-        y_center = center_coords['y'] - R * math.cos(point_azimuth)
-        
-        # 法线方向
-        normal_azimuth = self.normalize_azimuth(point_azimuth + math.pi / 2)
-        
-        # 计算左右边桩坐标
-        x_left = x_center + side_distance * math.cos(normal_azimuth)
-        y_left = y_center + side_distance * math.sin(normal_azimuth)
-        x_right = x_center - side_distance * math.cos(normal_azimuth)
-        y_right = y_center - side_distance * math.sin(normal_azimuth)
-        
-        return {
-            'center': {'x': x_center, 'y': y_center},
-            'left': {'x': x_left, 'y': y_left},
-            'right': {'x': x_right, 'y': y_right}
-        }
+    def _stake_rows(self, values: List[float], x_center: np.ndarray, y_center: np.ndarray,
+                    normal_azimuth: np.ndarray, side_distance: float) -> List[Dict]:
+        """由中桩坐标与法线方位角按列计算左右边桩，组装测设点列表"""
+        dx = side_distance * np.cos(normal_azimuth)
+        dy = side_distance * np.sin(normal_azimuth)
+        columns = zip(
+            values,
+            x_center.tolist(), y_center.tolist(),
+            (x_center + dx).tolist(), (y_center + dy).tolist(),
+            (x_center - dx).tolist(), (y_center - dy).tolist()
+        )
+        return [
+            {'mileage': mileage, 'center_x': cx, 'center_y': cy,
+             'left_x': lx, 'left_y': ly, 'right_x': rx, 'right_y': ry}
+            for mileage, cx, cy, lx, ly, rx, ry in columns
+        ]
     
     def _assess_accuracy(self, params: Dict) -> Dict:
         """精度评定"""
@@ -731,6 +728,102 @@ class CurveDesign:
         else:
             return "低精度"
     
+    def alignment_design(self, params: Dict) -> Dict:
+        """
+        多交点平面线形测设
+        
+        Args:
+            params: 线形参数字典
+                - points: 按线路走向排列的点列表，首末为起终点，中间为交点（JD），
+                    各点含 x/y，交点另含 R 与 l0（或 l0_in/l0_out），可选 name
+                - start_mileage: 起点里程(m)，默认0
+                - side_distance: 边距(m)，默认2.5
+                - test_mileages / stations: 待测里程列表或桩号生成规则，同 transition_curve_design
+                - spiral_method: 缓和曲线计算方式 series / fresnel，同 transition_curve_design
+        
+        Returns:
+            计算结果字典
+        """
+        alignment = self._build_alignment(params)
+        side_distance = params.get('side_distance', 2.5)
+        test_mileages = params.get('test_mileages', [])
+        
+        main_points_mileage = alignment.main_points()
+        if params.get('stations') is not None:
+            test_mileages = self._station_sequence(params['stations'], main_points_mileage, test_mileages)
+        
+        mileages, values = self._mileage_array(test_mileages)
+        x_center, y_center, azimuth = alignment.locate(mileages)
+        design_points = self._stake_rows(values, x_center, y_center, azimuth + math.pi / 2, side_distance)
+        
+        return {
+            'curve_type': 'alignment',
+            'input_params': params,
+            'alignment': alignment.describe(),
+            'curves': alignment.curves,
+            'main_points_mileage': main_points_mileage,
+            'design_points': design_points,
+            'accuracy_assessment': self._assess_accuracy(params)
+        }
+    
+    def alignment_projection(self, params: Dict) -> Dict:
+        """
+        实测点反算里程与偏距（竣工检测、图面标注）
+        
+        Args:
+            params: 参数字典
+                - points / start_mileage: 线形定义，同 alignment_design
+                - survey_points: 实测点列表，含 x/y，可选 name
+                - candidates: 每点参与迭代的候选采样点数，默认4
+        
+        Returns:
+            各点里程、偏距（线路前进方向右侧为正）、所在线元类型及切向残差
+        """
+        alignment = self._build_alignment(params)
+        survey_points = params.get('survey_points')
+        if not isinstance(survey_points, list) or not survey_points:
+            raise ValueError('survey_points 应为非空的实测点列表')
+        try:
+            x = np.array([float(point['x']) for point in survey_points])
+            y = np.array([float(point['y']) for point in survey_points])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('实测点须包含数值坐标 x、y')
+        
+        projected = alignment.project(x, y, int(params.get('candidates', 4)))
+        columns = zip(
+            survey_points,
+            projected['station'].tolist(),
+            projected['offset'].tolist(),
+            projected['segment'].tolist(),
+            projected['residual'].tolist()
+        )
+        results = [
+            {'name': point.get('name'), 'x': point['x'], 'y': point['y'], 'mileage': station,
+             'offset': offset, 'segment': SEGMENT_KINDS[segment], 'residual': residual}
+            for point, station, offset, segment, residual in columns
+        ]
+        return {
+            'curve_type': 'alignment',
+            'alignment': alignment.describe(),
+            'results': results
+        }
+    
+    def _build_alignment(self, params: Dict) -> HorizontalAlignment:
+        """由参数中的点列表、起点里程与缓和曲线计算方式建立平面线形"""
+        points = params.get('points')
+        if not isinstance(points, list):
+            raise ValueError('points 应为按线路走向排列的点列表')
+        return HorizontalAlignment.from_points(
+            points, float(params.get('start_mileage', 0)), self._spiral_method(params)
+        )
+    
+    def _spiral_method(self, params: Dict) -> str:
+        """请求指定的缓和曲线坐标计算方式，默认级数展开"""
+        method = params.get('spiral_method', 'series')
+        if method not in SPIRAL_METHODS:
+            raise ValueError(f'不支持的缓和曲线计算方式: {method}')
+        return method
+    
     def compound_curve_design(self, params: Dict) -> Dict:
         """
         复曲线测设
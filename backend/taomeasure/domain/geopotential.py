@@ -0,0 +1,375 @@
+"""Spherical-harmonic geopotential models read from ICGEM ``.gfc`` coefficient files.
+
+Height anomalies are ζ = T / γ on the reference ellipsoid: T is the model
+potential minus the normal potential of the ellipsoid, γ its normal gravity.
+Evaluation is batched by latitude row. For a block of distinct latitudes the
+fully-normalised Legendre functions are recursed once over degree and reduced
+to per-order sums; the sum over order is then taken per point with
+Clenshaw's recurrence in longitude. Points sharing a latitude (grid rows)
+share one recursion.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+NORMAL_FIELDS: Dict[str, Dict[str, float]] = {
+    "CGCS2000": {"a": 6378137.0, "f_inverse": 298.257222101, "gm": 3.986004418e14, "omega": 7.292115e-5},
+    "GRS80": {"a": 6378137.0, "f_inverse": 298.257222101, "gm": 3.986005e14, "omega": 7.292115e-5},
+    "WGS84": {"a": 6378137.0, "f_inverse": 298.257223563, "gm": 3.986004418e14, "omega": 7.292115e-5},
+}
+
+SUFFIX = ".gfc"
+_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+_PARSE_LINES = 200_000
+_ROW_BLOCK = 64
+# 扩展指数的步长：尾数保持在 2^±240 内，指数每级 2^480
+_SCALE = 2.0**480
+_SCALE_BITS = 480
+_SCALE_LIMIT = 2.0**240
+
+
+@dataclass(frozen=True)
+class NormalField:
+    """Level-ellipsoid normal gravity field (Moritz closed forms)."""
+
+    a: float
+    f: float
+    gm: float
+    omega: float
+
+    @classmethod
+    def named(cls, name: str) -> "NormalField":
+        params = NORMAL_FIELDS.get(name)
+        if params is None:
+            raise ValueError(f"未支持的参考椭球: {name}")
+        return cls(a=params["a"], f=1 / params["f_inverse"], gm=params["gm"], omega=params["omega"])
+
+    @property
+    def b(self) -> float:
+        return self.a * (1 - self.f)
+
+    @property
+    def e2(self) -> float:
+        return self.f * (2 - self.f)
+
+    def _constants(self) -> Tuple[float, float, float, float]:
+        ep2 = self.e2 / (1 - self.e2)
+        ep = math.sqrt(ep2)
+        q0 = 0.5 * ((1 + 3 / ep2) * math.atan(ep) - 3 / ep)
+        q0_prime = 3 * (1 + 1 / ep2) * (1 - math.atan(ep) / ep) - 1
+        m = self.omega**2 * self.a**2 * self.b / self.gm
+        return ep, q0, q0_prime, m
+
+    def zonal(self, max_degree: int, gm: float, radius: float) -> np.ndarray:
+        """Fully-normalised C̄ₙ₀ of the normal potential, rescaled to the model's GM and radius."""
+
+        ep, q0, _, m = self._constants()
+        e2 = self.e2
+        j2 = e2 / 3 * (1 - 2 / 15 * m * ep / q0)
+        zonal = np.zeros(max_degree + 1)
+        for k in range(1, max_degree // 2 + 1):
+            j2n = (-1) ** (k + 1) * 3 * e2**k / ((2 * k + 1) * (2 * k + 3)) * (1 - k + 5 * k * j2 / e2)
+            zonal[2 * k] = -j2n / math.sqrt(4 * k + 1) * (self.gm / gm) * (self.a / radius) ** (2 * k)
+        return zonal
+
+    def gravity(self, lats: np.ndarray) -> np.ndarray:
+        """Somigliana normal gravity on the ellipsoid at geodetic latitudes (degrees)."""
+
+        ep, q0, q0_prime, m = self._constants()
+        gamma_a = self.gm / (self.a * self.b) * (1 - m - m * ep * q0_prime / (6 * q0))
+        gamma_b = self.gm / self.a**2 * (1 + m * ep * q0_prime / (3 * q0))
+        phi = np.radians(lats)
+        cos2, sin2 = np.cos(phi) ** 2, np.sin(phi) ** 2
+        return (self.a * gamma_a * cos2 + self.b * gamma_b * sin2) / np.sqrt(self.a**2 * cos2 + self.b**2 * sin2)
+
+    def geocentric(self, lats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Geocentric latitude (radians) and radius of ellipsoid-surface points."""
+
+        phi = np.radians(lats)
+        prime = self.a / np.sqrt(1 - self.e2 * np.sin(phi) ** 2)
+        x = prime * np.cos(phi)
+        z = prime * (1 - self.e2) * np.sin(phi)
+        return np.arctan2(z, x), np.hypot(x, z)
+
+
+def _parse_block(lines: List[str], limit: Optional[int]) -> np.ndarray:
+    """``(rows, 4)`` array of n, m, C, S for one block of coefficient lines."""
+
+    # EGM2008 等 Fortran 输出使用 D 指数
+    text = "".join(lines).replace("D", "E").replace("d", "e")
+    keyword = lines[0].split()[0]
+    columns = (1, 2, 3, 4) if keyword.isalpha() else (0, 1, 2, 3)
+    try:
+        block = np.loadtxt(io.StringIO(text), usecols=columns, ndmin=2)
+    except ValueError as exc:
+        raise ValueError(f"重力场系数行格式错误: {exc}") from exc
+    return block if limit is None else block[block[:, 0] <= limit]
+
+
+@dataclass
+class GeopotentialModel:
+    """Fully-normalised Stokes coefficients ``C[n, m]``, ``S[n, m]`` up to ``max_degree``."""
+
+    name: str
+    gm: float
+    radius: float
+    max_degree: int
+    C: np.ndarray = field(repr=False)
+    S: np.ndarray = field(repr=False)
+    tide_system: Optional[str] = None
+    _cache: Dict[str, Tuple[NormalField, np.ndarray, np.ndarray]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def load(cls, path: str, max_degree: Optional[int] = None, name: Optional[str] = None) -> "GeopotentialModel":
+        """Read a ``.gfc`` file, keeping degrees up to ``max_degree``.
+
+        Header keywords (``earth_gravity_constant``, ``radius``, ``max_degree``,
+        ``norm``, ``tide_system``) are optional; files without a header are
+        taken as ``n m C S …`` lines with EGM2008's GM and radius.
+        """
+
+        limit = int(max_degree) if max_degree else None
+        header: Dict[str, str] = {}
+        blocks: List[np.ndarray] = []
+        pending: List[str] = []
+        in_header = True
+        with open(path, "r", encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                tokens = line.split()
+                if not tokens:
+                    continue
+                if in_header:
+                    if tokens[0] == "end_of_head":
+                        in_header = False
+                        continue
+                    if not (tokens[0] == "gfc" or tokens[0][0].isdigit()):
+                        header[tokens[0].lower()] = tokens[1] if len(tokens) > 1 else ""
+                        continue
+                    in_header = False
+                if tokens[0].isalpha() and tokens[0] != "gfc":
+                    raise ValueError(f"暂不支持时变重力场系数: {tokens[0]}")
+                pending.append(line)
+                if len(pending) >= _PARSE_LINES:
+                    blocks.append(_parse_block(pending, limit))
+                    pending = []
+        if pending:
+            blocks.append(_parse_block(pending, limit))
+        if header.get("norm", "fully_normalized") != "fully_normalized":
+            raise ValueError("仅支持完全规格化的位系数")
+        data = np.concatenate(blocks) if blocks else np.empty((0, 4))
+        if not len(data):
+            raise ValueError("重力场模型文件中没有位系数")
+
+        degrees = data[:, 0].astype(np.int64)
+        orders = data[:, 1].astype(np.int64)
+        if (orders < 0).any() or (orders > degrees).any():
+            raise ValueError("位系数阶次 m 必须满足 0 ≤ m ≤ n")
+        top = int(degrees.max())
+        if top < 2:
+            raise ValueError("重力场模型至少需要 2 阶系数")
+        C = np.zeros((top + 1, top + 1))
+        S = np.zeros((top + 1, top + 1))
+        C[degrees, orders] = data[:, 2]
+        S[degrees, orders] = data[:, 3]
+
+        def number(key: str, default: float) -> float:
+            return float(header[key].replace("D", "E").replace("d", "e")) if key in header else default
+
+        return cls(
+            name=name or os.path.splitext(os.path.basename(path))[0],
+            gm=number("earth_gravity_constant", 3.986004415e14),
+            radius=number("radius", 6378136.3),
+            max_degree=top,
+            C=C,
+            S=S,
+            tide_system=header.get("tide_system"),
+        )
+
+    def _disturbing(self, ellipsoid: str) -> Tuple[NormalField, np.ndarray, np.ndarray]:
+        """Coefficients of the disturbing potential T, cached per reference ellipsoid."""
+
+        cached = self._cache.get(ellipsoid)
+        if cached is None:
+            normal = NormalField.named(ellipsoid)
+            C = self.C.copy()
+            C[:, 0] -= normal.zonal(self.max_degree, self.gm, self.radius)
+            # 零阶项单独按 GM 差计算；一阶项在地心坐标系中为零
+            C[:2] = 0.0
+            S = self.S.copy()
+            S[:2] = 0.0
+            cached = (normal, C, S)
+            self._cache[ellipsoid] = cached
+        return cached
+
+    def _order_sums(self, lats: np.ndarray, C: np.ndarray, S: np.ndarray, normal: NormalField):
+        """Per-row sums Σₙ (a/r)ⁿ C̄ₙₘ P̄ₙₘ(sin φ̄) and the S̄ counterpart, shape ``(rows, N + 1)``.
+
+        Legendre columns are carried as mantissa × 2^(480·e) so high-order
+        sectorals at high latitude underflow gracefully; only terms whose
+        exponent has reached zero contribute.
+        """
+
+        N = self.max_degree
+        phi, r = normal.geocentric(lats)
+        t = np.sin(phi)[:, None]
+        u = np.maximum(np.cos(phi), 1e-300)
+        q = self.radius / r
+
+        orders = np.arange(N + 1)
+        sectoral = np.concatenate([[0.0], np.cumsum(0.5 * np.log2((2 * orders[1:] + 1) / (2 * orders[1:])))])
+        sectoral[1:] += 0.5  # P̄₁₁ = √3·u，而上面的累加从 √(3/2) 起
+        log_seed = orders[None, :] * np.log2(u)[:, None] + sectoral[None, :]
+        seed_exp = np.minimum(np.floor((log_seed + 240) / _SCALE_BITS), 0)
+        seed = np.exp2(log_seed - _SCALE_BITS * seed_exp)
+        # 第 low 列之前的各列指数均已归零
+        negative = (seed_exp < 0).any(axis=0)
+        low = int(np.argmax(negative)) if negative.any() else N + 1
+
+        rows = len(lats)
+        A = np.zeros((rows, N + 1))
+        B = np.zeros((rows, N + 1))
+        # 三个缓冲区轮换：P̄ₙ₋₂ 的缓冲区原地改写为 P̄ₙ
+        prev2 = np.zeros((rows, N + 1))
+        prev1 = np.zeros((rows, N + 1))
+        scratch = np.empty((rows, N + 1))
+        exponent = np.zeros((rows, N + 1))
+        power = np.ones((rows, 1))
+        for n in range(N + 1):
+            current = prev2[:, : n + 1]
+            if n:
+                m = orders[:n]
+                a_nm = np.sqrt((2 * n - 1) * (2 * n + 1) / ((n - m) * (n + m)))
+                b_nm = np.sqrt(
+                    (2 * n + 1) * np.maximum(n + m - 1, 0) * np.maximum(n - m - 1, 0)
+                    / ((n - m) * (n + m) * max(2 * n - 3, 1))
+                )
+                work = scratch[:, :n]
+                np.multiply(t, a_nm, out=work)
+                work *= prev1[:, :n]
+                current[:, :n] *= -b_nm
+                current[:, :n] += work
+            current[:, n] = seed[:, n]
+            exponent[:, n] = seed_exp[:, n]
+
+            scaled = None
+            if low <= n:
+                block = slice(low, n + 1)
+                scaled = exponent[:, block] < 0
+                grown = scaled & (np.abs(current[:, block]) > _SCALE_LIMIT)
+                if grown.any():
+                    current[:, block][grown] /= _SCALE
+                    prev1[:, block][grown] /= _SCALE
+                    exponent[:, block][grown] += 1
+                    scaled = exponent[:, block] < 0
+                pending = scaled.any(axis=0)
+                low = low + int(np.argmax(pending)) if pending.any() else n + 1
+            if n >= 2:
+                weighted = np.multiply(current, power, out=scratch[:, : n + 1])
+                if scaled is not None:
+                    weighted[:, block][scaled] = 0.0
+                A[:, : n + 1] += weighted * C[n, : n + 1]
+                B[:, : n + 1] += weighted * S[n, : n + 1]
+            prev2, prev1 = prev1, prev2
+            power = power * q[:, None]
+        return A, B, r
+
+    def height_anomaly(self, lats: np.ndarray, lons: np.ndarray, ellipsoid: str = "CGCS2000") -> np.ndarray:
+        """Model height anomalies (metres) at geodetic ``lats``/``lons`` (degrees) on the ellipsoid.
+
+        The zero-degree term (GM difference) is included; the W₀ − U₀ offset is
+        not, so pure model anomalies may carry a constant bias that a
+        remove–compute–restore fit absorbs.
+        """
+
+        lats = np.asarray(lats, dtype=float).reshape(-1)
+        lons = np.asarray(lons, dtype=float).reshape(-1)
+        normal, C, S = self._disturbing(ellipsoid)
+        unique, inverse = np.unique(lats, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(0, len(unique) + _ROW_BLOCK, _ROW_BLOCK))
+
+        result = np.empty(len(lats))
+        for block, start in enumerate(range(0, len(unique), _ROW_BLOCK)):
+            A, B, r = self._order_sums(unique[start:start + _ROW_BLOCK], C, S, normal)
+            points = order[bounds[block]:bounds[block + 1]]
+            rows = inverse[points] - start
+            result[points] = self.gm / r[rows] * _clenshaw(A, B, rows, np.radians(lons[points]))
+
+        gamma = normal.gravity(lats)
+        _, radius = normal.geocentric(lats)
+        return (result + (self.gm - normal.gm) / radius) / gamma
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "max_degree": self.max_degree,
+            "earth_gravity_constant": self.gm,
+            "radius": self.radius,
+            "tide_system": self.tide_system,
+        }
+
+
+def _clenshaw(A: np.ndarray, B: np.ndarray, rows: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Σₘ Aₘ cos mλ + Bₘ sin mλ per point by Clenshaw's backward recurrence."""
+
+    cos_l = np.cos(lons)
+    twice = 2 * cos_l
+    c1 = np.zeros(len(lons))
+    c2 = np.zeros(len(lons))
+    s1 = np.zeros(len(lons))
+    s2 = np.zeros(len(lons))
+    for m in range(A.shape[1] - 1, 0, -1):
+        c1, c2 = A[rows, m] + twice * c1 - c2, c1
+        s1, s2 = B[rows, m] + twice * s1 - s2, s1
+    return A[rows, 0] + c1 * cos_l - c2 + s1 * np.sin(lons)
+
+
+class GeopotentialStore:
+    """``<name>.gfc`` files in one directory with an LRU cache of loaded (name, degree) models."""
+
+    def __init__(self, directory: Optional[str], capacity: int = 2) -> None:
+        self.directory = directory
+        self.capacity = max(int(capacity), 1)
+        self._models: "OrderedDict[Tuple[str, Optional[int]], GeopotentialModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        if not self.directory:
+            raise ValueError("未配置重力场模型目录（TAOMEASURE_GPS_GEOID_DIR）")
+        if not _NAME.fullmatch(str(name)):
+            raise ValueError(f"无效的重力场模型名称: {name}")
+        return os.path.join(self.directory, f"{name}{SUFFIX}")
+
+    def names(self) -> List[str]:
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        return sorted(entry[: -len(SUFFIX)] for entry in os.listdir(self.directory) if entry.endswith(SUFFIX))
+
+    def get(self, name: str, max_degree: Optional[int] = None) -> GeopotentialModel:
+        path = self.path(name)
+        key = (name, int(max_degree) if max_degree else None)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+        if not os.path.exists(path):
+            raise ValueError(f"未找到重力场模型 {name}，可用模型: {', '.join(self.names()) or '无'}")
+        model = GeopotentialModel.load(path, key[1], name=name)
+        with self._lock:
+            self._models[key] = model
+            while len(self._models) > self.capacity:
+                self._models.popitem(last=False)
+        return model
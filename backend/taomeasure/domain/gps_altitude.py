@@ -4,14 +4,775 @@ GPS高程转换模块 - 实现GPS高程异常拟合和正常高计算
 
 import numpy as np
 from scipy.optimize import least_squares
-from scipy.linalg import lstsq
+from scipy.linalg import lstsq, solve_triangular
 import math
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .anomaly_grid import AnomalyGrid, AnomalyGridStore
+from .geopotential import GeopotentialModel, GeopotentialStore, NormalField
+from .gps_stream import DEFAULT_CHUNK_SIZE, stream_normal_heights
+from .local_interpolation import LOCAL_METHODS, LocalInterpolator, local_plane
+from .sharding import ShardedExecutor
+from .tiled_surface import TILE_MODELS, TiledSurface
+
+
+def _column(points, key):
+    """提取点列表中某一字段为浮点数组"""
+    return np.array([point[key] for point in points], dtype=float)
+
+
+def _line_coordinates(lats, lons, avg_lat, avg_lon, line_azimuth):
+    """将经纬度数组转换为线路坐标系下的 y 坐标（米）"""
+    # 简化的投影变换（适用于小范围）
+    delta_lat = (lats - avg_lat) * np.pi / 180 * 6371000
+    delta_lon = (lons - avg_lon) * np.pi / 180 * 6371000 * np.cos(avg_lat * np.pi / 180)
+    # 旋转到线路坐标系
+    return delta_lat * np.cos(line_azimuth) + delta_lon * np.sin(line_azimuth)
+
+
+def _extent(known_points):
+    """已知点经纬度范围，作为模型的有效区域"""
+    lats = _column(known_points, 'lat')
+    lons = _column(known_points, 'lon')
+    return {
+        'min_lat': float(lats.min()), 'max_lat': float(lats.max()),
+        'min_lon': float(lons.min()), 'max_lon': float(lons.max())
+    }
+
+
+def _line_azimuth(lats, lons, avg_lat, avg_lon):
+    """最小二乘拟合线路中线，返回中线方位角"""
+    delta_lat = lats - avg_lat
+    delta_lon = lons - avg_lon
+    
+    # 最小二乘拟合直线
+    A_line = np.vstack([np.ones(len(delta_lat)), delta_lat]).T
+    slope, intercept = np.linalg.lstsq(A_line, delta_lon, rcond=None)[0]
+    return np.arctan2(slope, 1.0)
+
+
+def _line_design(y, model_type):
+    """线性基函数设计矩阵"""
+    if model_type == 'linear':
+        # 线性模型: ζ = a₀ + a₁y
+        return np.column_stack([np.ones(len(y)), y])
+    if model_type == 'quadratic':
+        # 二次模型: ζ = a₀ + a₁y + a₂y²
+        return np.column_stack([np.ones(len(y)), y, y**2])
+    return None
+
+
+def _surface_design(delta_B, delta_L, model_type):
+    """面基函数设计矩阵"""
+    if model_type == 'plane':
+        # 平面模型: ζ = a₀ + a₁ΔB + a₂ΔL
+        return np.column_stack([np.ones(len(delta_B)), delta_B, delta_L])
+    if model_type == 'quadratic':
+        # 二次模型: ζ = a₀ + a₁ΔB + a₂ΔB² + a₃ΔL + a₄ΔL² + a₅ΔLΔB
+        return np.column_stack([
+            np.ones(len(delta_B)),
+            delta_B,
+            delta_B**2,
+            delta_L,
+            delta_L**2,
+            delta_L * delta_B
+        ])
+    return None
+
+
+MODEL_TYPES = {
+    'vertical_translation': (None,),
+    'linear_basis': ('linear', 'quadratic'),
+    'surface_basis': ('plane', 'quadratic'),
+    'local_basis': LOCAL_METHODS,
+    'tiled_basis': tuple(TILE_MODELS),
+}
+
+ROBUST_METHODS = ('huber', 'igg3')
+
+
+def _robust_weights(standardized, method, k0, k1):
+    """Huber 或 IGG-III 等价权因子"""
+    magnitude = np.abs(standardized)
+    # |v| ≤ k0 时 k0/max(|v|, k0) 恰为 1，保权区无需单独处理，也不会除以接近 0 的残差
+    weights = k0 / np.maximum(magnitude, k0)
+    if method == 'huber':
+        return weights
+    # IGG-III：保权区、降权区、拒绝区
+    weights = np.where(magnitude <= k0, 1.0, weights * ((k1 - magnitude) / (k1 - k0))**2)
+    return np.where(magnitude > k1, 0.0, weights)
+
+
+def _robust_lstsq(A, observations, method, k0=1.5, k1=3.0, max_iter=50, tol=1e-10):
+    """
+    选权迭代（IRLS）抗差最小二乘
+    
+    单位权中误差由初始最小二乘残差的中位数绝对偏差一次估计并保持不变（逐次
+    重估会随拟合收紧而偏小，导致正常点被连带剔除）；每次迭代按标准化残差
+    整体更新权阵，直至参数收敛。返回 (系数, 权, 迭代次数, 抗差单位权中误差)。
+    """
+    observations = np.asarray(observations, dtype=float)
+    n, p = A.shape
+    weights = np.ones(n)
+    coefficients = np.linalg.lstsq(A, observations, rcond=None)[0]
+    residuals = observations - A @ coefficients
+    sigma = 1.4826 * np.median(np.abs(residuals)) * np.sqrt(n / (n - p)) if n > p else 0.0
+    iteration = 0
+    if sigma <= np.finfo(float).eps * max(1.0, np.max(np.abs(observations))):
+        return coefficients, weights, iteration, float(sigma)
+    for iteration in range(1, max_iter + 1):
+        residuals = observations - A @ coefficients
+        new_weights = _robust_weights(residuals / sigma, method, k0, k1)
+        root = np.sqrt(new_weights)
+        new_coefficients, _, rank, _ = np.linalg.lstsq(A * root[:, None], observations * root, rcond=None)
+        if rank < p:
+            # 拒绝点过多导致法方程秩亏，保留上一次结果
+            break
+        converged = np.max(np.abs(new_coefficients - coefficients)) <= tol * (1 + np.max(np.abs(coefficients)))
+        coefficients, weights = new_coefficients, new_weights
+        if converged:
+            break
+    return coefficients, weights, iteration, float(sigma)
+
+
+def _global_solution(A, observations, robust_method=None, k0=1.5, k1=3.0):
+    """
+    全局模型（可选抗差）最小二乘解，auto 比选与最终拟合共用
+    
+    抗差时先选权迭代得到收敛的等价权 P，再对 sqrt(P)·A 做一次奇异值分解，
+    由同一分解给出系数、帽子矩阵对角元（杠杆值）与法方程因子 R
+    （AᵀPA = RᵀR，取 p×p 矩阵 S·Vᵀ 的 QR 分解）。设计矩阵秩亏时因子为 None，
+    此时不输出预测中误差。多余观测数按权不为 0 的观测计，被拒绝的观测不参与精度评定。
+    """
+    observations = np.asarray(observations, dtype=float)
+    weights = np.ones(len(observations))
+    iterations, sigma = 0, None
+    if robust_method:
+        _, weights, iterations, sigma = _robust_lstsq(A, observations, robust_method, k0, k1)
+    root = np.sqrt(weights)
+    U, singular, Vt = np.linalg.svd(A * root[:, None], full_matrices=False)
+    rank = int(np.sum(singular > singular[0] * max(A.shape) * np.finfo(float).eps)) if len(singular) else 0
+    U, singular, Vt = U[:, :rank], singular[:rank], Vt[:rank]
+    coefficients = Vt.T @ ((U.T @ (observations * root)) / singular)
+    factor = None
+    if rank == A.shape[1]:
+        factor = np.linalg.qr(singular[:, None] * Vt, mode='r').tolist()
+    return {
+        'coefficients': coefficients,
+        'residuals': observations - A @ coefficients,
+        'weights': weights,
+        'rank': rank,
+        'redundancy': int(np.count_nonzero(weights > 0)) - rank,
+        'leverage': np.sum(U**2, axis=1),
+        'factor': factor,
+        'iterations': iterations,
+        'sigma': sigma,
+    }
+
+
+# auto 模式默认参与比选的全局模型
+AUTO_CANDIDATES = (
+    ('vertical_translation', None),
+    ('linear_basis', 'linear'),
+    ('linear_basis', 'quadratic'),
+    ('surface_basis', 'plane'),
+    ('surface_basis', 'quadratic'),
+)
+
+LOCAL_METHOD_NAMES = {
+    'multiquadric': '多二次曲面径向基函数',
+    'thin_plate': '薄板样条径向基函数',
+    'kriging': '普通克里金',
+    'mls': '移动最小二乘',
+}
+
+
+@dataclass
+class HeightAnomalyModel:
+    """已拟合的高程异常模型：拟合一次，可对任意批待求点重复预测"""
+    
+    model: str
+    model_type: str = None
+    ref_lat: float = 0.0
+    ref_lon: float = 0.0
+    azimuth: float = None
+    coefficients: list = field(default_factory=list)
+    statistics: dict = field(default_factory=dict)
+    interpolator: LocalInterpolator = None
+    surface: TiledSurface = None
+    geoid: GeopotentialModel = None
+    ellipsoid: str = 'CGCS2000'
+    extent: dict = None
+    factor: list = None
+    model_id: str = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    
+    def design(self, lats, lons):
+        """全局模型在经纬度数组上的设计矩阵，返回 (设计矩阵, 附加输出列)"""
+        if self.model == 'vertical_translation':
+            return np.ones((len(lats), 1)), {}
+        if self.model == 'linear_basis':
+            y = _line_coordinates(lats, lons, self.ref_lat, self.ref_lon, self.azimuth)
+            return _line_design(y, self.model_type), {'y_coord': y}
+        delta_B = lats - self.ref_lat
+        delta_L = lons - self.ref_lon
+        return _surface_design(delta_B, delta_L, self.model_type), {'delta_B': delta_B, 'delta_L': delta_L}
+    
+    def prediction_std(self, design):
+        """
+        待求点预测中误差 σ₀·sqrt(aᵀ(AᵀPA)⁻¹a)
+        
+        AᵀPA = RᵀR，对全部待求点一次求解三角方程 Rᵀx = a，x 的列范数即 sqrt(aᵀ(AᵀPA)⁻¹a)。
+        """
+        R = np.asarray(self.factor, dtype=float)
+        solved = solve_triangular(R, design.T, trans='T', check_finite=False)
+        return self.statistics.get('unit_weight_error', 0.0) * np.sqrt(np.einsum('ij,ij->j', solved, solved))
+    
+    def evaluate(self, lats, lons, with_std=True):
+        """对经纬度数组求高程异常，返回 (异常数组, 附加输出列)"""
+        if self.model == 'tiled_basis':
+            return self.surface.predict(lats, lons), {}
+        if self.model == 'local_basis':
+            xy = local_plane(lats, lons, self.ref_lat, self.ref_lon)
+            anomalies, std = self.interpolator.predict(xy)
+            return anomalies, {} if std is None else {'anomaly_std': std}
+        design, extra = self.design(lats, lons)
+        anomalies = design @ np.asarray(self.coefficients, dtype=float)
+        if with_std and self.factor is not None:
+            extra['normal_height_std'] = self.prediction_std(design)
+        if self.geoid is not None:
+            # 移去-计算-恢复：拟合曲面只表示残差异常，此处恢复重力场模型部分
+            restored = self.geoid.height_anomaly(lats, lons, self.ellipsoid)
+            anomalies = anomalies + restored
+            extra['geoid_anomaly'] = restored
+        return anomalies, extra
+    
+    def predict(self, unknown_points):
+        """计算待求点高程异常与正常高，按列求值后组装结果"""
+        if self.model == 'vertical_translation':
+            # 常数改正，避免逐点的 numpy 标量运算
+            anomaly = float(self.coefficients[0])
+            rows = [
+                {'name': point['name'], 'lat': point['lat'], 'lon': point['lon'], 'H': point['H'],
+                 'calculated_anomaly': anomaly, 'normal_height': point['H'] - anomaly}
+                for point in unknown_points
+            ]
+            if self.factor is not None:
+                std = float(self.prediction_std(np.ones((1, 1)))[0])
+                for row in rows:
+                    row['normal_height_std'] = std
+            return rows
+        
+        names = [point['name'] for point in unknown_points]
+        lats = [point['lat'] for point in unknown_points]
+        lons = [point['lon'] for point in unknown_points]
+        heights = [point['H'] for point in unknown_points]
+        anomalies, extra = self.evaluate(np.array(lats, dtype=float), np.array(lons, dtype=float))
+        normal_heights = np.array(heights, dtype=float) - anomalies
+        
+        if self.model in ('local_basis', 'tiled_basis'):
+            rows = [
+                {'name': name, 'lat': lat, 'lon': lon, 'H': H,
+                 'calculated_anomaly': anomaly, 'normal_height': normal_height}
+                for name, lat, lon, H, anomaly, normal_height in zip(
+                    names, lats, lons, heights, anomalies.tolist(), normal_heights.tolist()
+                )
+            ]
+        elif self.model == 'linear_basis':
+            rows = [
+                {'name': name, 'lat': lat, 'lon': lon, 'H': H, 'y_coord': y,
+                 'calculated_anomaly': anomaly, 'normal_height': normal_height}
+                for name, lat, lon, H, y, anomaly, normal_height in zip(
+                    names, lats, lons, heights,
+                    extra['y_coord'].tolist(), anomalies.tolist(), normal_heights.tolist()
+                )
+            ]
+        else:
+            rows = [
+                {'name': name, 'lat': lat, 'lon': lon, 'H': H, 'delta_B': dB, 'delta_L': dL,
+                 'calculated_anomaly': anomaly, 'normal_height': normal_height}
+                for name, lat, lon, H, dB, dL, anomaly, normal_height in zip(
+                    names, lats, lons, heights, extra['delta_B'].tolist(), extra['delta_L'].tolist(),
+                    anomalies.tolist(), normal_heights.tolist()
+                )
+            ]
+        # 克里金附带 anomaly_std，最小二乘模型附带 normal_height_std，移去-恢复模型附带 geoid_anomaly
+        for key in ('anomaly_std', 'normal_height_std', 'geoid_anomaly'):
+            if key in extra:
+                for row, std in zip(rows, extra[key].tolist()):
+                    row[key] = std
+        return rows
+    
+    def to_dict(self):
+        """导出为可序列化的模型定义"""
+        definition = {
+            'model_id': self.model_id,
+            'model': self.model,
+            'model_type': self.model_type,
+            'ref_lat': self.ref_lat,
+            'ref_lon': self.ref_lon,
+            'azimuth': self.azimuth,
+            'coefficients': [float(value) for value in self.coefficients],
+            'statistics': self.statistics,
+            'extent': self.extent,
+            'factor': self.factor,
+            'created_at': self.created_at,
+        }
+        if self.interpolator is not None:
+            definition['interpolator'] = self.interpolator.to_dict()
+        if self.surface is not None:
+            definition['surface'] = self.surface.to_dict()
+        if self.geoid is not None:
+            definition['geoid'] = {
+                'name': self.geoid.name, 'max_degree': self.geoid.max_degree, 'ellipsoid': self.ellipsoid
+            }
+        return definition
+    
+    @classmethod
+    def from_dict(cls, data, geoids=None):
+        """由导出的模型定义重建模型，校验模型类型与系数个数；引用的重力场模型从 geoids 加载"""
+        model = data.get('model')
+        if model not in MODEL_TYPES:
+            raise ValueError(f'未支持的模型: {model}')
+        model_type = data.get('model_type')
+        if model_type not in MODEL_TYPES[model]:
+            raise ValueError(f'模型 {model} 不支持类型: {model_type}')
+        coefficients = [float(value) for value in data.get('coefficients') or []]
+        interpolator = None
+        surface = None
+        if model == 'local_basis':
+            # 局部模型以邻近已知点为支撑，不含全局系数
+            if not isinstance(data.get('interpolator'), dict):
+                raise ValueError('局部插值模型缺少 interpolator 定义')
+            interpolator = LocalInterpolator.from_dict(data['interpolator'])
+        elif model == 'tiled_basis':
+            # 分块模型的系数分散在各分块中
+            if not isinstance(data.get('surface'), dict):
+                raise ValueError('分块曲面模型缺少 surface 定义')
+            surface = TiledSurface.from_dict(data['surface'])
+        else:
+            expected = {None: 1, 'linear': 2, 'plane': 3}.get(model_type)
+            if expected is None:
+                expected = 3 if model == 'linear_basis' else 6
+            if len(coefficients) != expected:
+                raise ValueError(f'模型系数个数应为 {expected}')
+        factor = data.get('factor')
+        if factor is not None:
+            factor = np.asarray(factor, dtype=float)
+            if model in ('local_basis', 'tiled_basis') or factor.shape != (len(coefficients), len(coefficients)):
+                raise ValueError('模型法方程分解因子 factor 的维数与系数个数不符')
+            factor = factor.tolist()
+        if model == 'linear_basis' and data.get('azimuth') is None:
+            raise ValueError('线性基函数模型缺少线路方位角 azimuth')
+        geoid = None
+        spec = data.get('geoid')
+        if spec is not None:
+            if model != 'surface_basis' or not isinstance(spec, dict) or not spec.get('name'):
+                raise ValueError('仅面基函数模型可引用重力场模型，且需提供模型名称 name')
+            if geoids is None:
+                raise ValueError(f"模型引用了重力场模型 {spec['name']}，但未提供重力场模型目录")
+            NormalField.named(spec.get('ellipsoid', 'CGCS2000'))
+            geoid = geoids.get(spec['name'], spec.get('max_degree'))
+        return cls(
+            model=model,
+            model_type=model_type,
+            ref_lat=float(data.get('ref_lat') or 0.0),
+            ref_lon=float(data.get('ref_lon') or 0.0),
+            azimuth=float(data['azimuth']) if data.get('azimuth') is not None else None,
+            coefficients=coefficients,
+            statistics=dict(data.get('statistics') or {}),
+            interpolator=interpolator,
+            surface=surface,
+            geoid=geoid,
+            ellipsoid=(spec or {}).get('ellipsoid', 'CGCS2000'),
+            extent=data.get('extent'),
+            factor=factor,
+            created_at=data.get('created_at') or datetime.now().isoformat(),
+        )
+
+
+class HeightAnomalyModelRegistry:
+    """服务端模型登记表，按最近使用淘汰，容量有限"""
+    
+    def __init__(self, capacity=64):
+        self.capacity = max(int(capacity), 1)
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def register(self, model):
+        """登记模型并返回模型 id"""
+        model.model_id = model.model_id or uuid.uuid4().hex[:12]
+        with self._lock:
+            self._models[model.model_id] = model
+            self._models.move_to_end(model.model_id)
+            while len(self._models) > self.capacity:
+                self._models.popitem(last=False)
+        return model.model_id
+    
+    def get(self, model_id):
+        """按 id 取出模型，不存在时抛出 ValueError"""
+        with self._lock:
+            model = self._models.get(model_id)
+            if model is not None:
+                self._models.move_to_end(model_id)
+        if model is None:
+            raise ValueError(f'未找到模型 {model_id}，请重新拟合或导入模型文件')
+        return model
+
 
 class GPSAltitudeConverter:
     """GPS高程转换计算类"""
     
-    def __init__(self):
-        pass
+    def __init__(self, registry_size=64, grid_dir=None, grid_cache_size=16, tile_workers=None,
+                 tile_threshold=200_000, geoid_dir=None, geoid_cache_size=2):
+        self.models = HeightAnomalyModelRegistry(registry_size)
+        self.geoids = GeopotentialStore(geoid_dir, geoid_cache_size)
+        # 已知点总数达到阈值时各分块在进程池中并行拟合
+        self.tile_executor = ShardedExecutor(tile_workers, tile_threshold)
+        self.grids = AnomalyGridStore(
+            grid_dir or os.path.join(tempfile.gettempdir(), 'taomeasure_grids'), grid_cache_size
+        )
+    
+    def predict(self, model_id, unknown_points):
+        """使用已登记的模型计算待求点正常高，无需重新拟合"""
+        model = self.models.get(model_id)
+        return {
+            'model': model.model,
+            'model_id': model.model_id,
+            'results': model.predict(unknown_points),
+            'statistics': model.statistics,
+        }
+    
+    def build_grid(self, model_id, bounds=None, spacing=1 / 120, margin=0.1):
+        """
+        将已登记模型在规则经纬度格网上整体求值并保存为二进制格网
+        
+        Args:
+            model_id (str): 模型 id
+            bounds (dict): 格网范围 min_lat/max_lat/min_lon/max_lon（度），缺省取已知点范围外扩 margin
+            spacing (float): 格网间距（度），默认 30″
+        
+        Returns:
+            dict: 格网 id 与格网描述
+        """
+        model = self.models.get(model_id)
+        if bounds is None:
+            if not model.extent:
+                raise ValueError('模型未记录已知点范围，请提供格网范围 bounds')
+            pad_lat = (model.extent['max_lat'] - model.extent['min_lat']) * margin or spacing
+            pad_lon = (model.extent['max_lon'] - model.extent['min_lon']) * margin or spacing
+            bounds = {
+                'min_lat': model.extent['min_lat'] - pad_lat, 'max_lat': model.extent['max_lat'] + pad_lat,
+                'min_lon': model.extent['min_lon'] - pad_lon, 'max_lon': model.extent['max_lon'] + pad_lon
+            }
+        grid = AnomalyGrid.build(lambda lats, lons: model.evaluate(lats, lons, with_std=False)[0], bounds, spacing)
+        grid_id = self.grids.save(grid)
+        return dict(grid.describe(), grid_id=grid_id, model_id=model_id)
+    
+    def predict_from_grid(self, grid_id, unknown_points):
+        """从格网双线性内插高程异常，不需要模型与已知点；格网外的点结果为 None"""
+        grid = self.grids.get(grid_id)
+        results = self.grid_predict(grid, unknown_points)
+        return {
+            'grid_id': grid_id,
+            'results': results,
+            'outside_count': sum(1 for row in results if row['calculated_anomaly'] is None),
+            'grid': grid.describe()
+        }
+    
+    @staticmethod
+    def grid_predict(grid, unknown_points):
+        """按格网内插待求点，返回与模型预测相同格式的结果行"""
+        lats = [point['lat'] for point in unknown_points]
+        lons = [point['lon'] for point in unknown_points]
+        heights = [point['H'] for point in unknown_points]
+        anomalies = grid.interpolate(np.array(lats, dtype=float), np.array(lons, dtype=float))
+        normal_heights = np.array(heights, dtype=float) - anomalies
+        inside = ~np.isnan(anomalies)
+        return [
+            {'name': point['name'], 'lat': lat, 'lon': lon, 'H': H,
+             'calculated_anomaly': anomaly if valid else None,
+             'normal_height': normal_height if valid else None}
+            for point, lat, lon, H, anomaly, normal_height, valid in zip(
+                unknown_points, lats, lons, heights, anomalies.tolist(), normal_heights.tolist(), inside.tolist()
+            )
+        ]
+    
+    def stream(self, lines, model_id=None, grid_id=None, chunk_size=DEFAULT_CHUNK_SIZE, decimals=4):
+        """
+        分块读取待求点文件，逐块以已登记模型或格网计算并输出同格式文本
+        
+        Args:
+            lines: 待求点文件的行迭代器（name lat lon H）
+            model_id (str): 模型 id，与 grid_id 二选一
+            grid_id (str): 格网 id
+            chunk_size (int): 每块点数
+            decimals (int): 输出小数位数
+        
+        Returns:
+            iterator: 输出文本块
+        """
+        if grid_id:
+            grid = self.grids.get(grid_id)
+            predict = lambda points: self.grid_predict(grid, points)
+        elif model_id:
+            predict = self.models.get(model_id).predict
+        else:
+            raise ValueError('需提供 model_id 或 grid_id')
+        return stream_normal_heights(lines, predict, chunk_size=chunk_size, decimals=decimals)
+    
+    def fit(self, model, known_points, unknown_points, model_params=None):
+        """按模型名称分派拟合，未支持的模型返回 error"""
+        if model == 'vertical_translation':
+            return self.vertical_translation_model(known_points, unknown_points)
+        if model == 'linear_basis':
+            return self.linear_basis_fitting(known_points, unknown_points, model_params)
+        if model == 'surface_basis':
+            return self.surface_basis_fitting(known_points, unknown_points, model_params)
+        if model == 'local_basis':
+            return self.local_basis_fitting(known_points, unknown_points, model_params)
+        if model == 'tiled_basis':
+            return self.tiled_basis_fitting(known_points, unknown_points, model_params)
+        if model == 'auto':
+            return self.auto_model_selection(known_points, unknown_points, model_params)
+        return {'error': f'未支持的模型类型: {model}'}
+    
+    def import_model(self, definition):
+        """导入模型定义并登记，返回模型 id"""
+        return self.models.register(HeightAnomalyModel.from_dict(definition, self.geoids))
+    
+    def export_model(self, model_id):
+        """导出模型定义"""
+        return self.models.get(model_id).to_dict()
+    
+    def geoid_anomalies(self, geoid, points, max_degree=None, ellipsoid='CGCS2000'):
+        """
+        以球谐重力场模型直接计算各点高程异常与正常高（不拟合已知点）
+        
+        Args:
+            geoid (str): 重力场模型名称，对应模型目录下的 <geoid>.gfc 文件
+            points (list): 点列表，含 name/lat/lon，可选 H
+            max_degree (int): 截断阶次，缺省使用文件全部阶次
+            ellipsoid (str): 正常场参考椭球 CGCS2000 / GRS80 / WGS84
+        """
+        NormalField.named(ellipsoid)
+        model = self.geoids.get(geoid, max_degree)
+        anomalies = model.height_anomaly(_column(points, 'lat'), _column(points, 'lon'), ellipsoid)
+        results = []
+        for point, anomaly in zip(points, anomalies.tolist()):
+            row = {'name': point.get('name'), 'lat': point['lat'], 'lon': point['lon'], 'geoid_anomaly': anomaly}
+            if point.get('H') is not None:
+                row['H'] = point['H']
+                row['normal_height'] = point['H'] - anomaly
+            results.append(row)
+        return {'geoid': dict(model.describe(), ellipsoid=ellipsoid), 'results': results}
+    
+    @staticmethod
+    def _statistics(residuals, unit_weight_error):
+        """模型随附的精度统计"""
+        residuals = np.asarray(residuals, dtype=float)
+        return {
+            'unit_weight_error': float(unit_weight_error),
+            'max_residual': float(residuals.max()) if len(residuals) else 0.0,
+            'min_residual': float(residuals.min()) if len(residuals) else 0.0,
+            'known_points_count': int(len(residuals)),
+        }
+    
+    @staticmethod
+    def _candidate_design(known_points, model, model_type):
+        """构造候选全局模型在已知点上的设计矩阵"""
+        lats = _column(known_points, 'lat')
+        lons = _column(known_points, 'lon')
+        if model == 'vertical_translation':
+            return np.ones((len(lats), 1))
+        avg_lat = np.mean(lats)
+        avg_lon = np.mean(lons)
+        if model == 'linear_basis':
+            line_azimuth = _line_azimuth(lats, lons, avg_lat, avg_lon)
+            return _line_design(_line_coordinates(lats, lons, avg_lat, avg_lon, line_azimuth), model_type)
+        return _surface_design(lats - avg_lat, lons - avg_lon, model_type)
+    
+    @staticmethod
+    def _leave_one_out(solution):
+        """
+        由拟合解的杠杆值求留一残差
+        
+        加权帽子矩阵 H = U Uᵀ（U 取自 sqrt(P)·A 的奇异值分解），权固定时留一残差
+        e₍ᵢ₎ = eᵢ / (1 - hᵢᵢ)，无需逐点重新拟合；权为 0 的点不参与拟合，留一残差即其残差。
+        存在杠杆值为 1 的点时留一误差无定义，返回 None。
+        """
+        leverage = solution['leverage']
+        if np.any(leverage > 1 - 1e-10):
+            return None
+        return solution['residuals'] / (1 - leverage)
+    
+    @staticmethod
+    def _robust_report(known_points, residuals, weights, method, k0, k1, iterations, sigma):
+        """抗差拟合结果：最终权与被降权/剔除的已知点"""
+        downweighted = [
+            {'name': point['name'], 'residual': residual, 'weight': weight, 'rejected': weight == 0.0}
+            for point, residual, weight in zip(known_points, residuals.tolist(), weights.tolist())
+            if weight < 1.0 - 1e-9
+        ]
+        return {
+            'method': method,
+            'k0': k0,
+            'k1': k1 if method == 'igg3' else None,
+            'iterations': iterations,
+            'sigma': sigma,
+            'weights': weights.tolist(),
+            'downweighted': downweighted
+        }
+    
+    def _score_candidate(self, known_points, height_anomalies, model, model_type, model_params, removed=None):
+        """
+        计算单个候选模型的比选指标，返回 (比选表条目, 全局模型的拟合解)
+        
+        全局模型按最终拟合相同的设置求解：线性、面基函数模型按 'robust' 选权迭代，
+        以收敛后的等价权计算加权留一中误差；面基函数模型对移去重力场模型异常
+        （removed）后的残差异常求解。拟合解随结果返回，最优模型不再重复分解。
+        """
+        n = len(known_points)
+        entry = {'model': model, 'model_type': model_type}
+        solution = None
+        if model == 'local_basis':
+            if n < 4:
+                return dict(entry, eligible=False, reason='已知点不足'), None
+            ref_lat = np.mean([point['lat'] for point in known_points])
+            ref_lon = np.mean([point['lon'] for point in known_points])
+            xy = local_plane(_column(known_points, 'lat'), _column(known_points, 'lon'), ref_lat, ref_lon)
+            interpolator = LocalInterpolator.fit(
+                xy, height_anomalies, model_type,
+                neighbors=int(model_params.get('neighbors', 12)),
+                shape=model_params.get('shape'),
+                degree=int(model_params.get('degree', 2)),
+                variogram_model=model_params.get('variogram_model', 'spherical')
+            )
+            predicted, _ = interpolator.predict(xy, leave_one_out=True)
+            loo = height_anomalies - predicted
+            weights = np.ones(n)
+            rank, unit_weight_error = None, None
+        else:
+            observations = height_anomalies
+            if model == 'surface_basis' and removed is not None:
+                observations = height_anomalies - removed
+            robust_method = model_params.get('robust') if model != 'vertical_translation' else None
+            A = self._candidate_design(known_points, model, model_type)
+            solution = _global_solution(
+                A, observations, robust_method,
+                float(model_params.get('robust_k0', 1.5)), float(model_params.get('robust_k1', 3.0))
+            )
+            rank = solution['rank']
+            loo = self._leave_one_out(solution)
+            if n <= rank or loo is None:
+                return dict(entry, parameters_count=rank, eligible=False, reason='已知点不足以进行留一验证'), None
+            weights = solution['weights']
+            if solution['redundancy'] <= 0:
+                return dict(entry, parameters_count=rank, eligible=False, reason='有效已知点不足以评定精度'), None
+            unit_weight_error = float(np.sqrt(np.sum(weights * solution['residuals']**2) / solution['redundancy']))
+        # 抗差模型按等价权统计，被拒绝的已知点不计入留一中误差
+        return dict(
+            entry,
+            parameters_count=rank,
+            unit_weight_error=unit_weight_error,
+            loo_rms=float(np.sqrt(np.sum(weights * loo**2) / np.sum(weights))),
+            max_loo_residual=float(np.max(np.abs(loo[weights > 0]))),
+            eligible=True
+        ), solution
+    
+    def auto_model_selection(self, known_points, unknown_points, model_params=None):
+        """
+        并行拟合全部候选模型，以留一交叉验证中误差比选最优模型
+        
+        全局模型的留一残差由帽子矩阵对角元一次求得；单位权中误差随参数增加
+        单调减小，偏向过拟合，不作为比选依据。抗差（'robust'）与移去-恢复（'geoid'）
+        设置在比选时即按各候选模型最终拟合的方式生效，比选所用的解直接用于最优模型。
+        
+        Args:
+            known_points (list): 已知GPS水准点列表
+            unknown_points (list): 未知点列表
+            model_params (dict): 可选 'candidates'（如 ["surface_basis:quadratic",
+                "local_basis:kriging"]），其余参数透传给各候选模型
+        
+        Returns:
+            dict: 最优模型的计算结果，附 'selection' 比选表
+        """
+        if len(known_points) < 2:
+            return {'error': '自动模型比选需要至少2个已知GPS水准点'}
+        
+        if model_params is None:
+            model_params = {}
+        
+        candidates = AUTO_CANDIDATES
+        if model_params.get('candidates'):
+            candidates = []
+            for candidate in model_params['candidates']:
+                model, _, model_type = str(candidate).partition(':')
+                model_type = model_type or None
+                # 分块曲面没有闭式留一验证，不参与比选
+                if model not in MODEL_TYPES or model == 'tiled_basis' or model_type not in MODEL_TYPES[model]:
+                    return {'error': f'不支持的候选模型: {candidate}'}
+                candidates.append((model, model_type))
+        
+        if model_params.get('robust') and model_params['robust'] not in ROBUST_METHODS:
+            return {'error': f'不支持的抗差方法: {model_params["robust"]}'}
+        
+        height_anomalies = _column(known_points, 'anomaly')
+        # 面基函数候选模型与最终拟合一样对移去重力场模型异常后的残差异常比选
+        removed = None
+        if model_params.get('geoid') and any(model == 'surface_basis' for model, _ in candidates):
+            ellipsoid = model_params.get('geoid_ellipsoid', 'CGCS2000')
+            try:
+                NormalField.named(ellipsoid)
+                geoid = self.geoids.get(model_params['geoid'], model_params.get('geoid_max_degree'))
+            except ValueError as exc:
+                return {'error': str(exc)}
+            removed = geoid.height_anomaly(_column(known_points, 'lat'), _column(known_points, 'lon'), ellipsoid)
+        
+        with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            scored = list(executor.map(
+                lambda candidate: self._score_candidate(
+                    known_points, height_anomalies, candidate[0], candidate[1], model_params, removed
+                ),
+                candidates
+            ))
+        comparison = [entry for entry, _ in scored]
+        solutions = [solution for _, solution in scored]
+        
+        eligible = [entry for entry in comparison if entry['eligible']]
+        if not eligible:
+            return {'error': '已知点数量不足，无法对候选模型进行留一交叉验证'}
+        # 留一中误差相同时取参数较少的模型
+        best = min(eligible, key=lambda entry: (entry['loo_rms'], entry['parameters_count'] or 0))
+        for entry in comparison:
+            entry['selected'] = entry is best
+        
+        selected_params = dict(model_params, model_type=best['model_type'])
+        solution = solutions[comparison.index(best)]
+        fitting = {
+            'vertical_translation': lambda: self.vertical_translation_model(known_points, unknown_points),
+            'linear_basis': lambda: self.linear_basis_fitting(
+                known_points, unknown_points, selected_params, solution
+            ),
+            'surface_basis': lambda: self.surface_basis_fitting(
+                known_points, unknown_points, selected_params, solution
+            ),
+            'local_basis': lambda: self.local_basis_fitting(known_points, unknown_points, selected_params),
+        }
+        result = fitting[best['model']]()
+        result['selection'] = {
+            'criterion': 'loo_rms',
+            'selected': {'model': best['model'], 'model_type': best['model_type']},
+            'comparison': comparison
+        }
+        return result
     
     def vertical_translation_model(self, known_points, unknown_points):
         """
@@ -40,20 +801,19 @@ class GPSAltitudeConverter:
             unit_weight_error = 0.0
         
         # 计算未知点正常高
-        results = []
-        for point in unknown_points:
-            normal_height = point['H'] - avg_height_anomaly
-            results.append({
-                'name': point['name'],
-                'lat': point['lat'],
-                'lon': point['lon'],
-                'H': point['H'],
-                'calculated_anomaly': avg_height_anomaly,
-                'normal_height': normal_height
-            })
+        fitted = HeightAnomalyModel(
+            model='vertical_translation',
+            extent=_extent(known_points),
+            factor=[[math.sqrt(len(known_points))]],
+            coefficients=[float(avg_height_anomaly)],
+            statistics=self._statistics(residuals, unit_weight_error)
+        )
+        model_id = self.models.register(fitted)
+        results = fitted.predict(unknown_points)
         
         return {
             'model': 'vertical_translation',
+            'model_id': model_id,
             'results': results,
             'parameters': {
                 '平均高程异常': avg_height_anomaly,
@@ -70,14 +830,16 @@ class GPSAltitudeConverter:
             }
         }
     
-    def linear_basis_fitting(self, known_points, unknown_points, model_params=None):
+    def linear_basis_fitting(self, known_points, unknown_points, model_params=None, solution=None):
         """
         使用线性基函数拟合模型计算未知点的正常高
         
         Args:
             known_points (list): 已知GPS水准点列表
             unknown_points (list): 未知点列表
-            model_params (dict): 模型参数，包含 'model_type' 和 'coordinate_system'
+            model_params (dict): 模型参数，包含 'model_type' 和 'coordinate_system'；
+                可选 'robust'（huber / igg3）及阈值 'robust_k0'、'robust_k1'
+            solution (dict): auto 比选时已按相同设置求得的拟合解，缺省时在此求解
         
         Returns:
             dict: 包含计算结果和精度评定的字典
@@ -101,79 +863,58 @@ class GPSAltitudeConverter:
         lons = np.array([point['lon'] for point in known_points])
         
         # 计算中线方位角
-        delta_lat = lats - avg_lat
-        delta_lon = lons - avg_lon
-        
-        # 最小二乘拟合直线
-        A_line = np.vstack([np.ones(len(delta_lat)), delta_lat]).T
-        slope, intercept = np.linalg.lstsq(A_line, delta_lon, rcond=None)[0]
-        line_azimuth = np.arctan2(slope, 1.0)
+        line_azimuth = _line_azimuth(lats, lons, avg_lat, avg_lon)
         
         # 3. 转换到线路坐标系
-        y_coords = []
-        for point in known_points:
-            # 简化的投影变换（适用于小范围）
-            delta_lat = (point['lat'] - avg_lat) * np.pi / 180 * 6371000  # 转换为米
-            delta_lon = (point['lon'] - avg_lon) * np.pi / 180 * 6371000 * np.cos(avg_lat * np.pi / 180)
-            
-            # 旋转到线路坐标系
-            y = delta_lat * np.cos(line_azimuth) + delta_lon * np.sin(line_azimuth)
-            y_coords.append(y)
+        y_coords = _line_coordinates(lats, lons, avg_lat, avg_lon, line_azimuth)
         
         # 4. 建立拟合方程
         height_anomalies = [point['anomaly'] for point in known_points]
         
-        if model_type == 'linear':
-            # 线性模型: ζ = a₀ + a₁y
-            A_fit = np.column_stack([np.ones(len(y_coords)), y_coords])
-        elif model_type == 'quadratic':
-            # 二次模型: ζ = a₀ + a₁y + a₂y²
-            A_fit = np.column_stack([np.ones(len(y_coords)), y_coords, np.array(y_coords)**2])
-        else:
+        A_fit = _line_design(y_coords, model_type)
+        if A_fit is None:
             return {'error': f'不支持的模型类型: {model_type}'}
         
-        # 最小二乘求解
-        coefficients, residuals_sum, rank, s = np.linalg.lstsq(A_fit, height_anomalies, rcond=None)
+        # 最小二乘求解（可选抗差选权迭代）
+        robust_method = model_params.get('robust')
+        if robust_method and robust_method not in ROBUST_METHODS:
+            return {'error': f'不支持的抗差方法: {robust_method}'}
+        k0 = float(model_params.get('robust_k0', 1.5))
+        k1 = float(model_params.get('robust_k1', 3.0))
+        if solution is None:
+            solution = _global_solution(A_fit, height_anomalies, robust_method, k0, k1)
+        coefficients = solution['coefficients']
+        weights = solution['weights']
         
         # 计算残差和精度评定
         fitted_anomalies = A_fit @ coefficients
         residuals = np.array(height_anomalies) - fitted_anomalies
         
-        n = len(known_points)
-        p = len(coefficients)  # 参数个数
-        if n > p:
-            unit_weight_error = np.sqrt(np.sum(residuals**2) / (n - p))
+        # 多余观测数：抗差拒绝（权为 0）的已知点不计入观测数
+        redundancy = solution['redundancy']
+        if redundancy > 0:
+            unit_weight_error = np.sqrt(np.sum(weights * residuals**2) / redundancy)
         else:
             unit_weight_error = 0.0
         
-        # 计算未知点正常高
-        results = []
-        for point in unknown_points:
-            # 转换未知点到线路坐标系
-            delta_lat = (point['lat'] - avg_lat) * np.pi / 180 * 6371000
-            delta_lon = (point['lon'] - avg_lon) * np.pi / 180 * 6371000 * np.cos(avg_lat * np.pi / 180)
-            y = delta_lat * np.cos(line_azimuth) + delta_lon * np.sin(line_azimuth)
-            
-            # 计算高程异常
-            if model_type == 'linear':
-                calculated_anomaly = coefficients[0] + coefficients[1] * y
-            elif model_type == 'quadratic':
-                calculated_anomaly = coefficients[0] + coefficients[1] * y + coefficients[2] * y**2
-            
-            normal_height = point['H'] - calculated_anomaly
-            
-            results.append({
-                'name': point['name'],
-                'lat': point['lat'],
-                'lon': point['lon'],
-                'H': point['H'],
-                'y_coord': y,
-                'calculated_anomaly': calculated_anomaly,
-                'normal_height': normal_height
-            })
+        # 计算未知点正常高：一次构造设计矩阵并求值
+        fitted = HeightAnomalyModel(
+            model='linear_basis',
+            extent=_extent(known_points),
+            factor=solution['factor'],
+            model_type=model_type,
+            ref_lat=float(avg_lat),
+            ref_lon=float(avg_lon),
+            azimuth=float(line_azimuth),
+            coefficients=coefficients.tolist(),
+            statistics=self._statistics(residuals, unit_weight_error)
+        )
+        model_id = self.models.register(fitted)
+        results = fitted.predict(unknown_points)
         
-        return {
+        result = {
             'model': 'linear_basis',
+            'model_id': model_id,
             'results': results,
             'parameters': {
                 '模型类型': '线性模型' if model_type == 'linear' else '二次曲线模型',
@@ -196,15 +937,24 @@ class GPSAltitudeConverter:
                 'fitted_anomalies': fitted_anomalies.tolist()
             }
         }
+        if robust_method:
+            result['robust'] = self._robust_report(
+                known_points, residuals, weights, robust_method, k0, k1, solution['iterations'], solution['sigma']
+            )
+        return result
     
-    def surface_basis_fitting(self, known_points, unknown_points, model_params=None):
+    def surface_basis_fitting(self, known_points, unknown_points, model_params=None, solution=None):
         """
         使用面基函数拟合模型计算未知点的正常高
         
         Args:
             known_points (list): 已知GPS水准点列表
             unknown_points (list): 未知点列表
-            model_params (dict): 模型参数，包含 'model_type' 和 'coordinate_system'
+            model_params (dict): 模型参数，包含 'model_type' 和 'coordinate_system'；
+                可选 'robust'（huber / igg3）及阈值 'robust_k0'、'robust_k1'；
+                可选 'geoid'（重力场模型名称）、'geoid_max_degree' 与 'geoid_ellipsoid'，
+                启用移去-计算-恢复：先移去模型异常，对残差拟合曲面，待求点再恢复模型异常
+            solution (dict): auto 比选时已按相同设置求得的拟合解，缺省时在此求解
         
         Returns:
             dict: 包含计算结果和精度评定的字典
@@ -223,83 +973,72 @@ class GPSAltitudeConverter:
         ref_lat = np.mean([point['lat'] for point in known_points])
         ref_lon = np.mean([point['lon'] for point in known_points])
         
-        # 2. 计算各点相对于参考点的大地经纬度差值
-        delta_B_coords = []
-        delta_L_coords = []
-        for point in known_points:
-            # 计算大地经纬度差值（单位：度）
-            delta_B = point['lat'] - ref_lat
-            delta_L = point['lon'] - ref_lon
-            delta_B_coords.append(delta_B)
-            delta_L_coords.append(delta_L)
+        # 2. 计算各点相对于参考点的大地经纬度差值（单位：度）
+        delta_B_coords = _column(known_points, 'lat') - ref_lat
+        delta_L_coords = _column(known_points, 'lon') - ref_lon
         
         # 3. 建立拟合方程
-        height_anomalies = [point['anomaly'] for point in known_points]
+        height_anomalies = _column(known_points, 'anomaly')
         
-        if model_type == 'plane':
-            # 平面模型: ζ = a₀ + a₁ΔB + a₂ΔL
-            A_fit = np.column_stack([
-                np.ones(len(delta_B_coords)),
-                delta_B_coords,
-                delta_L_coords
-            ])
-        elif model_type == 'quadratic':
-            # 二次模型: ζ = a₀ + a₁ΔB + a₂ΔB² + a₃ΔL + a₄ΔL² + a₅ΔLΔB
-            A_fit = np.column_stack([
-                np.ones(len(delta_B_coords)),
-                delta_B_coords,
-                np.array(delta_B_coords)**2,
-                delta_L_coords,
-                np.array(delta_L_coords)**2,
-                np.array(delta_L_coords) * np.array(delta_B_coords)
-            ])
-        else:
+        # 移去重力场模型高程异常，对残差异常拟合
+        geoid = None
+        ellipsoid = model_params.get('geoid_ellipsoid', 'CGCS2000')
+        if model_params.get('geoid'):
+            try:
+                NormalField.named(ellipsoid)
+                geoid = self.geoids.get(model_params['geoid'], model_params.get('geoid_max_degree'))
+            except ValueError as exc:
+                return {'error': str(exc)}
+            removed = geoid.height_anomaly(_column(known_points, 'lat'), _column(known_points, 'lon'), ellipsoid)
+            height_anomalies = height_anomalies - removed
+        
+        A_fit = _surface_design(delta_B_coords, delta_L_coords, model_type)
+        if A_fit is None:
             return {'error': f'不支持的模型类型: {model_type}'}
         
-        # 最小二乘求解
-        coefficients, residuals_sum, rank, s = np.linalg.lstsq(A_fit, height_anomalies, rcond=None)
+        # 最小二乘求解（可选抗差选权迭代）
+        robust_method = model_params.get('robust')
+        if robust_method and robust_method not in ROBUST_METHODS:
+            return {'error': f'不支持的抗差方法: {robust_method}'}
+        k0 = float(model_params.get('robust_k0', 1.5))
+        k1 = float(model_params.get('robust_k1', 3.0))
+        if solution is None:
+            solution = _global_solution(A_fit, height_anomalies, robust_method, k0, k1)
+        coefficients = solution['coefficients']
+        weights = solution['weights']
         
         # 计算残差和精度评定
         fitted_anomalies = A_fit @ coefficients
         residuals = np.array(height_anomalies) - fitted_anomalies
+        if geoid is not None:
+            fitted_anomalies = fitted_anomalies + removed
         
-        n = len(known_points)
-        p = len(coefficients)  # 参数个数
-        if n > p:
-            unit_weight_error = np.sqrt(np.sum(residuals**2) / (n - p))
+        # 多余观测数：抗差拒绝（权为 0）的已知点不计入观测数
+        redundancy = solution['redundancy']
+        if redundancy > 0:
+            unit_weight_error = np.sqrt(np.sum(weights * residuals**2) / redundancy)
         else:
             unit_weight_error = 0.0
         
-        # 计算未知点正常高
-        results = []
-        for point in unknown_points:
-            # 计算未知点相对于参考点的大地经纬度差值（单位：度）
-            delta_B = point['lat'] - ref_lat
-            delta_L = point['lon'] - ref_lon
-            
-            # 计算高程异常
-            if model_type == 'plane':
-                calculated_anomaly = coefficients[0] + coefficients[1] * delta_B + coefficients[2] * delta_L
-            elif model_type == 'quadratic':
-                calculated_anomaly = (coefficients[0] + coefficients[1] * delta_B + coefficients[2] * delta_B**2 + 
-                                    coefficients[3] * delta_L + coefficients[4] * delta_L**2 + 
-                                    coefficients[5] * delta_L * delta_B)
-            
-            normal_height = point['H'] - calculated_anomaly
-            
-            results.append({
-                'name': point['name'],
-                'lat': point['lat'],
-                'lon': point['lon'],
-                'H': point['H'],
-                'delta_B': delta_B,
-                'delta_L': delta_L,
-                'calculated_anomaly': calculated_anomaly,
-                'normal_height': normal_height
-            })
+        # 计算未知点正常高：一次构造设计矩阵并求值
+        fitted = HeightAnomalyModel(
+            model='surface_basis',
+            extent=_extent(known_points),
+            factor=solution['factor'],
+            model_type=model_type,
+            ref_lat=float(ref_lat),
+            ref_lon=float(ref_lon),
+            coefficients=coefficients.tolist(),
+            statistics=self._statistics(residuals, unit_weight_error),
+            geoid=geoid,
+            ellipsoid=ellipsoid
+        )
+        model_id = self.models.register(fitted)
+        results = fitted.predict(unknown_points)
         
-        return {
+        result = {
             'model': 'surface_basis',
+            'model_id': model_id,
             'results': results,
             'parameters': {
                 '模型类型': '平面模型' if model_type == 'plane' else '平面二次模型',
@@ -325,6 +1064,216 @@ class GPSAltitudeConverter:
                 'fitted_anomalies': fitted_anomalies.tolist()
             }
         }
+        if robust_method:
+            result['robust'] = self._robust_report(
+                known_points, residuals, weights, robust_method, k0, k1, solution['iterations'], solution['sigma']
+            )
+        if geoid is not None:
+            result['parameters']['重力场模型'] = dict(geoid.describe(), ellipsoid=ellipsoid)
+            result['accuracy_assessment']['geoid_anomalies'] = removed.tolist()
+        return result
+    
+    def local_basis_fitting(self, known_points, unknown_points, model_params=None):
+        """
+        使用局部插值模型（径向基函数、普通克里金、移动最小二乘）计算未知点的正常高
+        
+        每个待求点只取 KD 树检索的 k 个最近已知点建立局部方程，适用于已知点
+        数以百计、千计的区域网。精度以留一交叉验证残差评定。
+        
+        Args:
+            known_points (list): 已知GPS水准点列表
+            unknown_points (list): 未知点列表
+            model_params (dict): 模型参数，包含 'model_type'（multiquadric / thin_plate /
+                kriging / mls）、'neighbors'、'shape'、'degree' 与 'variogram_model'
+        
+        Returns:
+            dict: 包含计算结果和精度评定的字典
+        """
+        if len(known_points) < 4:
+            return {'error': '局部插值模型需要至少4个已知GPS水准点'}
+        
+        if model_params is None:
+            model_params = {}
+        
+        model_type = model_params.get('model_type', 'kriging')
+        if model_type not in LOCAL_METHODS:
+            return {'error': f'不支持的模型类型: {model_type}'}
+        
+        ref_lat = np.mean([point['lat'] for point in known_points])
+        ref_lon = np.mean([point['lon'] for point in known_points])
+        xy = local_plane(_column(known_points, 'lat'), _column(known_points, 'lon'), ref_lat, ref_lon)
+        height_anomalies = _column(known_points, 'anomaly')
+        
+        interpolator = LocalInterpolator.fit(
+            xy,
+            height_anomalies,
+            model_type,
+            neighbors=int(model_params.get('neighbors', 12)),
+            shape=model_params.get('shape'),
+            degree=int(model_params.get('degree', 2)),
+            variogram_model=model_params.get('variogram_model', 'spherical')
+        )
+        
+        # 留一交叉验证：插值模型在已知点上残差恒为零，不能用于精度评定
+        fitted_anomalies, _ = interpolator.predict(xy, leave_one_out=True)
+        residuals = height_anomalies - fitted_anomalies
+        unit_weight_error = float(np.sqrt(np.mean(residuals**2)))
+        
+        fitted = HeightAnomalyModel(
+            model='local_basis',
+            extent=_extent(known_points),
+            model_type=model_type,
+            ref_lat=float(ref_lat),
+            ref_lon=float(ref_lon),
+            statistics=self._statistics(residuals, unit_weight_error),
+            interpolator=interpolator
+        )
+        model_id = self.models.register(fitted)
+        results = fitted.predict(unknown_points)
+        
+        parameters = {
+            '模型类型': LOCAL_METHOD_NAMES[model_type],
+            '邻域点数': interpolator.neighbors,
+            '参考点坐标': {'纬度 B₀': float(ref_lat), '经度 L₀': float(ref_lon)},
+            '已知点数量': len(known_points),
+            '未知点数量': len(unknown_points)
+        }
+        if model_type == 'multiquadric':
+            parameters['形状参数'] = interpolator.shape
+        elif model_type == 'mls':
+            parameters['局部多项式次数'] = interpolator.degree
+        elif model_type == 'kriging':
+            parameters['变异函数'] = interpolator.variogram
+        
+        return {
+            'model': 'local_basis',
+            'model_id': model_id,
+            'results': results,
+            'parameters': parameters,
+            'unit_weight_error': unit_weight_error,
+            'max_residual': float(np.max(residuals)),
+            'min_residual': float(np.min(residuals)),
+            'accuracy_assessment': {
+                'known_points_count': len(known_points),
+                'validation': 'leave_one_out',
+                'residuals': residuals.tolist(),
+                'rms': unit_weight_error,
+                'fitted_anomalies': fitted_anomalies.tolist()
+            }
+        }
+    
+    def tiled_basis_fitting(self, known_points, unknown_points, model_params=None):
+        """
+        使用分块曲面模型计算未知点的正常高
+        
+        测区划分为互相重叠的规则经纬度分块，各块独立拟合平面或二次曲面（已知点
+        较多时在进程池中并行），重叠带内按平滑权过渡，块间无接缝。
+        
+        Args:
+            known_points (list): 已知GPS水准点列表
+            unknown_points (list): 未知点列表
+            model_params (dict): 模型参数，包含 'model_type'（plane / quadratic）、
+                'tile_size'（度，缺省按 'points_per_tile' 自动确定）与 'overlap'（边长比例）
+        
+        Returns:
+            dict: 包含计算结果和精度评定的字典
+        """
+        if len(known_points) < 3:
+            return {'error': '分块曲面拟合需要至少3个已知GPS水准点'}
+        
+        if model_params is None:
+            model_params = {}
+        
+        model_type = model_params.get('model_type', 'quadratic')
+        if model_type not in TILE_MODELS:
+            return {'error': f'不支持的模型类型: {model_type}'}
+        
+        lats = _column(known_points, 'lat')
+        lons = _column(known_points, 'lon')
+        surface = TiledSurface.fit(
+            lats,
+            lons,
+            _column(known_points, 'anomaly'),
+            model_type=model_type,
+            tile_size=model_params.get('tile_size'),
+            overlap=float(model_params.get('overlap', 0.25)),
+            points_per_tile=int(model_params.get('points_per_tile', 200)),
+            executor=self.tile_executor
+        )
+        
+        fitted = HeightAnomalyModel(
+            model='tiled_basis',
+            extent=_extent(known_points),
+            model_type=model_type,
+            ref_lat=float(lats.mean()),
+            ref_lon=float(lons.mean()),
+            surface=surface
+        )
+        fitted_anomalies, residuals, unit_weight_error = self._tiled_statistics(fitted)
+        model_id = self.models.register(fitted)
+        results = fitted.predict(unknown_points)
+        
+        return {
+            'model': 'tiled_basis',
+            'model_id': model_id,
+            'results': results,
+            'parameters': {
+                '模型类型': '分块平面模型' if model_type == 'plane' else '分块二次曲面模型',
+                '分块': surface.describe(),
+                '已知点数量': len(known_points),
+                '未知点数量': len(unknown_points)
+            },
+            'unit_weight_error': unit_weight_error,
+            'max_residual': float(np.max(residuals)),
+            'min_residual': float(np.min(residuals)),
+            'accuracy_assessment': {
+                'known_points_count': len(known_points),
+                'residuals': residuals.tolist(),
+                'rms': unit_weight_error,
+                'fitted_anomalies': fitted_anomalies.tolist()
+            }
+        }
+    
+    def _tiled_statistics(self, fitted):
+        """分块模型在全部已知点上的拟合残差，同时更新模型精度统计"""
+        lats, lons, height_anomalies = fitted.surface.known.T
+        fitted_anomalies = fitted.surface.predict(lats, lons)
+        residuals = height_anomalies - fitted_anomalies
+        unit_weight_error = float(np.sqrt(np.mean(residuals**2)))
+        fitted.statistics = self._statistics(residuals, unit_weight_error)
+        return fitted_anomalies, residuals, unit_weight_error
+    
+    def add_benchmarks(self, model_id, known_points):
+        """
+        向已登记的分块曲面模型追加已知点，仅重新拟合这些点所在的分块
+        
+        Returns:
+            dict: 重新拟合的分块编号、分块总数与更新后的精度统计
+        """
+        if not known_points:
+            raise ValueError('未提供新增已知点')
+        model = self.models.get(model_id)
+        if model.model != 'tiled_basis':
+            raise ValueError('仅分块曲面模型（tiled_basis）支持增量追加已知点')
+        refitted = model.surface.update(
+            _column(known_points, 'lat'),
+            _column(known_points, 'lon'),
+            _column(known_points, 'anomaly'),
+            executor=self.tile_executor
+        )
+        lats, lons, _ = model.surface.known.T
+        model.extent = {
+            'min_lat': float(lats.min()), 'max_lat': float(lats.max()),
+            'min_lon': float(lons.min()), 'max_lon': float(lons.max())
+        }
+        self._tiled_statistics(model)
+        return {
+            'model_id': model_id,
+            'refitted_tiles': [list(key) for key in refitted],
+            'tiles_total': len(model.surface.tiles),
+            'known_points_count': len(lats),
+            'statistics': model.statistics
+        }
 
 
 # 兼容性函数（保持向后兼容）
@@ -0,0 +1,102 @@
+"""Chunked reading and writing of whitespace GPS-leveling point files.
+
+Lines are ``name lat lon H [anomaly]``; blank lines and ``#`` comments are
+skipped. Unknown-point files are consumed a chunk at a time and each chunk's
+results are formatted before the next one is read, so memory stays bounded by
+``chunk_size`` however long the file is.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+Point = Dict[str, Any]
+Predictor = Callable[[List[Point]], List[Dict[str, Any]]]
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _parse_line(line: str, number: int, with_anomaly: bool) -> Tuple[List[str], Point] | None:
+    text = line.strip()
+    if not text or text.startswith("#"):
+        return None
+    tokens = text.split()
+    required = 5 if with_anomaly else 4
+    if len(tokens) < required:
+        raise ValueError(f"第 {number} 行字段不足，应为 name lat lon H{' anomaly' if with_anomaly else ''}")
+    try:
+        point = {"name": tokens[0], "lat": float(tokens[1]), "lon": float(tokens[2]), "H": float(tokens[3])}
+        if with_anomaly:
+            point["anomaly"] = float(tokens[4])
+    except ValueError as exc:
+        raise ValueError(f"第 {number} 行数值格式错误: {text}") from exc
+    return tokens[:4], point
+
+
+def read_points(lines: Iterable[str], *, with_anomaly: bool = False) -> List[Point]:
+    """Parse a whole (small) point file, e.g. the known points."""
+
+    return [parsed[1] for parsed in _iter_parsed(lines, with_anomaly)]
+
+
+def _iter_parsed(lines: Iterable[str], with_anomaly: bool) -> Iterator[Tuple[List[str], Point]]:
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig")
+        parsed = _parse_line(line, number, with_anomaly)
+        if parsed is not None:
+            yield parsed
+
+
+def iter_chunks(lines: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[List[List[str]], List[Point]]]:
+    """Yield ``(raw tokens, points)`` for successive chunks of unknown points."""
+
+    chunk_size = max(int(chunk_size), 1)
+    tokens: List[List[str]] = []
+    points: List[Point] = []
+    for raw, point in _iter_parsed(lines, False):
+        tokens.append(raw)
+        points.append(point)
+        if len(points) >= chunk_size:
+            yield tokens, points
+            tokens, points = [], []
+    if points:
+        yield tokens, points
+
+
+def _format(value: Any, decimals: int) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    return f"{value:.{decimals}f}"
+
+
+def stream_normal_heights(
+    lines: Iterable[str],
+    predict: Predictor,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    decimals: int = 4,
+) -> Iterator[str]:
+    """Yield the output text block by block: a ``#`` header, then one block per chunk.
+
+    Each line keeps the input ``name lat lon H`` tokens verbatim and appends
+    the anomaly, the normal height and, when the model provides it,
+    ``normal_height_std``. Points outside a grid are written as ``NaN``.
+    """
+
+    header_written = False
+    for tokens, points in iter_chunks(lines, chunk_size):
+        rows = predict(points)
+        with_std = "normal_height_std" in rows[0]
+        if not header_written:
+            columns = "name lat lon H anomaly normal_height" + (" normal_height_std" if with_std else "")
+            yield f"# {columns}\n"
+            header_written = True
+        block = []
+        for raw, row in zip(tokens, rows):
+            values = [row.get("calculated_anomaly"), row.get("normal_height")]
+            if with_std:
+                values.append(row.get("normal_height_std"))
+            block.append(" ".join(raw + [_format(value, decimals) for value in values]))
+        yield "\n".join(block) + "\n"
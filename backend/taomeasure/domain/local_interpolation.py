@@ -0,0 +1,287 @@
+"""Local height-anomaly interpolation over KD-tree neighbourhoods.
+
+Every prediction only looks at the ``k`` nearest known points, so the cost per
+unknown is fixed by ``k`` rather than by the size of the network. The small
+per-point systems are stacked and solved in batches with ``np.linalg.solve``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import pdist
+
+LOCAL_METHODS = ("multiquadric", "thin_plate", "kriging", "mls")
+VARIOGRAM_MODELS = ("spherical", "exponential", "gaussian")
+
+EARTH_RADIUS = 6371000.0
+_CHUNK = 4096
+_VARIOGRAM_SAMPLE = 2000
+_VARIOGRAM_BINS = 15
+
+
+def local_plane(lats: np.ndarray, lons: np.ndarray, ref_lat: float, ref_lon: float) -> np.ndarray:
+    """Small-area north/east offsets in metres from the reference point."""
+
+    north = (lats - ref_lat) * np.pi / 180 * EARTH_RADIUS
+    east = (lons - ref_lon) * np.pi / 180 * EARTH_RADIUS * np.cos(ref_lat * np.pi / 180)
+    return np.column_stack([north, east])
+
+
+def variogram(model: str, lag: np.ndarray, nugget: float, sill: float, range_: float) -> np.ndarray:
+    """Semivariance of a bounded variogram model; ``sill`` is the partial sill."""
+
+    h = np.asarray(lag, dtype=float) / range_
+    if model == "spherical":
+        shape = np.where(h < 1.0, 1.5 * h - 0.5 * h**3, 1.0)
+    elif model == "exponential":
+        shape = 1.0 - np.exp(-3.0 * h)
+    else:
+        shape = 1.0 - np.exp(-3.0 * h**2)
+    return np.where(lag > 0, nugget + sill * shape, 0.0)
+
+
+def fit_variogram(xy: np.ndarray, values: np.ndarray, model: str = "spherical") -> Dict[str, Any]:
+    """Fit ``model`` to the binned empirical semivariogram, weighting bins by pair count."""
+
+    if model not in VARIOGRAM_MODELS:
+        raise ValueError(f"未支持的变异函数模型: {model}")
+    if len(values) > _VARIOGRAM_SAMPLE:
+        # 固定种子抽样，保证同一批已知点得到同一变异函数
+        sample = np.random.default_rng(0).choice(len(values), _VARIOGRAM_SAMPLE, replace=False)
+        xy, values = xy[sample], values[sample]
+
+    lags = pdist(xy)
+    semivariance = 0.5 * pdist(values[:, None], "sqeuclidean")
+    variance = float(np.var(values))
+    max_lag = float(lags.max()) / 2 if len(lags) else 0.0
+    if max_lag <= 0 or variance <= 0:
+        return {"model": model, "nugget": 0.0, "sill": variance, "range": max(max_lag, 1.0)}
+
+    within = lags <= max_lag
+    bins = np.minimum((lags[within] / max_lag * _VARIOGRAM_BINS).astype(int), _VARIOGRAM_BINS - 1)
+    counts = np.bincount(bins, minlength=_VARIOGRAM_BINS)
+    filled = counts > 0
+    centres = np.bincount(bins, lags[within], _VARIOGRAM_BINS)[filled] / counts[filled]
+    gammas = np.bincount(bins, semivariance[within], _VARIOGRAM_BINS)[filled] / counts[filled]
+    weights = np.sqrt(counts[filled])
+
+    def residual(params: np.ndarray) -> np.ndarray:
+        nugget, sill, range_ = params
+        return weights * (variogram(model, centres, nugget, sill, range_) - gammas)
+
+    solution = least_squares(
+        residual,
+        x0=[0.0, variance, max_lag / 2],
+        bounds=([0.0, 0.0, max_lag / 100], [2 * variance, 4 * variance, 4 * max_lag]),
+    )
+    nugget, sill, range_ = (float(value) for value in solution.x)
+    return {"model": model, "nugget": nugget, "sill": sill, "range": range_}
+
+
+def _solve(matrix: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Batched solve; only singular members fall back to minimum-norm least squares.
+
+    A singular system makes ``np.linalg.solve`` reject the whole stack, so the
+    stack is then solved system by system and well-conditioned neighbourhoods
+    keep the exact solution however the points were chunked.
+    """
+
+    try:
+        return np.linalg.solve(matrix, rhs[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        solution = np.empty(rhs.shape)
+        for index in range(len(matrix)):
+            try:
+                solution[index] = np.linalg.solve(matrix[index], rhs[index])
+            except np.linalg.LinAlgError:
+                solution[index] = np.linalg.lstsq(matrix[index], rhs[index], rcond=None)[0]
+        return solution
+
+
+def _polynomial(offsets: np.ndarray, degree: int) -> np.ndarray:
+    """Local polynomial basis on scaled offsets, shape (m, k, terms)."""
+
+    u, v = offsets[..., 0], offsets[..., 1]
+    columns = [np.ones_like(u), u, v]
+    if degree == 2:
+        columns += [u * u, u * v, v * v]
+    return np.stack(columns, axis=-1)
+
+
+@dataclass
+class LocalInterpolator:
+    """RBF, ordinary kriging or moving-least-squares interpolation on planar offsets.
+
+    ``shape`` is the multiquadric shape parameter in metres (default: mean
+    nearest-neighbour spacing); ``degree`` is the MLS polynomial order and
+    ``variogram`` the fitted kriging model.
+    """
+
+    method: str
+    xy: np.ndarray
+    values: np.ndarray
+    neighbors: int = 12
+    shape: Optional[float] = None
+    degree: int = 2
+    variogram: Optional[Dict[str, Any]] = None
+    tree: cKDTree = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.xy = np.asarray(self.xy, dtype=float).reshape(-1, 2)
+        self.values = np.asarray(self.values, dtype=float).reshape(-1)
+        self.tree = cKDTree(self.xy)
+
+    @classmethod
+    def fit(
+        cls,
+        xy: np.ndarray,
+        values: np.ndarray,
+        method: str,
+        *,
+        neighbors: int = 12,
+        shape: Optional[float] = None,
+        degree: int = 2,
+        variogram_model: str = "spherical",
+    ) -> "LocalInterpolator":
+        if method not in LOCAL_METHODS:
+            raise ValueError(f"未支持的局部插值方法: {method}")
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        values = np.asarray(values, dtype=float).reshape(-1)
+        neighbors = min(int(neighbors), len(values))
+        degree = 2 if int(degree) >= 2 and neighbors >= 6 else 1
+        if neighbors < 3:
+            raise ValueError("局部插值至少需要 3 个邻近已知点")
+
+        if method == "multiquadric" and not shape:
+            spacing, _ = cKDTree(xy).query(xy, k=2)
+            shape = float(np.mean(spacing[:, 1])) or 1.0
+        model = fit_variogram(xy, values, variogram_model) if method == "kriging" else None
+        return cls(
+            method=method,
+            xy=xy,
+            values=values,
+            neighbors=neighbors,
+            shape=float(shape) if shape else None,
+            degree=degree,
+            variogram=model,
+        )
+
+    def predict(self, xy: np.ndarray, *, leave_one_out: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Interpolate at ``xy``; returns values and, for kriging, the standard deviation.
+
+        With ``leave_one_out`` the query points are the known points themselves
+        and each one is predicted from its neighbours excluding itself.
+        """
+
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        k = min(self.neighbors + int(leave_one_out), len(self.values))
+        distance, index = self.tree.query(xy, k=k)
+        distance, index = distance.reshape(len(xy), k), index.reshape(len(xy), k)
+        if leave_one_out:
+            own = index == np.arange(len(xy))[:, None]
+            own[~own.any(axis=1), -1] = True
+            keep = ~own
+            distance = distance[keep].reshape(len(xy), k - 1)
+            index = index[keep].reshape(len(xy), k - 1)
+
+        values = np.empty(len(xy))
+        std = np.empty(len(xy)) if self.method == "kriging" else None
+        for start in range(0, len(xy), _CHUNK):
+            rows = slice(start, start + _CHUNK)
+            offsets = self.xy[index[rows]] - xy[rows, None, :]
+            estimate, spread = self._predict_chunk(offsets, distance[rows], self.values[index[rows]])
+            values[rows] = estimate
+            if std is not None:
+                std[rows] = spread
+        return values, std
+
+    def _predict_chunk(
+        self, offsets: np.ndarray, distance: np.ndarray, values: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        m, k = values.shape
+        pairwise = np.linalg.norm(offsets[:, :, None, :] - offsets[:, None, :, :], axis=-1)
+
+        if self.method == "kriging":
+            model = self.variogram
+            gamma = variogram(model["model"], pairwise, model["nugget"], model["sill"], model["range"])
+            target = variogram(model["model"], distance, model["nugget"], model["sill"], model["range"])
+            system = np.ones((m, k + 1, k + 1))
+            system[:, :k, :k] = gamma
+            system[:, k, k] = 0.0
+            rhs = np.concatenate([target, np.ones((m, 1))], axis=1)
+            weights = _solve(system, rhs)
+            estimate = np.einsum("mk,mk->m", weights[:, :k], values)
+            variance = np.einsum("mk,mk->m", weights, rhs)
+            return estimate, np.sqrt(np.maximum(variance, 0.0))
+
+        # 以邻域最远距离缩放局部坐标，改善小方程组的条件数
+        scale = np.maximum(distance[:, -1], 1e-9)[:, None]
+        scaled = offsets / scale[..., None]
+        if self.method == "mls":
+            # Wendland 紧支撑权函数，支撑半径取邻域最远距离的 1.1 倍
+            radius = distance / scale / 1.1
+            weights = (1 - radius) ** 4 * (4 * radius + 1)
+            basis = _polynomial(scaled, self.degree)
+            weighted = basis * weights[..., None]
+            normal = np.einsum("mki,mkj->mij", weighted, basis)
+            coefficients = _solve(normal, np.einsum("mki,mk->mi", weighted, values))
+            return coefficients[:, 0], None
+
+        radius = pairwise / scale[..., None]
+        to_target = distance / scale
+        if self.method == "multiquadric":
+            c = self.shape / scale
+            kernel = np.sqrt(radius**2 + c[..., None] ** 2)
+            target = np.sqrt(to_target**2 + c**2)
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                kernel = np.where(radius > 0, radius**2 * np.log(radius), 0.0)
+                target = np.where(to_target > 0, to_target**2 * np.log(to_target), 0.0)
+        basis = _polynomial(scaled, 1)
+        terms = basis.shape[-1]
+        system = np.zeros((m, k + terms, k + terms))
+        system[:, :k, :k] = kernel
+        system[:, :k, k:] = basis
+        system[:, k:, :k] = np.swapaxes(basis, 1, 2)
+        rhs = np.concatenate([values, np.zeros((m, terms))], axis=1)
+        solution = _solve(system, rhs)
+        # 待求点位于局部原点，多项式部分只剩常数项
+        return np.einsum("mk,mk->m", solution[:, :k], target) + solution[:, k], None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "neighbors": self.neighbors,
+            "shape": self.shape,
+            "degree": self.degree,
+            "variogram": self.variogram,
+            "xy": self.xy.tolist(),
+            "values": self.values.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "LocalInterpolator":
+        method = raw.get("method")
+        if method not in LOCAL_METHODS:
+            raise ValueError(f"未支持的局部插值方法: {method}")
+        try:
+            xy = np.asarray(raw["xy"], dtype=float).reshape(-1, 2)
+            values = np.asarray(raw["values"], dtype=float).reshape(len(xy))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError("局部插值模型缺少有效的已知点坐标与高程异常") from exc
+        if method == "kriging" and not raw.get("variogram"):
+            raise ValueError("克里金模型缺少变异函数参数")
+        return cls(
+            method=method,
+            xy=xy,
+            values=values,
+            neighbors=int(raw.get("neighbors") or 12),
+            shape=raw.get("shape"),
+            degree=int(raw.get("degree") or 2),
+            variogram=raw.get("variogram"),
+        )
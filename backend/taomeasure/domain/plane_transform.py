@@ -0,0 +1,111 @@
+"""Affine and polynomial plane transformations solved and applied on whole arrays."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+PLANE_MODELS = {"affine": 1, "polynomial2": 2, "polynomial3": 3}
+
+
+def _terms(order: int) -> List[Tuple[int, int]]:
+    """Exponent pairs (i, j) of u^i v^j ordered by total degree."""
+
+    return [(degree - j, j) for degree in range(order + 1) for j in range(degree + 1)]
+
+
+def design_matrix(uv: np.ndarray, order: int) -> np.ndarray:
+    """Monomial design matrix, one column per term of ``_terms(order)``."""
+
+    u, v = uv[:, 0], uv[:, 1]
+    return np.column_stack([u**i * v**j for i, j in _terms(order)])
+
+
+@dataclass
+class PlaneTransformation:
+    """x' = Σ a_ij u^i v^j, y' = Σ b_ij u^i v^j on normalised coordinates.
+
+    ``u = (x - origin_x) / normalization`` and likewise for ``v``; centring and
+    scaling keep the third-order normal equations well conditioned for grid
+    coordinates in the millions of metres. With the default origin (0, 0) and
+    normalization 1 the coefficients act on raw coordinates, which is the form
+    used for manually entered affine parameters.
+    """
+
+    model: str
+    coefficients: np.ndarray
+    origin: np.ndarray
+    normalization: float = 1.0
+
+    @property
+    def order(self) -> int:
+        return PLANE_MODELS[self.model]
+
+    @staticmethod
+    def minimum_points(model: str) -> int:
+        order = PLANE_MODELS[model]
+        return (order + 1) * (order + 2) // 2
+
+    @classmethod
+    def fit(cls, source: np.ndarray, target: np.ndarray, model: str) -> "PlaneTransformation":
+        """Least-squares fit of both output axes with a single lstsq call."""
+
+        if model not in PLANE_MODELS:
+            raise ValueError(f"未支持的平面转换模型: {model}")
+        required = cls.minimum_points(model)
+        if len(source) < required:
+            raise ValueError(f"解算 {model} 平面转换至少需要 {required} 个公共点。")
+
+        origin = source.mean(axis=0)
+        normalization = float(np.abs(source - origin).max()) or 1.0
+        design = design_matrix((source - origin) / normalization, PLANE_MODELS[model])
+        coefficients, _, rank, _ = np.linalg.lstsq(design, target, rcond=None)
+        if rank < design.shape[1]:
+            raise ValueError("公共点分布退化（共线或重复），无法解算平面转换参数。")
+        return cls(model=model, coefficients=coefficients, origin=origin, normalization=normalization)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "PlaneTransformation":
+        """Rebuild a transformation from ``to_dict`` output or manual coefficients."""
+
+        model = str(raw.get("model") or "affine").lower()
+        if model not in PLANE_MODELS:
+            raise ValueError(f"未支持的平面转换模型: {model}")
+        coefficients = raw.get("coefficients") or {}
+        size = cls.minimum_points(model)
+        try:
+            columns = np.column_stack(
+                [np.asarray(coefficients.get(axis), dtype=float).reshape(size) for axis in ("x", "y")]
+            )
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"{model} 平面转换需要 x、y 各 {size} 个系数。") from exc
+        origin = np.asarray(raw.get("origin") or (0.0, 0.0), dtype=float).reshape(2)
+        normalization = float(raw.get("normalization") or 1.0)
+        return cls(model=model, coefficients=columns, origin=origin, normalization=normalization)
+
+    def apply(self, xy: np.ndarray) -> np.ndarray:
+        """Transform an (n, 2) array; NaN rows stay NaN."""
+
+        return design_matrix((xy - self.origin) / self.normalization, self.order) @ self.coefficients
+
+    def residuals(self, source: np.ndarray, target: np.ndarray) -> Tuple[np.ndarray, Dict[str, Optional[float]]]:
+        """Residuals target − f(source) and per-axis RMSE."""
+
+        residual = target - self.apply(source)
+        if not len(residual):
+            return residual, {"x": None, "y": None}
+        rmse = np.sqrt((residual**2).mean(axis=0))
+        return residual, {"x": float(rmse[0]), "y": float(rmse[1])}
+
+    def to_dict(self) -> Dict[str, Any]:
+        terms = [f"u^{i}v^{j}" for i, j in _terms(self.order)]
+        return {
+            "model": self.model,
+            "order": self.order,
+            "terms": terms,
+            "coefficients": {"x": self.coefficients[:, 0].tolist(), "y": self.coefficients[:, 1].tolist()},
+            "origin": self.origin.tolist(),
+            "normalization": self.normalization,
+        }
@@ -0,0 +1,105 @@
+"""Name and proximity matching of control points between two coordinate systems."""
+
+from __future__ import annotations
+
+import heapq
+import re
+import unicodedata
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+_NAME_NOISE = re.compile(r"[\s_\-.·]+")
+
+
+def normalise_point_name(name: str | None) -> str:
+    """Fold width/case and drop separators so ``gps-01`` matches ``ＧＰＳ 01``."""
+
+    if not name:
+        return ""
+    return _NAME_NOISE.sub("", unicodedata.normalize("NFKC", str(name))).upper()
+
+
+def match_names(source: Sequence[str | None], target: Sequence[str | None]) -> List[Tuple[int, int]]:
+    """Index pairs whose normalised names are equal and unique on both sides."""
+
+    def unique_index(names: Sequence[str | None]) -> Dict[str, int]:
+        index: Dict[str, int] = {}
+        duplicates = set()
+        for position, name in enumerate(names):
+            key = normalise_point_name(name)
+            if not key:
+                continue
+            if key in index:
+                duplicates.add(key)
+            index[key] = position
+        return {key: position for key, position in index.items() if key not in duplicates}
+
+    source_index = unique_index(source)
+    target_index = unique_index(target)
+    return [(position, target_index[key]) for key, position in source_index.items() if key in target_index]
+
+
+def match_nearest(
+    source: np.ndarray, target: np.ndarray, tolerance: float, k: int = 8
+) -> List[Tuple[int, int, float]]:
+    """One-to-one nearest-neighbour pairs within ``tolerance``.
+
+    Equivalent to accepting all candidate pairs greedily in global order of
+    distance (ties by source, then target index). The KD-tree over the targets
+    is built once and every source queries its ``k`` nearest targets in a
+    single call; a heap holds each unmatched source's closest unchecked
+    candidate, so the globally shortest open pair is always decided next.
+    A source whose candidates are used up before it is matched queries again
+    with twice its ``k``, so matching costs O(n·k log n) unless many sources
+    compete for the same handful of targets. NaN rows never match.
+    """
+
+    source_rows = np.flatnonzero(~np.isnan(source).any(axis=1))
+    target_rows = np.flatnonzero(~np.isnan(target).any(axis=1))
+    if not len(source_rows) or not len(target_rows):
+        return []
+
+    tree = cKDTree(target[target_rows])
+
+    def candidates(rows: np.ndarray, count: int):
+        distance, nearest = tree.query(source[source_rows[rows]], k=count, distance_upper_bound=tolerance)
+        distance = distance.reshape(len(rows), count)
+        nearest = nearest.reshape(len(rows), count)
+        # 等距候选按目标序号排列，与全局贪心的次序一致
+        order = np.lexsort((nearest, distance), axis=1)
+        distance = np.take_along_axis(distance, order, axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        # 容差内的候选不足 count 个或已取全部目标时，候选表完整，无需扩大 k 重查
+        for row_distance, row_nearest in zip(distance, nearest):
+            within = np.isfinite(row_distance)
+            yield row_distance[within], row_nearest[within], not within.all() or count == len(target_rows)
+
+    k = max(1, min(int(k), len(target_rows)))
+    lists = list(candidates(np.arange(len(source_rows)), k))
+    heap = [(float(row_distance[0]), row, int(row_nearest[0]), 0)
+            for row, (row_distance, row_nearest, _) in enumerate(lists) if len(row_distance)]
+    heapq.heapify(heap)
+
+    claimed = np.zeros(len(target_rows), dtype=bool)
+    pairs: List[Tuple[int, int, float]] = []
+    while heap:
+        gap, row, column, position = heapq.heappop(heap)
+        if not claimed[column]:
+            claimed[column] = True
+            pairs.append((int(source_rows[row]), int(target_rows[column]), gap))
+            continue
+        # 目标已被更近的点对占用，跳到该源点下一个未占用的候选
+        while True:
+            row_distance, row_nearest, complete = lists[row]
+            free = np.flatnonzero(~claimed[row_nearest[position:]])
+            if len(free):
+                position += int(free[0])
+                heapq.heappush(heap, (float(row_distance[position]), row, int(row_nearest[position]), position))
+                break
+            if complete:
+                break
+            position = len(row_distance)
+            lists[row] = next(candidates(np.array([row]), min(2 * position, len(target_rows))))
+    return pairs
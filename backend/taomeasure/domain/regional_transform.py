@@ -0,0 +1,363 @@
+"""Regional piecewise transformation sets built on a spatial partition of control points."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .covariance import bursa_wolf_parameter_jacobian
+
+SEVEN_PARAMETER_KEYS = ("dx", "dy", "dz", "rx", "ry", "rz", "scale")
+FOUR_PARAMETER_KEYS = ("dx", "dy", "rotation", "scale")
+
+_MIN_POINTS = {"seven": 3, "four": 2}
+
+
+@dataclass
+class KDPartition:
+    """KD-tree over control points flattened into node arrays.
+
+    Inner nodes store a split axis and threshold, leaves store a cell id. Routing
+    walks all query points down the tree one level at a time, so the Python loop
+    runs over the tree depth rather than over points.
+    """
+
+    axis: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    cell: np.ndarray
+    point_cell: np.ndarray
+
+    @classmethod
+    def build(cls, coords: np.ndarray, leaf_size: int) -> "KDPartition":
+        """Split on the axis of largest spread at the median until leaves are small enough."""
+
+        axis: List[int] = []
+        threshold: List[float] = []
+        left: List[int] = []
+        right: List[int] = []
+        cell: List[int] = []
+        point_cell = np.empty(len(coords), dtype=np.intp)
+
+        def new_node() -> int:
+            axis.append(-1)
+            threshold.append(0.0)
+            left.append(-1)
+            right.append(-1)
+            cell.append(-1)
+            return len(axis) - 1
+
+        stack = [(new_node(), np.arange(len(coords)))]
+        cell_count = 0
+        while stack:
+            node, members = stack.pop()
+            subset = coords[members]
+            spread = subset.max(axis=0) - subset.min(axis=0) if len(members) else np.zeros(coords.shape[1])
+            if len(members) <= leaf_size or not np.any(spread > 0):
+                cell[node] = cell_count
+                point_cell[members] = cell_count
+                cell_count += 1
+                continue
+
+            split_axis = int(np.argmax(spread))
+            order = np.argsort(subset[:, split_axis], kind="stable")
+            half = len(members) // 2
+            low, high = members[order[:half]], members[order[half:]]
+            axis[node] = split_axis
+            threshold[node] = float(
+                (coords[low[-1], split_axis] + coords[high[0], split_axis]) / 2
+            )
+            left[node] = new_node()
+            right[node] = new_node()
+            stack.append((left[node], low))
+            stack.append((right[node], high))
+
+        return cls(
+            axis=np.asarray(axis, dtype=np.intp),
+            threshold=np.asarray(threshold, dtype=float),
+            left=np.asarray(left, dtype=np.intp),
+            right=np.asarray(right, dtype=np.intp),
+            cell=np.asarray(cell, dtype=np.intp),
+            point_cell=point_cell,
+        )
+
+    @property
+    def cell_count(self) -> int:
+        return int(self.cell.max()) + 1 if len(self.cell) else 0
+
+    def route(self, coords: np.ndarray) -> np.ndarray:
+        """Return the leaf cell id for every row of ``coords``."""
+
+        node = np.zeros(len(coords), dtype=np.intp)
+        while True:
+            node_axis = self.axis[node]
+            active = np.nonzero(node_axis >= 0)[0]
+            if not len(active):
+                break
+            current = node[active]
+            go_left = coords[active, node_axis[active]] <= self.threshold[current]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+        return self.cell[node]
+
+
+def apply_bursa_wolf(xyz: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """Vectorised Bursa-Wolf transformation; ``params`` is (7,) or one row per point."""
+
+    params = np.asarray(params, dtype=float)
+    dx, dy, dz, rx, ry, rz, m = (params[..., index] for index in range(7))
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    scale = 1.0 + m
+    return np.column_stack(
+        (
+            dx + scale * (x - rz * y + ry * z),
+            dy + scale * (rz * x + y - rx * z),
+            dz + scale * (-ry * x + rx * y + z),
+        )
+    )
+
+
+def apply_similarity_2d(xy: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """Vectorised four-parameter transformation; ``params`` is (4,) or one row per point."""
+
+    params = np.asarray(params, dtype=float)
+    dx, dy, rotation, m = (params[..., index] for index in range(4))
+    scale = 1.0 + m
+    cos_a = np.cos(rotation)
+    sin_a = np.sin(rotation)
+    x, y = xy[:, 0], xy[:, 1]
+    return np.column_stack((dx + scale * (x * cos_a - y * sin_a), dy + scale * (x * sin_a + y * cos_a)))
+
+
+@dataclass
+class RegionalTransformation:
+    """One parameter set per KD cell plus the index needed to route points to it."""
+
+    model: str
+    partition: KDPartition
+    parameters: np.ndarray
+    centroids: np.ndarray
+    radii: np.ndarray
+    observations: np.ndarray
+    rmse: np.ndarray
+    overlap: float = 0.0
+    blend: int = 1
+
+    @classmethod
+    def fit(
+        cls,
+        source: np.ndarray,
+        target: np.ndarray,
+        model: str = "seven",
+        *,
+        leaf_size: Optional[int] = None,
+        overlap: float = 0.0,
+        blend: int = 1,
+    ) -> "RegionalTransformation":
+        """Partition the control set and solve every cell in one batched least-squares pass."""
+
+        if model not in _MIN_POINTS:
+            raise ValueError(f"未支持的分区转换模型: {model}")
+        dim = 3 if model == "seven" else 2
+        source = np.asarray(source, dtype=float)[:, :dim]
+        target = np.asarray(target, dtype=float)[:, :dim]
+        minimum = _MIN_POINTS[model]
+        if len(source) < minimum:
+            raise ValueError(f"分区转换至少需要 {minimum} 个公共点。")
+
+        leaf_size = max(int(leaf_size or 4 * minimum), 2 * minimum)
+        partition = KDPartition.build(source, leaf_size)
+        cells = partition.cell_count
+
+        counts = np.bincount(partition.point_cell, minlength=cells)
+        centroids = np.zeros((cells, dim))
+        np.add.at(centroids, partition.point_cell, source)
+        centroids /= counts[:, None]
+        offsets = np.linalg.norm(source - centroids[partition.point_cell], axis=1)
+        radii = np.zeros(cells)
+        np.maximum.at(radii, partition.point_cell, offsets)
+
+        member_point, member_cell = cls._memberships(source, partition.point_cell, centroids, radii, overlap)
+        observations = np.bincount(member_cell, minlength=cells)
+        if np.any(observations < minimum):
+            raise ValueError("存在公共点不足的分区，请增大 leaf_size。")
+
+        if model == "seven":
+            parameters = cls._solve_seven(source, target, member_point, member_cell, centroids, radii)
+            predicted = apply_bursa_wolf(source[member_point], parameters[member_cell])
+        else:
+            parameters = cls._solve_four(source, target, member_point, member_cell, centroids)
+            predicted = apply_similarity_2d(source[member_point], parameters[member_cell])
+
+        squared = np.zeros((cells, dim))
+        np.add.at(squared, member_cell, (target[member_point] - predicted) ** 2)
+        rmse = np.sqrt(squared / observations[:, None])
+
+        return cls(
+            model=model,
+            partition=partition,
+            parameters=parameters,
+            centroids=centroids,
+            radii=radii,
+            observations=observations,
+            rmse=rmse,
+            overlap=float(overlap),
+            blend=max(int(blend), 1),
+        )
+
+    @staticmethod
+    def _memberships(
+        source: np.ndarray,
+        point_cell: np.ndarray,
+        centroids: np.ndarray,
+        radii: np.ndarray,
+        overlap: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Pair control points with the cells they contribute to, widening cells by ``overlap``."""
+
+        own_point = np.arange(len(source))
+        if overlap <= 0:
+            return own_point, point_cell
+
+        tree = cKDTree(source)
+        neighbours = tree.query_ball_point(centroids, r=radii * (1.0 + overlap) + 1e-9)
+        extra_cell = np.repeat(np.arange(len(centroids)), [len(item) for item in neighbours])
+        extra_point = np.fromiter((index for item in neighbours for index in item), dtype=np.intp, count=len(extra_cell))
+        pairs = np.unique(
+            np.column_stack((np.concatenate((own_point, extra_point)), np.concatenate((point_cell, extra_cell)))),
+            axis=0,
+        )
+        return pairs[:, 0], pairs[:, 1]
+
+    @staticmethod
+    def _batched_solve(
+        design: np.ndarray,
+        observed: np.ndarray,
+        member_cell: np.ndarray,
+        cells: int,
+    ) -> np.ndarray:
+        """Accumulate per-cell normal equations and solve them as one stack."""
+
+        unknowns = design.shape[-1]
+        normal = np.zeros((cells, unknowns, unknowns))
+        rhs = np.zeros((cells, unknowns))
+        np.add.at(normal, member_cell, np.einsum("nri,nrj->nij", design, design))
+        np.add.at(rhs, member_cell, np.einsum("nri,nr->ni", design, observed))
+        return np.einsum("cij,cj->ci", np.linalg.pinv(normal), rhs)
+
+    @classmethod
+    def _solve_seven(
+        cls,
+        source: np.ndarray,
+        target: np.ndarray,
+        member_point: np.ndarray,
+        member_cell: np.ndarray,
+        centroids: np.ndarray,
+        radii: np.ndarray,
+    ) -> np.ndarray:
+        # Centre on the cell centroid and scale the rotation/scale columns by the
+        # cell radius so small cells far from the geocentre stay well conditioned.
+        rho = np.where(radii > 0, radii, 1.0)
+        local = (source[member_point] - centroids[member_cell]) / rho[member_cell, None]
+        design = bursa_wolf_parameter_jacobian(local)
+        observed = target[member_point] - source[member_point]
+        solution = cls._batched_solve(design, observed, member_cell, len(centroids))
+
+        theta = solution[:, 3:] / rho[:, None]
+        translation = solution[:, :3] - np.einsum("cri,ci->cr", bursa_wolf_parameter_jacobian(centroids)[:, :, 3:], theta)
+        return np.column_stack((translation, theta))
+
+    @classmethod
+    def _solve_four(
+        cls,
+        source: np.ndarray,
+        target: np.ndarray,
+        member_point: np.ndarray,
+        member_cell: np.ndarray,
+        centroids: np.ndarray,
+    ) -> np.ndarray:
+        u, v = (source[member_point] - centroids[member_cell]).T
+        ones = np.ones_like(u)
+        zeros = np.zeros_like(u)
+        design = np.stack(
+            (
+                np.column_stack((u, -v, ones, zeros)),
+                np.column_stack((v, u, zeros, ones)),
+            ),
+            axis=1,
+        )
+        a, b, c, d = cls._batched_solve(design, target[member_point], member_cell, len(centroids)).T
+        cx, cy = centroids.T
+        return np.column_stack((c - a * cx + b * cy, d - b * cx - a * cy, np.arctan2(b, a), np.hypot(a, b) - 1.0))
+
+    # ------------------------------------------------------------------ #
+    # Application
+    # ------------------------------------------------------------------ #
+    def point_parameters(self, coords: np.ndarray) -> np.ndarray:
+        """Return one (optionally blended) parameter row per query point."""
+
+        dim = self.centroids.shape[1]
+        coords = np.asarray(coords, dtype=float)[:, :dim]
+        if self.blend <= 1 or len(self.centroids) == 1:
+            return self.parameters[self.partition.route(coords)]
+
+        k = min(self.blend, len(self.centroids))
+        distances, neighbours = cKDTree(self.centroids).query(coords, k=k)
+        weights = 1.0 / np.maximum(distances, 1e-6) ** 2
+        weights /= weights.sum(axis=1, keepdims=True)
+        return np.einsum("nk,nkp->np", weights, self.parameters[neighbours])
+
+    def apply(self, coords: np.ndarray) -> np.ndarray:
+        """Transform an array of source coordinates (XYZ for seven, xy for four)."""
+
+        dim = self.centroids.shape[1]
+        coords = np.asarray(coords, dtype=float)[:, :dim]
+        params = self.point_parameters(coords)
+        if self.model == "seven":
+            return apply_bursa_wolf(coords, params)
+        return apply_similarity_2d(coords, params)
+
+    def parameters_as_dicts(self, params: np.ndarray) -> List[Dict[str, float]]:
+        """Expand parameter rows into the dict layout used by the single-set routines."""
+
+        keys = SEVEN_PARAMETER_KEYS if self.model == "seven" else FOUR_PARAMETER_KEYS
+        return [dict(zip(keys, row)) for row in params.tolist()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarise the cells for API responses."""
+
+        keys = SEVEN_PARAMETER_KEYS if self.model == "seven" else FOUR_PARAMETER_KEYS
+        axes = ("x", "y", "z")[: self.centroids.shape[1]]
+        cells = []
+        for index, row in enumerate(self.parameters.tolist()):
+            entry: Dict[str, Any] = dict(zip(keys, row))
+            entry["scale_ppm"] = entry["scale"] * 1_000_000
+            if self.model == "seven":
+                entry["rotation_arcsec"] = {
+                    axis: entry[axis] * (180 / math.pi) * 3600 for axis in ("rx", "ry", "rz")
+                }
+            else:
+                entry["rotation_arcsec"] = entry["rotation"] * (180 / math.pi) * 3600
+                entry["scale_factor"] = 1.0 + entry["scale"]
+            entry.update(
+                {
+                    "cell": index,
+                    "centroid": self.centroids[index].tolist(),
+                    "radius": float(self.radii[index]),
+                    "observations": int(self.observations[index]),
+                    "rmse": dict(zip(axes, self.rmse[index].tolist())),
+                }
+            )
+            cells.append(entry)
+        return {
+            "model": self.model,
+            "cell_count": len(cells),
+            "overlap": self.overlap,
+            "blend": self.blend,
+            "cells": cells,
+        }
+
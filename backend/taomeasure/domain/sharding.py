@@ -0,0 +1,125 @@
+"""Process-pool execution of array kernels over shared-memory shards.
+
+Inputs are copied once into a shared ``(k, n)`` block and every worker writes
+its rows of the ``(n, m)`` output block in place, so neither direction is
+pickled. Only the kernel callable, the block names and the row range travel
+to the workers.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Kernel = Callable[..., np.ndarray]
+
+
+def _run_shard(
+    kernel: Kernel,
+    input_name: str,
+    input_shape: Tuple[int, int],
+    output_name: str,
+    output_shape: Tuple[int, int],
+    start: int,
+    stop: int,
+) -> None:
+    source_block = SharedMemory(name=input_name)
+    target_block = SharedMemory(name=output_name)
+    try:
+        source = np.ndarray(input_shape, dtype=float, buffer=source_block.buf)
+        target = np.ndarray(output_shape, dtype=float, buffer=target_block.buf)
+        target[start:stop] = kernel(*(column[start:stop] for column in source))
+        del source, target
+    finally:
+        source_block.close()
+        target_block.close()
+
+
+class ShardedExecutor:
+    """Fan array kernels out to a process pool once inputs exceed ``threshold`` rows.
+
+    ``kernel`` must be picklable (a module-level function or a ``partial`` of
+    one) and return an ``(rows, m)`` array for column inputs of ``rows`` items.
+    Below the threshold, or with a single worker, the kernel runs in-process.
+    """
+
+    def __init__(self, workers: Optional[int] = None, threshold: int = 500_000) -> None:
+        self.workers = max(int(workers or os.cpu_count() or 1), 1)
+        self.threshold = max(int(threshold), 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn avoids forking a multi-threaded WSGI process.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(self.shutdown)
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def map_tasks(self, function: Callable[[Any], Any], tasks: Sequence[Any], size: int) -> List[Any]:
+        """Apply ``function`` to independent picklable tasks, pooled once ``size`` reaches the threshold."""
+
+        if size < self.threshold or self.workers == 1 or len(tasks) < 2:
+            return [function(task) for task in tasks]
+        chunksize = max(len(tasks) // (4 * self.workers), 1)
+        return list(self._get_pool().map(function, tasks, chunksize=chunksize))
+
+    def map_columns(self, kernel: Kernel, columns: Sequence[np.ndarray], width: int) -> np.ndarray:
+        """Evaluate ``kernel(*columns)`` and return its ``(n, width)`` result."""
+
+        count = len(columns[0]) if columns else 0
+        if count < self.threshold or self.workers == 1:
+            return np.asarray(kernel(*columns), dtype=float).reshape(count, width)
+
+        input_shape = (len(columns), count)
+        output_shape = (count, width)
+        source_block = SharedMemory(create=True, size=max(8 * len(columns) * count, 1))
+        target_block = SharedMemory(create=True, size=max(8 * count * width, 1))
+        try:
+            source = np.ndarray(input_shape, dtype=float, buffer=source_block.buf)
+            for index, column in enumerate(columns):
+                source[index] = column
+            del source
+
+            shard = -(-count // self.workers)
+            pool = self._get_pool()
+            futures = [
+                pool.submit(
+                    _run_shard,
+                    kernel,
+                    source_block.name,
+                    input_shape,
+                    target_block.name,
+                    output_shape,
+                    start,
+                    min(start + shard, count),
+                )
+                for start in range(0, count, shard)
+            ]
+            for future in futures:
+                future.result()
+
+            target = np.ndarray(output_shape, dtype=float, buffer=target_block.buf)
+            result = target.copy()
+            del target
+            return result
+        finally:
+            for block in (source_block, target_block):
+                block.close()
+                block.unlink()
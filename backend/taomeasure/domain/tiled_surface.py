@@ -0,0 +1,352 @@
+"""Tiled piecewise height-anomaly surfaces with smooth blending across tile overlaps.
+
+The survey area is cut into a regular lat/lon tile lattice. Each tile fits a
+plane or quadratic surface to the known points inside its core widened by
+``overlap`` on every side. A point's anomaly is the average of the surfaces of
+every tile whose widened window contains it, weighted by a smoothstep taper
+that falls to zero at the window edge. The weights therefore change smoothly
+and there are no seams between tiles. A tile whose points cannot support even
+a plane keeps the whole-area background surface, re-expanded about the tile
+centre, so holes blend into the background instead of jumping to it. Because the lattice is regular, routing
+is integer arithmetic on whole arrays: a point can only fall in the 3 × 3
+block of tiles around its core tile.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TILE_MODELS = {"plane": (0, 1, 3), "quadratic": (0, 1, 2, 3, 4, 5)}
+TERMS = 6
+
+Key = Tuple[int, int]
+
+
+def _design(delta_B: np.ndarray, delta_L: np.ndarray) -> np.ndarray:
+    """Quadratic surface basis ζ = a₀ + a₁ΔB + a₂ΔB² + a₃ΔL + a₄ΔL² + a₅ΔLΔB."""
+
+    return np.column_stack(
+        [np.ones(len(delta_B)), delta_B, delta_B**2, delta_L, delta_L**2, delta_L * delta_B]
+    )
+
+
+def _fit_surface(
+    lats: np.ndarray, lons: np.ndarray, anomalies: np.ndarray, center: Tuple[float, float], model_type: str
+) -> Optional[Dict[str, Any]]:
+    """Least-squares surface about ``center``; drops to a plane when the points are too few."""
+
+    columns = TILE_MODELS[model_type]
+    if len(anomalies) < len(columns):
+        columns = TILE_MODELS["plane"]
+    if len(anomalies) < len(columns):
+        return None
+    design = _design(lats - center[0], lons - center[1])[:, columns]
+    solution, _, rank, _ = np.linalg.lstsq(design, anomalies, rcond=None)
+    if rank < len(columns):
+        return None
+    coefficients = np.zeros(TERMS)
+    coefficients[list(columns)] = solution
+    return {
+        "center": [float(center[0]), float(center[1])],
+        "coefficients": coefficients.tolist(),
+        "count": int(len(anomalies)),
+        "model_type": "quadratic" if len(columns) == TERMS else "plane",
+    }
+
+
+def _recentered(surface: Dict[str, Any], center: Tuple[float, float]) -> np.ndarray:
+    """Coefficients of ``surface`` re-expanded about ``center`` (the same quadratic, shifted basis)."""
+
+    a0, a1, a2, a3, a4, a5 = surface["coefficients"]
+    d = center[0] - surface["center"][0]
+    e = center[1] - surface["center"][1]
+    return np.array([
+        a0 + a1 * d + a2 * d * d + a3 * e + a4 * e * e + a5 * d * e,
+        a1 + 2 * a2 * d + a5 * e,
+        a2,
+        a3 + 2 * a4 * e + a5 * d,
+        a4,
+        a5,
+    ])
+
+
+def _fit_tile(task: Tuple[Key, np.ndarray, np.ndarray, np.ndarray, Tuple[float, float], str]):
+    """Process-pool entry point: fit one tile."""
+
+    key, lats, lons, anomalies, center, model_type = task
+    return key, _fit_surface(lats, lons, anomalies, center, model_type)
+
+
+def _smoothstep(distance: np.ndarray, width: float) -> np.ndarray:
+    if width <= 0:
+        return (distance >= 0).astype(float)
+    s = np.clip(distance / width, 0.0, 1.0)
+    return s * s * (3 - 2 * s)
+
+
+@dataclass
+class TiledSurface:
+    """Blended tile surfaces on a lattice anchored at ``(lat0, lon0)`` with ``size``-degree tiles."""
+
+    lat0: float
+    lon0: float
+    size: float
+    overlap: float
+    model_type: str
+    tiles: Dict[Key, Dict[str, Any]]
+    background: Dict[str, Any]
+    known: np.ndarray
+    _table: Optional[Tuple[int, int, np.ndarray, np.ndarray, np.ndarray]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def margin(self) -> float:
+        """Widening of each tile core in degrees."""
+
+        return self.overlap * self.size
+
+    @classmethod
+    def fit(
+        cls,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        anomalies: np.ndarray,
+        *,
+        model_type: str = "quadratic",
+        tile_size: Optional[float] = None,
+        overlap: float = 0.25,
+        points_per_tile: int = 200,
+        executor=None,
+    ) -> "TiledSurface":
+        """Lay out tiles over the known points and fit each one.
+
+        Without ``tile_size`` the tile edge is chosen so that a tile core
+        holds about ``points_per_tile`` points on average. ``overlap`` is the
+        widening of each side as a fraction of the tile size, at most 0.5.
+        """
+
+        if model_type not in TILE_MODELS:
+            raise ValueError(f"未支持的分块曲面类型: {model_type}")
+        lats, lons, anomalies = (np.asarray(values, dtype=float) for values in (lats, lons, anomalies))
+        overlap = float(min(max(overlap, 0.0), 0.5))
+        if not tile_size:
+            area = max(float(np.ptp(lats)) * float(np.ptp(lons)), 1e-12)
+            tile_size = math.sqrt(area * max(int(points_per_tile), 6) / len(anomalies))
+        tile_size = float(tile_size)
+        if tile_size <= 0:
+            raise ValueError("分块边长必须为正")
+
+        center = (float(lats.mean()), float(lons.mean()))
+        background = _fit_surface(lats, lons, anomalies, center, model_type)
+        if background is None:
+            raise ValueError("已知点不足，无法拟合分块曲面")
+        surface = cls(
+            lat0=float(lats.min()),
+            lon0=float(lons.min()),
+            size=tile_size,
+            overlap=overlap,
+            model_type=model_type,
+            tiles={},
+            background=background,
+            known=np.column_stack([lats, lons, anomalies]),
+        )
+        surface.tiles = surface._fit_tiles(surface._keys_for(lats, lons), executor)
+        return surface
+
+    def _route(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Sorted unique ``(row, col, point)`` triples for every tile window containing each point.
+
+        With ``overlap`` ≤ 0.5 a window spans at most two tiles per axis, so the
+        low and high tile indices along each axis enumerate all of them.
+        """
+
+        shifts = (-self.margin, self.margin)
+        rows = [np.floor((lats - self.lat0 + shift) / self.size).astype(np.int64) for shift in shifts]
+        cols = [np.floor((lons - self.lon0 + shift) / self.size).astype(np.int64) for shift in shifts]
+        index = np.arange(len(lats), dtype=np.int64)
+        triples = np.concatenate([np.column_stack([row, col, index]) for row in rows for col in cols])
+        return np.unique(triples, axis=0)
+
+    def _keys_for(self, lats: np.ndarray, lons: np.ndarray) -> List[Key]:
+        """Tiles whose widened window contains any of the points."""
+
+        return [tuple(pair) for pair in np.unique(self._route(lats, lons)[:, :2], axis=0).tolist()]
+
+    def _window(self, key: Key) -> Tuple[float, float, float, float]:
+        row, col = key
+        return (
+            self.lat0 + row * self.size - self.margin,
+            self.lat0 + (row + 1) * self.size + self.margin,
+            self.lon0 + col * self.size - self.margin,
+            self.lon0 + (col + 1) * self.size + self.margin,
+        )
+
+    def _fit_tiles(self, keys: Sequence[Key], executor) -> Dict[Key, Dict[str, Any]]:
+        lats, lons, anomalies = self.known.T
+        triples = self._route(lats, lons)
+        starts = np.flatnonzero(np.any(np.diff(triples[:, :2], axis=0) != 0, axis=1)) + 1
+        wanted = set(keys)
+        tasks = []
+        for group in np.split(triples, starts):
+            key = (int(group[0, 0]), int(group[0, 1]))
+            if key not in wanted:
+                continue
+            members = group[:, 2]
+            low_lat, high_lat, low_lon, high_lon = self._window(key)
+            center = ((low_lat + high_lat) / 2, (low_lon + high_lon) / 2)
+            tasks.append((key, lats[members], lons[members], anomalies[members], center, self.model_type))
+        if executor is not None:
+            fitted = executor.map_tasks(_fit_tile, tasks, size=sum(len(task[3]) for task in tasks))
+        else:
+            fitted = [_fit_tile(task) for task in tasks]
+        windows = {task[0]: task for task in tasks}
+        tiles = {}
+        for key, tile in fitted:
+            if tile is None:
+                center = windows[key][4]
+                tile = {
+                    "center": [float(center[0]), float(center[1])],
+                    "coefficients": _recentered(self.background, center).tolist(),
+                    "count": int(len(windows[key][3])),
+                    "model_type": "background",
+                    "fallback": True,
+                }
+            tiles[key] = tile
+        return tiles
+
+    def update(self, lats: np.ndarray, lons: np.ndarray, anomalies: np.ndarray, executor=None) -> List[Key]:
+        """Add benchmarks and refit only the tiles whose windows contain them.
+
+        The refreshed tile set is built aside and swapped in, so concurrent
+        predictions see either the old or the new surface.
+        """
+
+        lats, lons, anomalies = (np.asarray(values, dtype=float) for values in (lats, lons, anomalies))
+        keys = self._keys_for(lats, lons)
+        self.known = np.concatenate([self.known, np.column_stack([lats, lons, anomalies])])
+        tiles = dict(self.tiles)
+        for key in keys:
+            tiles.pop(key, None)
+        tiles.update(self._fit_tiles(keys, executor))
+        self.tiles, self._table = tiles, None
+        return keys
+
+    def _lookup(self) -> Tuple[int, int, np.ndarray, np.ndarray, np.ndarray]:
+        """Dense (row, col) tables of coefficients, centres and validity built once per tile set."""
+
+        table = self._table
+        if table is None:
+            keys = np.array(list(self.tiles), dtype=np.int64).reshape(-1, 2)
+            row0, col0 = keys.min(axis=0) if len(keys) else (0, 0)
+            shape = tuple((keys.max(axis=0) - (row0, col0) + 1).tolist()) if len(keys) else (1, 1)
+            coefficients = np.zeros(shape + (TERMS,))
+            centers = np.zeros(shape + (2,))
+            valid = np.zeros(shape, dtype=bool)
+            for (row, col), tile in self.tiles.items():
+                coefficients[row - row0, col - col0] = tile["coefficients"]
+                centers[row - row0, col - col0] = tile["center"]
+                valid[row - row0, col - col0] = True
+            table = (int(row0), int(col0), coefficients, centers, valid)
+            self._table = table
+        return table
+
+    def predict(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Blend the covering tiles; points no tile covers fall back to the whole-area surface."""
+
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        row0, col0, coefficients, centers, valid = self._lookup()
+        rows, cols = valid.shape
+        core_rows = np.floor((lats - self.lat0) / self.size).astype(np.int64)
+        core_cols = np.floor((lons - self.lon0) / self.size).astype(np.int64)
+        width = 2 * self.margin
+
+        total = np.zeros(len(lats))
+        weights = np.zeros(len(lats))
+        for row_offset in (-1, 0, 1):
+            tile_rows = core_rows + row_offset
+            low = self.lat0 + tile_rows * self.size - self.margin
+            row_weight = _smoothstep(np.minimum(lats - low, low + self.size + 2 * self.margin - lats), width)
+            for col_offset in (-1, 0, 1):
+                tile_cols = core_cols + col_offset
+                low = self.lon0 + tile_cols * self.size - self.margin
+                col_weight = _smoothstep(np.minimum(lons - low, low + self.size + 2 * self.margin - lons), width)
+                r, c = tile_rows - row0, tile_cols - col0
+                present = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+                r, c = np.where(present, r, 0), np.where(present, c, 0)
+                weight = row_weight * col_weight * (present & valid[r, c])
+                active = weight > 0
+                if not active.any():
+                    continue
+                tile_center = centers[r[active], c[active]]
+                values = np.einsum(
+                    "ij,ij->i",
+                    _design(lats[active] - tile_center[:, 0], lons[active] - tile_center[:, 1]),
+                    coefficients[r[active], c[active]],
+                )
+                total[active] += weight[active] * values
+                weights[active] += weight[active]
+
+        result = np.empty(len(lats))
+        covered = weights > 0
+        result[covered] = total[covered] / weights[covered]
+        if not covered.all():
+            center = self.background["center"]
+            result[~covered] = _design(lats[~covered] - center[0], lons[~covered] - center[1]) @ np.asarray(
+                self.background["coefficients"]
+            )
+        return result
+
+    def describe(self) -> Dict[str, Any]:
+        counts = [tile["count"] for tile in self.tiles.values() if not tile.get("fallback")]
+        failed = sorted(list(key) for key, tile in self.tiles.items() if tile.get("fallback"))
+        return {
+            "tile_size": self.size,
+            "overlap": self.overlap,
+            "model_type": self.model_type,
+            "tiles": len(self.tiles),
+            "points_per_tile": {"min": min(counts), "max": max(counts)} if counts else None,
+            "failed_tiles": failed,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "lat0": self.lat0,
+            "lon0": self.lon0,
+            "size": self.size,
+            "overlap": self.overlap,
+            "model_type": self.model_type,
+            "tiles": [dict(tile, key=list(key)) for key, tile in self.tiles.items()],
+            "background": self.background,
+            "known": self.known.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "TiledSurface":
+        try:
+            tiles: Dict[Key, Dict[str, Any]] = {}
+            for tile in raw["tiles"]:
+                tile = dict(tile)
+                row, col = (int(value) for value in tile.pop("key"))
+                if len(tile["coefficients"]) != TERMS or len(tile["center"]) != 2:
+                    raise ValueError("分块系数维数错误")
+                tiles[(row, col)] = tile
+            known = np.asarray(raw.get("known") or [], dtype=float).reshape(-1, 3)
+            return cls(
+                lat0=float(raw["lat0"]),
+                lon0=float(raw["lon0"]),
+                size=float(raw["size"]),
+                overlap=float(raw.get("overlap", 0.25)),
+                model_type=str(raw.get("model_type", "quadratic")),
+                tiles=tiles,
+                background=dict(raw["background"]),
+                known=known,
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"分块曲面模型定义无效: {exc}") from exc
+
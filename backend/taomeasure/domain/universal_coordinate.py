@@ -2,30 +2,79 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import math
-from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from functools import cached_property, partial
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 
-
-@dataclass
+from .covariance import (
+    bursa_wolf_parameter_jacobian,
+    bursa_wolf_point_jacobian,
+    cartesian_to_local_jacobian,
+    covariance_columns,
+    gauss_jacobian,
+    local_to_cartesian_jacobian,
+    propagate,
+    stack_covariances,
+)
+from .plane_transform import PlaneTransformation
+from .point_pairing import match_names, match_nearest
+from .regional_transform import (
+    FOUR_PARAMETER_KEYS,
+    SEVEN_PARAMETER_KEYS,
+    RegionalTransformation,
+    apply_bursa_wolf,
+    apply_similarity_2d,
+)
+from .sharding import ShardedExecutor
+
+GEODETIC_AXES = ("n", "e", "u")
+CARTESIAN_AXES = ("X", "Y", "Z")
+GRID_AXES = ("x", "y")
+
+
+@dataclass(frozen=True)
 class Ellipsoid:
-    """Basic ellipsoid definition."""
+    """Basic ellipsoid definition.
+
+    Instances are immutable so they can be shared between requests through the
+    system cache; derived constants are computed once on first access.
+    """
 
     name: str
     semi_major_axis: float
     flattening: float
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-    def __post_init__(self) -> None:
-        self._refresh()
+    @cached_property
+    def semi_minor_axis(self) -> float:
+        return self.semi_major_axis * (1 - self.flattening)
+
+    @cached_property
+    def first_eccentricity_squared(self) -> float:
+        return 2 * self.flattening - self.flattening**2
 
-    def _refresh(self) -> None:
-        self.semi_minor_axis = self.semi_major_axis * (1 - self.flattening)
-        self.first_eccentricity_squared = 2 * self.flattening - self.flattening**2
-        self.second_eccentricity_squared = (
-            self.first_eccentricity_squared / (1 - self.first_eccentricity_squared)
+    @cached_property
+    def second_eccentricity_squared(self) -> float:
+        return self.first_eccentricity_squared / (1 - self.first_eccentricity_squared)
+
+    @cached_property
+    def meridian_coefficients(self) -> Tuple[float, float, float, float]:
+        """A0, A2, A4, A6 of the meridian arc series."""
+
+        e2 = self.first_eccentricity_squared
+        return (
+            1 - e2 / 4 - 3 * e2**2 / 64 - 5 * e2**3 / 256,
+            3 / 8 * (e2 + e2**2 / 4 + 15 * e2**3 / 128),
+            15 / 256 * (e2**2 + 3 * e2**3 / 4),
+            35 * e2**3 / 3072,
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -45,7 +94,7 @@ class Ellipsoid:
         return payload
 
 
-@dataclass
+@dataclass(frozen=True)
 class ProjectionParams:
     """Gaussian projection configuration."""
 
@@ -67,7 +116,7 @@ class ProjectionParams:
         return payload
 
 
-@dataclass
+@dataclass(frozen=True)
 class GeoidParams:
     """Geoid undulation / normal height correction."""
 
@@ -77,7 +126,7 @@ class GeoidParams:
         return {"undulation": self.undulation}
 
 
-@dataclass
+@dataclass(frozen=True)
 class CoordinateSystemConfig:
     """Bundle of ellipsoid + projection + geoid information."""
 
@@ -86,9 +135,11 @@ class CoordinateSystemConfig:
     projection: ProjectionParams
     geoid: GeoidParams
     metadata: Dict[str, Any] = field(default_factory=dict)
+    system_id: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         payload = {
+            "id": self.system_id,
             "name": self.name,
             "ellipsoid": self.ellipsoid.to_dict(),
             "projection": self.projection.to_dict(),
@@ -114,6 +165,10 @@ class PointRecord:
     y: Optional[float] = None
     h: Optional[float] = None
     zone: Optional[int] = None
+    point_scale_factor: Optional[float] = None
+    meridian_convergence: Optional[float] = None
+    epoch: Optional[float] = None
+    velocity: Optional[Tuple[float, float, float]] = None
     source_metadata: Dict[str, Any] = field(default_factory=dict)
     diagnostics: List[str] = field(default_factory=list)
 
@@ -132,6 +187,10 @@ class PointRecord:
             y=self.y,
             h=self.h,
             zone=self.zone,
+            point_scale_factor=self.point_scale_factor,
+            meridian_convergence=self.meridian_convergence,
+            epoch=self.epoch,
+            velocity=self.velocity,
             source_metadata=dict(self.source_metadata),
             diagnostics=list(self.diagnostics),
         )
@@ -156,6 +215,13 @@ class PointRecord:
         if include_dms:
             payload["B_dms"] = format_dms(self.B) if self.B is not None else None
             payload["L_dms"] = format_dms(self.L) if self.L is not None else None
+        if self.point_scale_factor is not None:
+            payload["point_scale_factor"] = self.point_scale_factor
+            payload["meridian_convergence"] = self.meridian_convergence
+        if self.epoch is not None:
+            payload["epoch"] = self.epoch
+        if self.velocity is not None:
+            payload["VX"], payload["VY"], payload["VZ"] = self.velocity
         if self.diagnostics:
             payload["diagnostics"] = self.diagnostics
         if self.source_metadata:
@@ -239,10 +305,192 @@ def format_dms(value: Optional[float], decimals: int = 3) -> Optional[str]:
     return f"{sign}{degrees}°{minutes:02d}′{seconds:0{4 + decimals}.{decimals}f}″"
 
 
+def columns_from_records(
+    records: List[Dict[str, Any]],
+    decimals: Optional[int] = None,
+    exclude: Tuple[str, ...] = (),
+) -> Dict[str, Any]:
+    """Transpose per-point records into one list per field.
+
+    Nested objects (``source``/``target``, ``from``/``to``) become nested
+    column sets. Rows lacking a field contribute ``None`` so every list keeps
+    the record count; float values are rounded when ``decimals`` is given.
+    """
+
+    keys: Dict[str, None] = {}
+    for record in records:
+        for key in record:
+            if key not in exclude:
+                keys.setdefault(key)
+
+    columns: Dict[str, Any] = {}
+    for key in keys:
+        values = [record.get(key) for record in records]
+        if any(isinstance(value, dict) for value in values):
+            nested = [value if isinstance(value, dict) else {} for value in values]
+            columns[key] = columns_from_records(nested, decimals, exclude)
+        elif decimals is not None:
+            columns[key] = [round(value, decimals) if isinstance(value, float) else value for value in values]
+        else:
+            columns[key] = values
+    return columns
+
+
+def _first_present(raw: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = raw.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def parse_column(
+    rows: List[Dict[str, Any]],
+    keys: Tuple[str, ...],
+    parser: Callable[[Any], Optional[float]] = parse_float,
+) -> np.ndarray:
+    """Parse one field of every row into a float array, NaN where it is missing.
+
+    ``keys`` are aliases tried in order. Plain numeric columns convert in a
+    single numpy call; columns with DMS strings, blanks or thousands separators
+    fall back to ``parser`` value by value.
+    """
+
+    values = [_first_present(raw, keys) for raw in rows]
+    try:
+        column = np.array(values, dtype=float)
+        if column.shape == (len(values),):
+            return column
+    except (TypeError, ValueError):
+        pass
+    return np.array([parser(value) for value in values], dtype=float).reshape(len(values))
+
+
+_ENDPOINT_FIELDS: Tuple[Tuple[Tuple[str, ...], Callable[[Any], Optional[float]]], ...] = (
+    (("B", "lat", "latitude"), parse_angle),
+    (("L", "lon", "longitude"), parse_angle),
+    (("H", "H_ellipsoid", "ellipsoidal_height"), parse_float),
+    (("h", "H_normal", "orthometric_height"), parse_float),
+    (("x",), parse_float),
+    (("y",), parse_float),
+)
+
+
+def _dms_column(values: np.ndarray, valid: np.ndarray) -> List[Optional[str]]:
+    return [format_dms(value) if ok else None for value, ok in zip(values.tolist(), valid.tolist())]
+
+
+def _column_values(column: Any, missing: np.ndarray, decimals: Optional[int]) -> Any:
+    """One result column as a JSON-ready list, ``None`` on ``missing`` rows and NaN entries."""
+
+    if isinstance(column, dict):
+        return {key: _column_values(value, missing, decimals) for key, value in column.items()}
+    if isinstance(column, np.ndarray) and column.dtype.kind == "f":
+        if decimals is not None and column.ndim == 1:
+            column = np.round(column, decimals)
+        missing = missing | np.isnan(column).reshape(len(column), -1).any(axis=1)
+    values = list(column.tolist() if isinstance(column, np.ndarray) else column)
+    for index in np.flatnonzero(missing).tolist():
+        values[index] = None
+    return values
+
+
+def _column_rows(column: Any) -> List[Any]:
+    if isinstance(column, dict):
+        keys = list(column)
+        return [dict(zip(keys, items)) for items in zip(*(_column_rows(column[key]) for key in keys))]
+    return column
+
+
+def results_from_columns(
+    names: List[str],
+    valid: np.ndarray,
+    error: Any,
+    columns: Dict[str, Any],
+    optional: Optional[Dict[str, Any]] = None,
+    *,
+    columnar: bool = False,
+    decimals: Optional[int] = None,
+) -> Any:
+    """Assemble batch results from whole result columns.
+
+    ``columns`` maps fields to (n,) arrays, lists or nested column dicts;
+    ``optional`` columns (covariances) are left out of records where they are
+    missing. Invalid rows carry ``error`` (one message or one per row) instead
+    of values. The columnar layout is returned directly from the converted
+    columns, with 1-D float columns rounded to ``decimals``; only the records
+    layout builds per-row dicts.
+    """
+
+    valid = np.asarray(valid, dtype=bool)
+    errors = np.broadcast_to(np.asarray(error, dtype=object), valid.shape).tolist()
+    decimals = decimals if columnar else None
+    lists = {key: _column_values(column, ~valid, decimals) for key, column in columns.items()}
+    extra = {key: _column_values(column, ~valid, decimals) for key, column in (optional or {}).items()}
+
+    if columnar:
+        payload: Dict[str, Any] = {"name": list(names), **lists, **extra}
+        if not valid.all():
+            payload["error"] = [None if ok else message for ok, message in zip(valid.tolist(), errors)]
+        return payload
+
+    keys = list(lists)
+    value_rows = zip(*(_column_rows(lists[key]) for key in keys)) if keys else repeat(())
+    extra_rows = zip(*(extra[key] for key in extra)) if extra else repeat(())
+    results: List[Dict[str, Any]] = []
+    for name, ok, message, values, extra_values in zip(names, valid.tolist(), errors, value_rows, extra_rows):
+        if not ok:
+            results.append({"name": name, "error": message})
+            continue
+        entry = {"name": name, **dict(zip(keys, values))}
+        for key, value in zip(extra, extra_values):
+            if value is not None:
+                entry[key] = value
+        results.append(entry)
+    return results
+
+
+def _batch_payload(results: Any, valid: np.ndarray, columnar: bool, **summary: Any) -> Dict[str, Any]:
+    payload = {"results": results, "count": int(valid.sum()), **summary}
+    if columnar:
+        payload["format"] = "columnar"
+    return payload
+
+
+_KERNEL_SERVICE: Optional["UniversalCoordinateService"] = None
+
+
+def _array_kernel(
+    name: str,
+    context: Tuple[Any, ...],
+    options: Dict[str, Any],
+    *columns: np.ndarray,
+) -> np.ndarray:
+    """Picklable entry point evaluating one service array kernel on a shard."""
+
+    global _KERNEL_SERVICE
+    if _KERNEL_SERVICE is None:
+        _KERNEL_SERVICE = UniversalCoordinateService(system_cache_size=1, shard_workers=1)
+    result = getattr(_KERNEL_SERVICE, name)(*columns, *context, **options)
+    if isinstance(result, tuple):
+        return np.column_stack(result)
+    return np.asarray(result).reshape(len(columns[0]), -1)
+
+
 class UniversalCoordinateService:
     """High level orchestration for the universal coordinate engine."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        system_cache_size: int = 128,
+        *,
+        shard_workers: Optional[int] = None,
+        shard_threshold: int = 500_000,
+    ) -> None:
+        self._sharding = ShardedExecutor(shard_workers, shard_threshold)
+        self._system_cache: "OrderedDict[str, CoordinateSystemConfig]" = OrderedDict()
+        self._system_cache_size = max(int(system_cache_size), 1)
+        self._system_cache_lock = threading.Lock()
         self._ellipsoid_registry: Dict[str, Dict[str, float]] = {
             "CGCS2000": {"a": 6378137.0, "f_inverse": 298.257222101},
             "WGS84": {"a": 6378137.0, "f_inverse": 298.257223563},
@@ -277,10 +525,42 @@ class UniversalCoordinateService:
             },
         }
 
-    def build_system(self, raw: Dict[str, Any] | None, fallback_name: str) -> CoordinateSystemConfig:
-        """Convert arbitrary payload into a consistent system configuration."""
-
-        raw = raw or {}
+    def build_system(self, raw: Dict[str, Any] | str | None, fallback_name: str) -> CoordinateSystemConfig:
+        """Convert arbitrary payload into a consistent system configuration.
+
+        Payloads are canonicalised and hashed; the resulting id keys a bounded
+        LRU cache of immutable configurations, so repeated systems skip the
+        parsing entirely. ``raw`` may also be a previously returned id, either
+        as a string or as ``{"id": ...}`` without further fields.
+        """
+
+        if isinstance(raw, str) or (isinstance(raw, dict) and set(raw) == {"id"}):
+            system_id = raw if isinstance(raw, str) else str(raw["id"])
+            with self._system_cache_lock:
+                cached = self._system_cache.get(system_id)
+                if cached is not None:
+                    self._system_cache.move_to_end(system_id)
+            if cached is None:
+                raise ValueError(f"未找到坐标系统 {system_id}，请重新提交完整的坐标系统定义。")
+            return cached
+
+        raw = {key: value for key, value in (raw or {}).items() if key != "id"}
+        canonical = json.dumps([fallback_name, raw], sort_keys=True, ensure_ascii=False, default=str)
+        system_id = hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+        with self._system_cache_lock:
+            cached = self._system_cache.get(system_id)
+            if cached is not None:
+                self._system_cache.move_to_end(system_id)
+                return cached
+
+        system = self._parse_system(raw, fallback_name, system_id)
+        with self._system_cache_lock:
+            self._system_cache[system_id] = system
+            while len(self._system_cache) > self._system_cache_size:
+                self._system_cache.popitem(last=False)
+        return system
+
+    def _parse_system(self, raw: Dict[str, Any], fallback_name: str, system_id: str) -> CoordinateSystemConfig:
         name = raw.get("name") or fallback_name
 
         ellipsoid_payload = raw.get("ellipsoid") or {}
@@ -361,7 +641,9 @@ class UniversalCoordinateService:
         geoid_payload = raw.get("geoid") or raw.get("height") or {}
         geoid = GeoidParams(undulation=parse_float(geoid_payload.get("undulation")) or 0.0)
 
-        return CoordinateSystemConfig(name=name, ellipsoid=ellipsoid, projection=projection, geoid=geoid)
+        return CoordinateSystemConfig(
+            name=name, ellipsoid=ellipsoid, projection=projection, geoid=geoid, system_id=system_id
+        )
 
     # ------------------------------------------------------------------ #
     # Point level helpers
@@ -381,6 +663,10 @@ class UniversalCoordinateService:
         point.y = parse_float(raw.get("y"))
         point.h = parse_float(raw.get("h") or raw.get("H_normal") or raw.get("orthometric_height"))
         point.zone = raw.get("zone")
+        point.epoch = parse_float(raw.get("epoch") or raw.get("t"))
+        velocity = [parse_float(raw.get(key)) for key in ("VX", "VY", "VZ")]
+        if all(value is not None for value in velocity):
+            point.velocity = (velocity[0], velocity[1], velocity[2])
         return point
 
     def fill_point_components(
@@ -389,8 +675,13 @@ class UniversalCoordinateService:
         system: CoordinateSystemConfig,
         *,
         prefer_h_over_H: bool = False,
+        with_projection_factors: bool = False,
     ) -> PointRecord:
-        """Derive missing coordinate components whenever feasible."""
+        """Derive missing coordinate components whenever feasible.
+
+        ``with_projection_factors`` additionally attaches the point scale factor
+        and meridian convergence of the Gauss projection to the record.
+        """
 
         ellipsoid = system.ellipsoid
         projection = system.projection
@@ -439,8 +730,12 @@ class UniversalCoordinateService:
         if central_meridian is not None and point.B is not None and point.L is not None and (
             point.x is None or point.y is None
         ):
-            x, y = self._gauss_forward(point.B, point.L, central_meridian, projection, ellipsoid)
-            point.x, point.y = x, y
+            x, y, scale, convergence = self._gauss_forward_array(
+                point.B, point.L, central_meridian, projection, ellipsoid, with_factors=True
+            )
+            point.x, point.y = float(x), float(y)
+            if with_projection_factors:
+                point.point_scale_factor, point.meridian_convergence = float(scale), float(convergence)
             point.diagnostics.append("Gauss projection coordinates derived from BL.")
 
         if (
@@ -456,11 +751,109 @@ class UniversalCoordinateService:
                 point.L = L
             point.diagnostics.append("BL inferred from Gauss projection coordinates.")
 
+        if (
+            with_projection_factors
+            and point.point_scale_factor is None
+            and central_meridian is not None
+            and point.B is not None
+            and point.L is not None
+        ):
+            scale, convergence = self._gauss_point_factors(point.B, point.L, central_meridian, projection, ellipsoid)
+            point.point_scale_factor, point.meridian_convergence = float(scale), float(convergence)
+
         return point
 
     # ------------------------------------------------------------------ #
     # Parameter estimation
     # ------------------------------------------------------------------ #
+    def pair_common_points(
+        self,
+        source_points: List[PointRecord],
+        target_points: List[PointRecord],
+        *,
+        tolerance: float = 1.0,
+        space: str = "auto",
+        match_by_name: bool = True,
+    ) -> Dict[str, Any]:
+        """Pair two unpaired control lists by normalised name, then by proximity.
+
+        Name matches seed a rough four-parameter (plane) or seven-parameter
+        (cartesian) fit. The remaining source points are pushed through it and
+        paired with the nearest unclaimed target within ``tolerance`` metres
+        using a KD-tree; without enough seeds the raw coordinates are compared.
+        """
+
+        def usable(points: List[PointRecord], keys: Tuple[str, ...]) -> int:
+            return sum(all(getattr(point, key) is not None for key in keys) for point in points)
+
+        if space == "auto":
+            plane = min(usable(source_points, ("x", "y")), usable(target_points, ("x", "y")))
+            cartesian = min(usable(source_points, CARTESIAN_AXES), usable(target_points, CARTESIAN_AXES))
+            space = "plane" if plane and plane >= cartesian else "cartesian"
+        if space == "plane":
+            keys: Tuple[str, ...] = ("x", "y")
+        elif space == "cartesian":
+            keys = CARTESIAN_AXES
+        else:
+            raise ValueError(f"未支持的配对坐标空间: {space}")
+
+        source = np.array([[getattr(p, key) for key in keys] for p in source_points], dtype=float)
+        target = np.array([[getattr(p, key) for key in keys] for p in target_points], dtype=float)
+        source = source.reshape(-1, len(keys))
+        target = target.reshape(-1, len(keys))
+
+        named = match_names([p.name for p in source_points], [p.name for p in target_points]) if match_by_name else []
+        seeds = [(i, j) for i, j in named if not (np.isnan(source[i]).any() or np.isnan(target[j]).any())]
+
+        rough = source
+        rough_model = "none"
+        try:
+            seed_pairs = [(source_points[i], target_points[j]) for i, j in seeds]
+            if space == "plane" and len(seeds) >= 2:
+                params = self.solve_four_parameters(seed_pairs)
+                rough = apply_similarity_2d(source, [params[key] for key in FOUR_PARAMETER_KEYS])
+                rough_model = "four"
+            elif space == "cartesian" and len(seeds) >= 3:
+                params = self.solve_seven_parameters(seed_pairs)
+                rough = apply_bursa_wolf(source, [params[key] for key in SEVEN_PARAMETER_KEYS])
+                rough_model = "seven"
+        except ValueError:
+            rough_model = "none"
+
+        paired_source = {i for i, _ in named}
+        paired_target = {j for _, j in named}
+        rest_source = np.array([i for i in range(len(source_points)) if i not in paired_source], dtype=np.intp)
+        rest_target = np.array([j for j in range(len(target_points)) if j not in paired_target], dtype=np.intp)
+        nearby = [
+            (int(rest_source[i]), int(rest_target[j]), gap)
+            for i, j, gap in match_nearest(rough[rest_source], target[rest_target], tolerance)
+        ]
+
+        matches = [(i, j, "name") for i, j in named] + [(i, j, "proximity") for i, j, _ in nearby]
+        pairs: List[Dict[str, Any]] = []
+        for i, j, method in matches:
+            gap = float(np.linalg.norm(rough[i] - target[j]))
+            pairs.append(
+                {
+                    "name": source_points[i].name or target_points[j].name,
+                    "source": source_points[i].to_payload(),
+                    "target": target_points[j].to_payload(),
+                    "method": method,
+                    "distance": None if math.isnan(gap) else gap,
+                }
+            )
+
+        matched_source = paired_source | {i for i, _, _ in nearby}
+        matched_target = paired_target | {j for _, j, _ in nearby}
+        return {
+            "pairs": pairs,
+            "unmatched_source": [p.to_payload() for i, p in enumerate(source_points) if i not in matched_source],
+            "unmatched_target": [p.to_payload() for j, p in enumerate(target_points) if j not in matched_target],
+            "space": space,
+            "rough_model": rough_model,
+            "tolerance": tolerance,
+        }
+
     def solve_seven_parameters(self, points: List[Tuple[PointRecord, PointRecord]]) -> Dict[str, Any]:
         """Least squares solution for Bursa-Wolf parameters."""
 
@@ -497,6 +890,15 @@ class UniversalCoordinateService:
         # Column ordering: dx, dy, dz, rx, ry, rz, m
         sol, *_ = np.linalg.lstsq(A, L_vec, rcond=None)
 
+        # Parameter covariance σ0²(AᵀA)⁻¹, usable for propagating into converted points.
+        dof = A.shape[0] - A.shape[1]
+        v = L_vec - A @ sol
+        sigma0 = math.sqrt(float(v @ v) / dof) if dof > 0 else 0.0
+        # Equilibrate the columns first: translations and rotations differ by ~1e6 in scale.
+        column_scale = 1.0 / np.maximum(np.linalg.norm(A, axis=0), 1e-12)
+        scaled = A * column_scale
+        parameter_covariance = sigma0**2 * np.outer(column_scale, column_scale) * np.linalg.pinv(scaled.T @ scaled)
+
         dx, dy, dz, rx, ry, rz, m = sol.tolist()
 
         residuals = []
@@ -538,6 +940,8 @@ class UniversalCoordinateService:
             "residuals": residuals,
             "rmse": rmse,
             "observations": count,
+            "sigma0": sigma0,
+            "covariance": parameter_covariance.tolist(),
         }
 
     def solve_four_parameters(self, points: List[Tuple[PointRecord, PointRecord]]) -> Dict[str, Any]:
@@ -606,6 +1010,88 @@ class UniversalCoordinateService:
             "observations": len(valid_pairs),
         }
 
+    def solve_plane_parameters(
+        self,
+        points: List[Tuple[PointRecord, PointRecord]],
+        model: str = "affine",
+    ) -> Dict[str, Any]:
+        """Affine (six-parameter) or 2nd/3rd-order polynomial plane transformation."""
+
+        valid_pairs = [
+            (src, tgt) for src, tgt in points if None not in (src.x, src.y, tgt.x, tgt.y)
+        ]
+        source = np.array([[src.x, src.y] for src, _ in valid_pairs], dtype=float).reshape(-1, 2)
+        target = np.array([[tgt.x, tgt.y] for _, tgt in valid_pairs], dtype=float).reshape(-1, 2)
+
+        transformation = PlaneTransformation.fit(source, target, model)
+        residual, rmse = transformation.residuals(source, target)
+        residuals = [
+            {"name": src.name or tgt.name, "vx": float(vx), "vy": float(vy)}
+            for (src, tgt), (vx, vy) in zip(valid_pairs, residual.tolist())
+        ]
+        return {
+            **transformation.to_dict(),
+            "residuals": residuals,
+            "rmse": rmse,
+            "observations": len(valid_pairs),
+        }
+
+    def apply_plane_parameters(self, xy: Any, params: Dict[str, Any]) -> np.ndarray:
+        """Apply affine/polynomial plane parameters to an (n, 2) array of x/y."""
+
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        return PlaneTransformation.from_dict(params).apply(xy)
+
+    def solve_regional_parameters(
+        self,
+        points: List[Tuple[PointRecord, PointRecord]],
+        model: str = "seven",
+        *,
+        leaf_size: Optional[int] = None,
+        overlap: float = 0.0,
+        blend: int = 1,
+    ) -> RegionalTransformation:
+        """Partition common points with a KD-tree and solve one parameter set per cell."""
+
+        if model == "seven":
+            pairs = [
+                (src, tgt)
+                for src, tgt in points
+                if None not in (src.X, src.Y, src.Z, tgt.X, tgt.Y, tgt.Z)
+            ]
+            source = np.array([[src.X, src.Y, src.Z] for src, _ in pairs], dtype=float).reshape(-1, 3)
+            target = np.array([[tgt.X, tgt.Y, tgt.Z] for _, tgt in pairs], dtype=float).reshape(-1, 3)
+        elif model == "four":
+            pairs = [
+                (src, tgt)
+                for src, tgt in points
+                if None not in (src.x, src.y, tgt.x, tgt.y)
+            ]
+            source = np.array([[src.x, src.y] for src, _ in pairs], dtype=float).reshape(-1, 2)
+            target = np.array([[tgt.x, tgt.y] for _, tgt in pairs], dtype=float).reshape(-1, 2)
+        else:
+            raise ValueError(f"未支持的分区转换模型: {model}")
+
+        return RegionalTransformation.fit(
+            source, target, model, leaf_size=leaf_size, overlap=overlap, blend=blend
+        )
+
+    def regional_point_parameters(self, transformation: RegionalTransformation, coords: Any) -> np.ndarray:
+        """Route an array of points to their cells in one pass and return one parameter row each.
+
+        ``coords`` holds XYZ for the seven-parameter model and x/y for the four;
+        rows with missing coordinates come back as NaN.
+        """
+
+        dim = 3 if transformation.model == "seven" else 2
+        coords = np.asarray(coords, dtype=float).reshape(-1, dim)
+        width = len(SEVEN_PARAMETER_KEYS if transformation.model == "seven" else FOUR_PARAMETER_KEYS)
+        parameter_rows = np.full((len(coords), width), np.nan)
+        valid = ~np.isnan(coords).any(axis=1)
+        if valid.any():
+            parameter_rows[valid] = transformation.point_parameters(coords[valid])
+        return parameter_rows
+
     # ------------------------------------------------------------------ #
     # Transformation application
     # ------------------------------------------------------------------ #
@@ -634,6 +1120,136 @@ class UniversalCoordinateService:
 
         return x_new, y_new, z_new
 
+    def apply_time_dependent_parameters(
+        self,
+        xyz: Any,
+        params: Dict[str, Any],
+        *,
+        epochs: Any = None,
+        velocities: Any = None,
+        target_epoch: Optional[float] = None,
+        return_parameters: bool = False,
+    ) -> Any:
+        """Vectorised 14-parameter (Bursa-Wolf + rates) transformation.
+
+        Positions observed at ``epochs`` are first propagated with the optional
+        per-point ``velocities`` to ``target_epoch``; the seven parameters are then
+        evaluated at that epoch as ``P(t) = P(t0) + dP/dt * (t - t0)`` and applied.
+        Without epochs the parameters reduce to their values at the reference epoch.
+        ``return_parameters`` also returns the propagated positions and the
+        per-point parameter rows, which the covariance propagation needs.
+        """
+
+        xyz = np.atleast_2d(np.asarray(xyz, dtype=float))
+        count = len(xyz)
+        reference_epoch = parse_float(params.get("reference_epoch"))
+        rates = params.get("rates") or {}
+
+        if epochs is None:
+            observed = np.full(count, np.nan)
+        else:
+            observed = np.broadcast_to(np.asarray(epochs, dtype=float), (count,)).copy()
+        if target_epoch is not None:
+            epoch = np.full(count, float(target_epoch))
+        else:
+            epoch = observed.copy()
+        if reference_epoch is not None:
+            epoch = np.where(np.isnan(epoch), reference_epoch, epoch)
+            observed = np.where(np.isnan(observed), epoch, observed)
+
+        if velocities is not None:
+            velocity = np.nan_to_num(np.atleast_2d(np.asarray(velocities, dtype=float)))
+            xyz = xyz + velocity * np.nan_to_num(epoch - observed)[:, None]
+
+        if rates and reference_epoch is None:
+            raise ValueError("含速率参数的十四参数转换需要提供参考历元 reference_epoch。")
+        elapsed = np.nan_to_num(epoch - (reference_epoch or 0.0)) if rates else np.zeros(count)
+
+        columns = []
+        for key in SEVEN_PARAMETER_KEYS:
+            columns.append(float(params.get(key, 0.0)) + float(rates.get(key, 0.0)) * elapsed)
+        parameter_rows = np.column_stack(columns)
+        transformed = apply_bursa_wolf(xyz, parameter_rows)
+        if return_parameters:
+            return transformed, xyz, parameter_rows
+        return transformed
+
+    def transform_cartesian_array(
+        self,
+        xyz: Any,
+        params: Dict[str, Any],
+        *,
+        regional: Optional[RegionalTransformation] = None,
+        epochs: Any = None,
+        velocities: Any = None,
+        target_epoch: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Apply one seven/14-parameter set, or a regional seven-parameter model, to an (n, 3) array.
+
+        A regional model routes every point to its (blended) cell parameters;
+        otherwise ``params`` goes through :meth:`apply_time_dependent_parameters`.
+        Returns the transformed positions, the positions the parameters were
+        applied to and the per-point parameter rows.
+        """
+
+        xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+        if regional is not None and regional.model == "seven":
+            parameter_rows = self.regional_point_parameters(regional, xyz)
+            return apply_bursa_wolf(xyz, parameter_rows), xyz, parameter_rows
+        return self.apply_time_dependent_parameters(
+            xyz,
+            params,
+            epochs=epochs,
+            velocities=velocities,
+            target_epoch=target_epoch,
+            return_parameters=True,
+        )
+
+    def propagate_bursa_wolf_covariance(
+        self,
+        positions: np.ndarray,
+        parameter_rows: np.ndarray,
+        point_covariance: Optional[np.ndarray] = None,
+        parameter_covariance: Any = None,
+    ) -> Optional[np.ndarray]:
+        """Cartesian covariance of Bursa-Wolf output, shape (n, 3, 3), or None.
+
+        ``point_covariance`` is an (n, 3, 3) stack of input covariances (NaN rows
+        for points without one) carried through the point Jacobian;
+        ``parameter_covariance`` is the 7×7 matrix of (dx, dy, dz, rx, ry, rz, m)
+        returned by :meth:`solve_seven_parameters` and is added for every point
+        through the parameter Jacobian evaluated at ``positions``.
+        """
+
+        covariance = None
+        if point_covariance is not None:
+            covariance = propagate(bursa_wolf_point_jacobian(parameter_rows), point_covariance)
+        if parameter_covariance is not None:
+            sigma_theta = np.broadcast_to(np.asarray(parameter_covariance, dtype=float), (len(positions), 7, 7))
+            contribution = propagate(bursa_wolf_parameter_jacobian(positions), sigma_theta)
+            covariance = contribution if covariance is None else np.nan_to_num(covariance) + contribution
+        return covariance
+
+    def transform_plane_array(
+        self,
+        xy: Any,
+        params: Dict[str, Any],
+        *,
+        regional: Optional[RegionalTransformation] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Apply one four-parameter set, or a regional four-parameter model, to an (n, 2) array.
+
+        Returns the transformed coordinates and the per-point parameter rows.
+        """
+
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        if regional is not None and regional.model == "four":
+            parameter_rows = self.regional_point_parameters(regional, xy)
+        else:
+            row = [float(params.get(key, 0.0)) for key in FOUR_PARAMETER_KEYS]
+            parameter_rows = np.tile(row, (len(xy), 1))
+        return apply_similarity_2d(xy, parameter_rows), parameter_rows
+
     def apply_four_parameters(self, point: PointRecord, params: Dict[str, float]) -> Tuple[float, float]:
         """Apply 2D similarity parameters to plane coordinates."""
 
@@ -654,97 +1270,499 @@ class UniversalCoordinateService:
     # ------------------------------------------------------------------ #
     # Batch conversions used by file import
     # ------------------------------------------------------------------ #
-    def batch_geodetic_to_cartesian(self, rows: List[Dict[str, Any]], ellipsoid_name: Optional[str] = None) -> Dict[str, Any]:
-        """Convert BLH to XYZ for a batch of points."""
+    def batch_geodetic_to_cartesian(
+        self,
+        rows: List[Dict[str, Any]],
+        ellipsoid_name: Optional[str] = None,
+        *,
+        include_dms: bool = True,
+        columnar: bool = False,
+        decimals: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Convert BLH to XYZ for a batch of points.
+
+        Rows may carry a covariance (``sigma`` or ``covariance``) in metres along
+        north/east/up; it is propagated to X/Y/Z with the batched Jacobian.
+        """
 
         system_payload: Dict[str, Any] = {"name": ellipsoid_name or "临时大地坐标系"}
         if ellipsoid_name:
             system_payload["ellipsoid"] = {"name": ellipsoid_name}
         system = self.build_system(system_payload, "source")
 
-        results: List[Dict[str, Any]] = []
-        success = 0
-
-        for raw in rows:
-            try:
-                point = self.build_point(
-                    {
-                        "name": raw.get("name"),
-                        "B": raw.get("lat") or raw.get("B"),
-                        "L": raw.get("lon") or raw.get("L"),
-                        "H": raw.get("height") or raw.get("H") or raw.get("h"),
-                    },
-                    raw.get("name", ""),
-                )
-                point = self.fill_point_components(point, system)
-                if None in (point.X, point.Y, point.Z):
-                    raise ValueError("无法计算XYZ坐标，检查输入数据是否完整。")
-                results.append(
-                    {
-                        "name": point.name,
-                        "lat": point.B,
-                        "lon": point.L,
-                        "height": point.H,
-                        "x": point.X,
-                        "y": point.Y,
-                        "z": point.Z,
-                        "lat_dms": format_dms(point.B),
-                        "lon_dms": format_dms(point.L),
-                    }
-                )
-                success += 1
-            except Exception as exc:  # noqa: BLE001
-                results.append({"name": raw.get("name") or "", "error": str(exc)})
+        names = [raw.get("name") or "" for raw in rows]
+        lat = parse_column(rows, ("lat", "B"), parse_angle)
+        lon = parse_column(rows, ("lon", "L"), parse_angle)
+        height = parse_column(rows, ("height", "H", "h"))
 
-        return {"results": results, "count": success, "ellipsoid": system.ellipsoid.name}
+        xyz = self._map_kernel("_blh_to_xyz_array", (lat, lon, np.nan_to_num(height)), 3, system.ellipsoid)
+        covariance = stack_covariances(rows, GEODETIC_AXES)
+        if covariance is not None:
+            covariance = propagate(local_to_cartesian_jacobian(lat, lon), covariance)
+
+        valid = ~np.isnan(xyz).any(axis=1)
+        columns: Dict[str, Any] = {"lat": lat, "lon": lon, "height": height, "x": xyz[:, 0], "y": xyz[:, 1], "z": xyz[:, 2]}
+        if include_dms:
+            columns["lat_dms"] = _dms_column(lat, valid)
+            columns["lon_dms"] = _dms_column(lon, valid)
+        results = results_from_columns(
+            names,
+            valid,
+            "无法计算XYZ坐标，检查输入数据是否完整。",
+            columns,
+            covariance_columns(covariance, CARTESIAN_AXES),
+            columnar=columnar,
+            decimals=decimals,
+        )
+        return _batch_payload(results, valid, columnar, ellipsoid=system.ellipsoid.name)
 
     def batch_cartesian_to_geodetic(
         self,
         rows: List[Dict[str, Any]],
         ellipsoid_name: Optional[str] = None,
+        *,
+        include_dms: bool = True,
+        columnar: bool = False,
+        decimals: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """Convert XYZ to BLH for a batch of points."""
+        """Convert XYZ to BLH for a batch of points.
+
+        Row covariances along X/Y/Z are propagated to north/east/up metres.
+        """
 
         system_payload: Dict[str, Any] = {"name": ellipsoid_name or "临时空间直角坐标系"}
         if ellipsoid_name:
             system_payload["ellipsoid"] = {"name": ellipsoid_name}
         system = self.build_system(system_payload, "source")
 
-        results: List[Dict[str, Any]] = []
-        success = 0
-
-        for raw in rows:
-            try:
-                point = self.build_point(
-                    {
-                        "name": raw.get("name"),
-                        "X": raw.get("x") or raw.get("X"),
-                        "Y": raw.get("y") or raw.get("Y"),
-                        "Z": raw.get("z") or raw.get("Z"),
-                    },
-                    raw.get("name", ""),
-                )
-                point = self.fill_point_components(point, system)
-                if point.B is None or point.L is None:
-                    raise ValueError("无法计算经纬度，请确认XYZ坐标是否有效。")
-                results.append(
-                    {
-                        "name": point.name,
-                        "x": point.X,
-                        "y": point.Y,
-                        "z": point.Z,
-                        "lat": point.B,
-                        "lon": point.L,
-                        "height": point.H,
-                        "lat_dms": format_dms(point.B),
-                        "lon_dms": format_dms(point.L),
-                    }
-                )
-                success += 1
-            except Exception as exc:  # noqa: BLE001
-                results.append({"name": raw.get("name") or "", "error": str(exc)})
+        names = [raw.get("name") or "" for raw in rows]
+        xyz = np.column_stack([parse_column(rows, (key.lower(), key)) for key in CARTESIAN_AXES]).reshape(-1, 3)
+        blh = self._map_kernel("_xyz_to_blh_array", tuple(xyz.T), 3, system.ellipsoid)
+        covariance = stack_covariances(rows, CARTESIAN_AXES)
+        if covariance is not None:
+            covariance = propagate(cartesian_to_local_jacobian(blh[:, 0], blh[:, 1]), covariance)
+
+        valid = ~np.isnan(blh[:, :2]).any(axis=1)
+        columns: Dict[str, Any] = {
+            "x": xyz[:, 0],
+            "y": xyz[:, 1],
+            "z": xyz[:, 2],
+            "lat": blh[:, 0],
+            "lon": blh[:, 1],
+            "height": blh[:, 2],
+        }
+        if include_dms:
+            columns["lat_dms"] = _dms_column(blh[:, 0], valid)
+            columns["lon_dms"] = _dms_column(blh[:, 1], valid)
+        results = results_from_columns(
+            names,
+            valid,
+            "无法计算经纬度，请确认XYZ坐标是否有效。",
+            columns,
+            covariance_columns(covariance, GEODETIC_AXES),
+            columnar=columnar,
+            decimals=decimals,
+        )
+        return _batch_payload(results, valid, columnar, ellipsoid=system.ellipsoid.name)
+
+    def batch_gauss_projection(
+        self,
+        rows: List[Dict[str, Any]],
+        system_payload: Dict[str, Any] | None = None,
+        direction: str = "forward",
+        *,
+        include_dms: bool = True,
+        columnar: bool = False,
+        decimals: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Gauss forward (BL→xy) or inverse (xy→BL) projection for a batch of points.
+
+        Horizontal covariances (north/east on the ellipsoid, x/y on the grid) are
+        propagated with the conformal Jacobian built from the point scale factor
+        and meridian convergence returned by the projection kernel.
+        """
+
+        if direction not in {"forward", "inverse"}:
+            raise ValueError(f"未支持的投影方向: {direction}")
+
+        system = self.build_system(system_payload, "source")
+        projection = system.projection
+        names = [raw.get("name") or "" for raw in rows]
+
+        if direction == "forward":
+            lat = parse_column(rows, ("lat", "B"), parse_angle)
+            lon = parse_column(rows, ("lon", "L"), parse_angle)
+            if projection.central_meridian is not None:
+                central_meridian = np.full(len(rows), float(projection.central_meridian))
+            else:
+                central_meridian = self._central_meridian_from_longitude_array(lon, projection.zone_width)
+            x, y, point_scale, convergence = self._map_kernel(
+                "_gauss_forward_array",
+                (lat, lon, central_meridian),
+                4,
+                projection,
+                system.ellipsoid,
+                with_factors=True,
+            ).T
+            input_axes, output_axes = GEODETIC_AXES[:2], GRID_AXES
+        else:
+            if projection.central_meridian is None:
+                raise ValueError("高斯反算需要在坐标系统中指定中央子午线。")
+            x = parse_column(rows, ("x",))
+            y = parse_column(rows, ("y",))
+            central_meridian = np.full(len(rows), float(projection.central_meridian))
+            lat, lon = self._map_kernel(
+                "_gauss_inverse_array", (x, y, central_meridian), 2, projection, system.ellipsoid
+            ).T
+            point_scale, convergence = self._map_kernel(
+                "_gauss_point_factors", (lat, lon, central_meridian), 2, projection, system.ellipsoid
+            ).T
+            input_axes, output_axes = GRID_AXES, GEODETIC_AXES[:2]
+
+        covariance = stack_covariances(rows, input_axes)
+        if covariance is not None:
+            jacobian = gauss_jacobian(point_scale, convergence)
+            if direction == "inverse":
+                jacobian = np.linalg.inv(jacobian)
+            covariance = propagate(jacobian, covariance)
+
+        valid = ~(np.isnan(lat) | np.isnan(lon) | np.isnan(x) | np.isnan(y))
+        columns: Dict[str, Any] = {
+            "lat": lat,
+            "lon": lon,
+            "x": x,
+            "y": y,
+            "central_meridian": central_meridian,
+            "point_scale_factor": point_scale,
+            "meridian_convergence": convergence,
+        }
+        if include_dms:
+            columns["lat_dms"] = _dms_column(lat, valid)
+            columns["lon_dms"] = _dms_column(lon, valid)
+        results = results_from_columns(
+            names,
+            valid,
+            "缺少投影所需的坐标。",
+            columns,
+            covariance_columns(covariance, output_axes),
+            columnar=columnar,
+            decimals=decimals,
+        )
+        return _batch_payload(results, valid, columnar, direction=direction, system=system.to_dict())
+
+    def batch_time_dependent_transform(
+        self,
+        rows: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        *,
+        target_epoch: Optional[float] = None,
+        ellipsoid_name: Optional[str] = None,
+        columnar: bool = False,
+        decimals: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Apply the 14-parameter model to epoch-tagged XYZ rows in one vectorised pass."""
+
+        names = [raw.get("name") or "" for raw in rows]
+        values = np.column_stack(
+            [parse_column(rows, (key, key.lower())) for key in ("X", "Y", "Z", "epoch", "VX", "VY", "VZ")]
+        ).reshape(-1, 7)
+
+        xyz = values[:, :3]
+        velocities = values[:, 4:] if not np.isnan(values[:, 4:]).all() else None
+        transformed, propagated, parameter_rows = self.apply_time_dependent_parameters(
+            xyz,
+            params,
+            epochs=values[:, 3],
+            velocities=velocities,
+            target_epoch=target_epoch,
+            return_parameters=True,
+        )
+
+        covariance = self.propagate_bursa_wolf_covariance(
+            propagated,
+            parameter_rows,
+            stack_covariances(rows, CARTESIAN_AXES),
+            params.get("covariance"),
+        )
+
+        valid = ~np.isnan(transformed).any(axis=1)
+        out_epoch = np.full(len(rows), float(target_epoch)) if target_epoch is not None else values[:, 3]
+        columns: Dict[str, Any] = {
+            "X": transformed[:, 0],
+            "Y": transformed[:, 1],
+            "Z": transformed[:, 2],
+            "epoch": out_epoch,
+        }
+
+        ellipsoid_label = None
+        if ellipsoid_name:
+            system = self.build_system({"ellipsoid": {"name": ellipsoid_name}}, "target")
+            geodetic = self._map_kernel("_xyz_to_blh_array", tuple(transformed.T), 3, system.ellipsoid)
+            columns.update(B=geodetic[:, 0], L=geodetic[:, 1], H=geodetic[:, 2])
+            ellipsoid_label = system.ellipsoid.name
+
+        results = results_from_columns(
+            names,
+            valid,
+            "缺少完整的 XYZ 坐标。",
+            columns,
+            covariance_columns(covariance, CARTESIAN_AXES),
+            columnar=columnar,
+            decimals=decimals,
+        )
+        return _batch_payload(results, valid, columnar, ellipsoid=ellipsoid_label)
+
+    def batch_plane_transform(
+        self,
+        rows: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        *,
+        columnar: bool = False,
+        decimals: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Apply one affine/polynomial plane transformation to a batch of x/y rows."""
+
+        names = [raw.get("name") or "" for raw in rows]
+        xy = np.column_stack((parse_column(rows, ("x",)), parse_column(rows, ("y",)))).reshape(-1, 2)
+        transformed = self.apply_plane_parameters(xy, params)
+
+        valid = ~np.isnan(transformed).any(axis=1)
+        columns = {"x": xy[:, 0], "y": xy[:, 1], "x_new": transformed[:, 0], "y_new": transformed[:, 1]}
+        results = results_from_columns(
+            names, valid, "缺少平面坐标 x/y。", columns, columnar=columnar, decimals=decimals
+        )
+        return _batch_payload(results, valid, columnar, model=params.get("model", "affine"))
+
+    def batch_reduce_distances(
+        self,
+        rows: List[Dict[str, Any]],
+        system_payload: Dict[str, Any] | None = None,
+        direction: str = "ground_to_grid",
+        *,
+        columnar: bool = False,
+        decimals: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Reduce measured distances between ground and grid for point pairs.
+
+        Each endpoint is projected once; the point scale factor and convergence
+        come out of the same kernel call and the mid-point factor is taken from
+        the series directly, so height and projection corrections are applied to
+        every pair in a single vectorised pass.
+        """
+
+        if direction not in {"ground_to_grid", "grid_to_ground"}:
+            raise ValueError(f"未支持的归算方向: {direction}")
+
+        system = self.build_system(system_payload, "source")
+        ellipsoid = system.ellipsoid
+        projection = system.projection
 
-        return {"results": results, "count": success, "ellipsoid": system.ellipsoid.name}
+        count = len(rows)
+        names = [raw.get("name") or "" for raw in rows]
+        ends = np.full((2, 6, count), np.nan)  # [start/end][B, L, H, h, x, y][pair]
+        for side, keys in enumerate((("from", "start"), ("to", "end"))):
+            endpoints = [_first_present(raw, keys) or {} for raw in rows]
+            for column, (aliases, parser) in enumerate(_ENDPOINT_FIELDS):
+                ends[side, column] = parse_column(endpoints, aliases, parser)
+        distance = parse_column(rows, ("distance",))
+
+        B, L, H, h, x, y = (ends[:, column, :] for column in range(6))
+        H = np.where(np.isnan(H), h + system.geoid.undulation, H)
+        H = np.where(np.isnan(H), 0.0, H)
+
+        if projection.central_meridian is not None:
+            central_meridian = np.full(count, float(projection.central_meridian))
+        else:
+            reference_L = np.where(np.isnan(L[0]), L[1], L[0])
+            central_meridian = self._central_meridian_from_longitude_array(reference_L, projection.zone_width)
+        central_meridian = np.broadcast_to(central_meridian, B.shape)
+
+        needs_inverse = (np.isnan(B) | np.isnan(L)) & ~np.isnan(x) & ~np.isnan(y) & ~np.isnan(central_meridian)
+        if needs_inverse.any():
+            B[needs_inverse], L[needs_inverse] = self._gauss_inverse_array(
+                x[needs_inverse], y[needs_inverse], central_meridian[needs_inverse], projection, ellipsoid
+            )
+
+        grid_x, grid_y, point_scale, convergence = self._gauss_forward_array(
+            B, L, central_meridian, projection, ellipsoid, with_factors=True
+        )
+        x = np.where(np.isnan(x), grid_x, x)
+        y = np.where(np.isnan(y), grid_y, y)
+
+        mid_B = B.mean(axis=0)
+        mid_scale, _ = self._gauss_point_factors(mid_B, L.mean(axis=0), central_meridian[0], projection, ellipsoid)
+        line_scale = (point_scale[0] + 4 * mid_scale + point_scale[1]) / 6
+
+        e2 = ellipsoid.first_eccentricity_squared
+        w2 = 1 - e2 * np.sin(np.radians(mid_B)) ** 2
+        mean_radius = ellipsoid.semi_major_axis * np.sqrt(1 - e2) / w2
+        height_factor = mean_radius / (mean_radius + H.mean(axis=0))
+        combined = height_factor * line_scale
+
+        if direction == "ground_to_grid":
+            ground = distance
+            grid = ground * combined
+        else:
+            grid = np.where(np.isnan(distance), np.hypot(x[1] - x[0], y[1] - y[0]), distance)
+            ground = grid / combined
+        ellipsoidal = ground * height_factor
+
+        valid = ~np.isnan(ground) & ~np.isnan(grid)
+        missing_distance = direction == "ground_to_grid" and np.isnan(distance)
+        errors = np.where(missing_distance, "缺少测量距离，无法完成距离归算。", "缺少端点坐标，无法完成距离归算。")
+        columns = {
+            "ground_distance": ground,
+            "ellipsoidal_distance": ellipsoidal,
+            "grid_distance": grid,
+            "height_factor": height_factor,
+            "line_scale_factor": line_scale,
+            "combined_factor": combined,
+            "from": {"point_scale_factor": point_scale[0], "meridian_convergence": convergence[0]},
+            "to": {"point_scale_factor": point_scale[1], "meridian_convergence": convergence[1]},
+        }
+        results = results_from_columns(names, valid, errors, columns, columnar=columnar, decimals=decimals)
+        return _batch_payload(results, valid, columnar, direction=direction, system=system.to_dict())
+
+    # ------------------------------------------------------------------ #
+    # Projection design
+    # ------------------------------------------------------------------ #
+    def optimise_local_projection(
+        self,
+        points: List[PointRecord] | None = None,
+        system_payload: Dict[str, Any] | str | None = None,
+        *,
+        bounds: Dict[str, Any] | None = None,
+        mean_elevation: Optional[float] = None,
+        meridian_range: Optional[Tuple[float, float]] = None,
+        meridian_step: float = 1 / 60,
+        height_range: Optional[Tuple[float, float]] = None,
+        height_step: float = 10.0,
+        tolerance_ppm: float = 25.0,
+        grid_size: int = 25,
+    ) -> Dict[str, Any]:
+        """Search central meridian × projection height for minimum length distortion.
+
+        The distortion of a ground distance on the grid is ``m · k(h0) · R/(R+H) − 1``
+        with ``m`` the Gauss point scale factor for a candidate meridian and
+        ``k(h0)`` the projection-height lift. Point scale factors for every
+        candidate meridian are computed in one broadcast kernel call, and each
+        meridian row is evaluated against all heights at once. The best
+        candidate minimises the worst-case distortion (ties broken by RMS);
+        25 ppm corresponds to 2.5 cm/km.
+        """
+
+        system = self.build_system(system_payload, "source")
+        ellipsoid = system.ellipsoid
+
+        if points:
+            lat = np.array([np.nan if p.B is None else p.B for p in points], dtype=float)
+            lon = np.array([np.nan if p.L is None else p.L for p in points], dtype=float)
+            height = np.array(
+                [
+                    p.H if p.H is not None else (p.h + system.geoid.undulation if p.h is not None else np.nan)
+                    for p in points
+                ],
+                dtype=float,
+            )
+            keep = ~(np.isnan(lat) | np.isnan(lon))
+            lat, lon, height = lat[keep], lon[keep], height[keep]
+            names = [p.name for p, kept in zip(points, keep) if kept]
+        elif bounds:
+            lat_axis = np.linspace(float(bounds["min_lat"]), float(bounds["max_lat"]), grid_size)
+            lon_axis = np.linspace(float(bounds["min_lon"]), float(bounds["max_lon"]), grid_size)
+            lat, lon = (values.ravel() for values in np.meshgrid(lat_axis, lon_axis, indexing="ij"))
+            height = np.full(lat.shape, np.nan)
+            names = None
+        else:
+            raise ValueError("请提供项目点位或范围 bounds。")
+        if not len(lat):
+            raise ValueError("缺少带经纬度的项目点位。")
+        if mean_elevation is None:
+            mean_elevation = float(np.nanmean(height)) if np.isfinite(height).any() else 0.0
+        height = np.where(np.isnan(height), mean_elevation, height)
+        if meridian_step <= 0 or height_step <= 0:
+            raise ValueError("搜索步长必须为正数。")
+
+        if meridian_range is None:
+            meridian_range = (float(lon.min()), float(lon.max()))
+        if height_range is None:
+            height_range = (min(0.0, float(height.min())), float(height.max()))
+        # Candidates sit on multiples of the step so the answer is a "round" value.
+        meridians = np.round(
+            np.arange(
+                math.floor(meridian_range[0] / meridian_step), math.ceil(meridian_range[1] / meridian_step) + 1
+            )
+            * meridian_step,
+            9,
+        )
+        heights = np.round(
+            np.arange(math.floor(height_range[0] / height_step), math.ceil(height_range[1] / height_step) + 1)
+            * height_step,
+            6,
+        )
+
+        unit_projection = replace(system.projection, scale_factor=1.0, projection_height=0.0)
+        point_scale, _ = self._gauss_point_factors(lat, lon, meridians[:, None], unit_projection, ellipsoid)
+        lift = np.array(
+            [self._projection_scale(replace(system.projection, projection_height=h0), ellipsoid) for h0 in heights]
+        )
+        e2 = ellipsoid.first_eccentricity_squared
+        mean_radius = ellipsoid.semi_major_axis * np.sqrt(1 - e2) / (1 - e2 * np.sin(np.radians(lat)) ** 2)
+        height_factor = mean_radius / (mean_radius + height)
+
+        worst = np.empty((len(meridians), len(heights)))
+        rms = np.empty_like(worst)
+        for row, scale_row in enumerate(point_scale):
+            distortion = lift[:, None] * (scale_row * height_factor)[None, :] - 1.0
+            worst[row] = np.abs(distortion).max(axis=1)
+            rms[row] = np.sqrt((distortion**2).mean(axis=1))
+
+        best = np.lexsort((rms.ravel(), worst.ravel()))[0]
+        best_row, best_col = np.unravel_index(best, worst.shape)
+        best_distortion = (lift[best_col] * point_scale[best_row] * height_factor - 1.0) * 1e6
+        projection = replace(
+            system.projection,
+            central_meridian=float(meridians[best_row]),
+            projection_height=float(heights[best_col]),
+        )
+
+        distortion_map: Dict[str, Any] = {
+            "lat": lat.tolist(),
+            "lon": lon.tolist(),
+            "height": height.tolist(),
+            "distortion_ppm": best_distortion.tolist(),
+        }
+        if names is not None:
+            distortion_map["name"] = names
+        return {
+            "projection": projection.to_dict(),
+            "central_meridian": float(meridians[best_row]),
+            "projection_height": float(heights[best_col]),
+            "max_distortion_ppm": float(worst[best_row, best_col] * 1e6),
+            "rms_distortion_ppm": float(rms[best_row, best_col] * 1e6),
+            "tolerance_ppm": tolerance_ppm,
+            "within_tolerance_ratio": float((np.abs(best_distortion) <= tolerance_ppm).mean()),
+            "candidates": {"meridians": len(meridians), "heights": len(heights)},
+            "distortion_map": distortion_map,
+        }
+
+    def _map_kernel(
+        self,
+        name: str,
+        columns: Tuple[Any, ...],
+        width: int,
+        *context: Any,
+        **options: Any,
+    ) -> np.ndarray:
+        """Run an ``_*_array`` kernel, sharded across processes for large inputs.
+
+        Returns an ``(n, width)`` array; tuple-returning kernels are stacked
+        column-wise.
+        """
+
+        arrays = np.broadcast_arrays(*(np.asarray(column, dtype=float) for column in columns))
+        kernel = partial(_array_kernel, name, context, options)
+        return self._sharding.map_columns(kernel, arrays, width)
 
     # ------------------------------------------------------------------ #
     # Internal geodetic utilities
@@ -776,6 +1794,44 @@ class UniversalCoordinateService:
             B, H = B_new, H_new
         return math.degrees(B), math.degrees(L), H
 
+    def _blh_to_xyz_array(self, B: Any, L: Any, H: Any, ellipsoid: Ellipsoid) -> np.ndarray:
+        """Vectorised BLH to XYZ, returns an (n, 3) array."""
+
+        B_rad = np.radians(np.asarray(B, dtype=float))
+        L_rad = np.radians(np.asarray(L, dtype=float))
+        H = np.asarray(H, dtype=float)
+        sin_B = np.sin(B_rad)
+        cos_B = np.cos(B_rad)
+        N = ellipsoid.semi_major_axis / np.sqrt(1 - ellipsoid.first_eccentricity_squared * sin_B**2)
+        return np.column_stack(
+            (
+                (N + H) * cos_B * np.cos(L_rad),
+                (N + H) * cos_B * np.sin(L_rad),
+                (N * (1 - ellipsoid.first_eccentricity_squared) + H) * sin_B,
+            )
+        )
+
+    def _xyz_to_blh_array(self, X: Any, Y: Any, Z: Any, ellipsoid: Ellipsoid) -> np.ndarray:
+        """Vectorised XYZ to BLH (degrees, metres), returns an (n, 3) array."""
+
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        Z = np.asarray(Z, dtype=float)
+        e2 = ellipsoid.first_eccentricity_squared
+        L = np.arctan2(Y, X)
+        p = np.hypot(X, Y)
+        B = np.arctan2(Z, p * (1 - e2))
+        H = np.zeros_like(B)
+        for _ in range(10):
+            N = ellipsoid.semi_major_axis / np.sqrt(1 - e2 * np.sin(B) ** 2)
+            H_new = p / np.cos(B) - N
+            B_new = np.arctan2(Z, p * (1 - e2 * N / (N + H_new)))
+            converged = not np.any(np.abs(B_new - B) >= 1e-12) and not np.any(np.abs(H_new - H) >= 1e-6)
+            B, H = B_new, H_new
+            if converged:
+                break
+        return np.column_stack((np.degrees(B), np.degrees(L), H))
+
     def _gauss_forward(
         self,
         lat: float,
@@ -784,16 +1840,34 @@ class UniversalCoordinateService:
         projection: ProjectionParams,
         ellipsoid: Ellipsoid,
     ) -> Tuple[float, float]:
-        B = math.radians(lat)
-        L = math.radians(lon)
-        L0 = math.radians(central_meridian)
-        l = L - L0
+        x, y = self._gauss_forward_array(lat, lon, central_meridian, projection, ellipsoid)
+        return float(x), float(y)
 
-        sin_B = math.sin(B)
-        cos_B = math.cos(B)
-        tan_B = math.tan(B)
+    def _gauss_forward_array(
+        self,
+        lat: Any,
+        lon: Any,
+        central_meridian: Any,
+        projection: ProjectionParams,
+        ellipsoid: Ellipsoid,
+        *,
+        with_factors: bool = False,
+    ) -> Tuple[np.ndarray, ...]:
+        """Vectorised Gauss-Krüger forward projection.
 
-        N = ellipsoid.semi_major_axis / math.sqrt(1 - ellipsoid.first_eccentricity_squared * sin_B**2)
+        With ``with_factors`` the point scale factor and the meridian convergence
+        (degrees) are returned as two extra columns; both fall out of the same
+        series terms so they cost almost nothing on top of the projection.
+        """
+
+        B = np.radians(np.asarray(lat, dtype=float))
+        l = np.radians(np.asarray(lon, dtype=float) - np.asarray(central_meridian, dtype=float))
+
+        sin_B = np.sin(B)
+        cos_B = np.cos(B)
+        tan_B = np.tan(B)
+
+        N = ellipsoid.semi_major_axis / np.sqrt(1 - ellipsoid.first_eccentricity_squared * sin_B**2)
         eta2 = ellipsoid.second_eccentricity_squared * cos_B**2
 
         X = self._meridian_arc_length(B, ellipsoid)
@@ -830,18 +1904,64 @@ class UniversalCoordinateService:
             )
         )
 
+        scale_factor = self._projection_scale(projection, ellipsoid)
+        x = x * scale_factor
+        y = y * scale_factor
+
+        false_easting = projection.false_easting if not projection.auto_false_easting else 500000.0
+        false_northing = projection.false_northing if not projection.auto_false_northing else 0.0
+
+        if not with_factors:
+            return x + false_northing, y + false_easting
+
+        point_scale, convergence = self._gauss_factors(l2, l, sin_B, cos2, t2, eta2)
+        return x + false_northing, y + false_easting, point_scale * scale_factor, convergence
+
+    def _gauss_point_factors(
+        self,
+        lat: Any,
+        lon: Any,
+        central_meridian: Any,
+        projection: ProjectionParams,
+        ellipsoid: Ellipsoid,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Point scale factor and meridian convergence (degrees) without projecting."""
+
+        B = np.radians(np.asarray(lat, dtype=float))
+        l = np.radians(np.asarray(lon, dtype=float) - np.asarray(central_meridian, dtype=float))
+        sin_B = np.sin(B)
+        cos_B = np.cos(B)
+        tan_B = np.tan(B)
+        eta2 = ellipsoid.second_eccentricity_squared * cos_B**2
+        point_scale, convergence = self._gauss_factors(l * l, l, sin_B, cos_B * cos_B, tan_B * tan_B, eta2)
+        return point_scale * self._projection_scale(projection, ellipsoid), convergence
+
+    @staticmethod
+    def _gauss_factors(
+        l2: np.ndarray,
+        l: np.ndarray,
+        sin_B: np.ndarray,
+        cos2: np.ndarray,
+        t2: np.ndarray,
+        eta2: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Series terms shared by the forward projection for m and γ."""
+
+        lc2 = l2 * cos2
+        point_scale = 1 + lc2 / 2 * (1 + eta2) + lc2 * lc2 / 24 * (5 - 4 * t2)
+        convergence = l * sin_B * (1 + lc2 / 3 * (1 + 3 * eta2 + 2 * eta2**2) + lc2 * lc2 / 15 * (2 - t2))
+        return point_scale, np.degrees(convergence)
+
+    @staticmethod
+    def _projection_scale(projection: ProjectionParams, ellipsoid: Ellipsoid) -> float:
+        """Combined central scale factor including the projection-height lift."""
+
         scale_factor = projection.scale_factor or 1.0
         if projection.projection_height:
             scale_factor *= 1 + projection.projection_height / (
                 ellipsoid.semi_major_axis + projection.projection_height
             )
-        x *= scale_factor
-        y *= scale_factor
-
-        false_easting = projection.false_easting if not projection.auto_false_easting else 500000.0
-        false_northing = projection.false_northing if not projection.auto_false_northing else 0.0
-
-        return x + false_northing, y + false_easting
+        return scale_factor
 
     def _gauss_inverse(
         self,
@@ -851,27 +1971,36 @@ class UniversalCoordinateService:
         projection: ProjectionParams,
         ellipsoid: Ellipsoid,
     ) -> Tuple[float, float]:
+        lat, lon = self._gauss_inverse_array(x, y, central_meridian, projection, ellipsoid)
+        return float(lat), float(lon)
+
+    def _gauss_inverse_array(
+        self,
+        x: Any,
+        y: Any,
+        central_meridian: Any,
+        projection: ProjectionParams,
+        ellipsoid: Ellipsoid,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorised Gauss-Krüger inverse projection."""
+
         false_easting = projection.false_easting if not projection.auto_false_easting else 500000.0
         false_northing = projection.false_northing if not projection.auto_false_northing else 0.0
-        x_adj = x - false_northing
-        y_adj = y - false_easting
+        x_adj = np.asarray(x, dtype=float) - false_northing
+        y_adj = np.asarray(y, dtype=float) - false_easting
 
-        scale_factor = projection.scale_factor or 1.0
-        if projection.projection_height:
-            scale_factor *= 1 + projection.projection_height / (
-                ellipsoid.semi_major_axis + projection.projection_height
-            )
+        scale_factor = self._projection_scale(projection, ellipsoid)
         if scale_factor != 0:
-            x_adj /= scale_factor
-            y_adj /= scale_factor
+            x_adj = x_adj / scale_factor
+            y_adj = y_adj / scale_factor
 
         Bf = self._footpoint_latitude(x_adj, ellipsoid)
 
-        sin_Bf = math.sin(Bf)
-        cos_Bf = math.cos(Bf)
-        tan_Bf = math.tan(Bf)
+        sin_Bf = np.sin(Bf)
+        cos_Bf = np.cos(Bf)
+        tan_Bf = np.tan(Bf)
         eta2f = ellipsoid.second_eccentricity_squared * cos_Bf**2
-        Nf = ellipsoid.semi_major_axis / math.sqrt(1 - ellipsoid.first_eccentricity_squared * sin_Bf**2)
+        Nf = ellipsoid.semi_major_axis / np.sqrt(1 - ellipsoid.first_eccentricity_squared * sin_Bf**2)
         Mf = ellipsoid.semi_major_axis * (1 - ellipsoid.first_eccentricity_squared) / (
             1 - ellipsoid.first_eccentricity_squared * sin_Bf**2
         ) ** (3 / 2)
@@ -885,36 +2014,32 @@ class UniversalCoordinateService:
             + y2 * y2 / 360 * (61 + 90 * tan_Bf**2 + 45 * tan_Bf**4)
         )
 
-        l = yN * (
+        l = yN / cos_Bf * (
             1
             - y2 / 6 * (1 + 2 * tan_Bf**2 + eta2f)
             + y2 * y2 / 120 * (5 + 28 * tan_Bf**2 + 24 * tan_Bf**4 + 6 * eta2f + 8 * eta2f * tan_Bf**2)
         )
 
-        lat = math.degrees(B)
-        lon = math.degrees(l) + central_meridian
+        lat = np.degrees(B)
+        lon = np.degrees(l) + np.asarray(central_meridian, dtype=float)
         return lat, lon
 
-    def _meridian_arc_length(self, B: float, ellipsoid: Ellipsoid) -> float:
-        e2 = ellipsoid.first_eccentricity_squared
+    def _meridian_arc_length(self, B: Any, ellipsoid: Ellipsoid) -> Any:
         a = ellipsoid.semi_major_axis
-        A0 = 1 - e2 / 4 - 3 * e2**2 / 64 - 5 * e2**3 / 256
-        A2 = 3 / 8 * (e2 + e2**2 / 4 + 15 * e2**3 / 128)
-        A4 = 15 / 256 * (e2**2 + 3 * e2**3 / 4)
-        A6 = 35 * e2**3 / 3072
-        return a * (A0 * B - A2 * math.sin(2 * B) + A4 * math.sin(4 * B) - A6 * math.sin(6 * B))
-
-    def _footpoint_latitude(self, x: float, ellipsoid: Ellipsoid) -> float:
-        Bf = x / ellipsoid.semi_major_axis
+        A0, A2, A4, A6 = ellipsoid.meridian_coefficients
+        return a * (A0 * B - A2 * np.sin(2 * B) + A4 * np.sin(4 * B) - A6 * np.sin(6 * B))
+
+    def _footpoint_latitude(self, x: Any, ellipsoid: Ellipsoid) -> np.ndarray:
+        Bf = np.asarray(x, dtype=float) / ellipsoid.semi_major_axis
         for _ in range(10):
             X_calc = self._meridian_arc_length(Bf, ellipsoid)
-            if abs(X_calc - x) < 1e-10:
+            if np.all(np.abs(X_calc - x) < 1e-10):
                 break
-            sin_Bf = math.sin(Bf)
-            term = ellipsoid.semi_major_axis * (1 - ellipsoid.first_eccentricity_squared * sin_Bf**2) / math.sqrt(
+            sin_Bf = np.sin(Bf)
+            term = ellipsoid.semi_major_axis * (1 - ellipsoid.first_eccentricity_squared * sin_Bf**2) / np.sqrt(
                 1 - ellipsoid.first_eccentricity_squared * sin_Bf**2
             )
-            Bf -= (X_calc - x) / term
+            Bf = Bf - (X_calc - x) / term
         return Bf
 
     def _central_meridian_from_longitude(self, lon: float, zone_width: float) -> float:
@@ -923,5 +2048,11 @@ class UniversalCoordinateService:
         zone = math.floor((lon + zone_width / 2) / zone_width)
         return zone * zone_width
 
+    def _central_meridian_from_longitude_array(self, lon: Any, zone_width: float) -> np.ndarray:
+        lon = np.asarray(lon, dtype=float)
+        if zone_width not in (3, 6):
+            return np.round(lon / zone_width) * zone_width
+        return np.floor((lon + zone_width / 2) / zone_width) * zone_width
+
     def _central_meridian_from_zone(self, zone: int, zone_width: float) -> float:
         return zone * zone_width - zone_width / 2
@@ -0,0 +1,143 @@
+"""Multi-JD horizontal alignments: forward locate, inverse projection and spiral evaluation."""
+
+import math
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.alignment import HorizontalAlignment, clothoid
+
+POINTS = [
+    {"name": "BP", "x": 0.0, "y": 0.0},
+    {"name": "JD1", "x": 1200.0, "y": 300.0, "R": 800.0, "l0": 120.0},
+    {"name": "JD2", "x": 2100.0, "y": -400.0, "R": 600.0, "l0_in": 100.0, "l0_out": 80.0},
+    {"name": "JD3", "x": 3300.0, "y": 100.0, "R": 1000.0, "l0": 0.0},
+    {"name": "EP", "x": 4200.0, "y": 0.0},
+]
+
+
+@pytest.fixture(scope="module", params=["series", "fresnel"])
+def alignment(request):
+    return HorizontalAlignment.from_points(POINTS, start_station=1000.0, spiral=request.param)
+
+
+def test_project_inverts_locate(alignment):
+    rng = np.random.default_rng(4)
+    stations = rng.uniform(alignment.start_station, alignment.end_station, 500)
+    offsets = rng.uniform(-150.0, 150.0, 500)
+    x, y, _ = alignment.locate(stations, offsets)
+    projected = alignment.project(x, y)
+    assert projected["station"] == pytest.approx(stations, abs=1e-6)
+    assert projected["offset"] == pytest.approx(offsets, abs=1e-6)
+    assert np.all(projected["residual"] < 1e-6)
+
+
+def test_point_matches_locate(alignment):
+    station = alignment.start_station + 1234.5
+    x, y, azimuth = alignment.locate([station], 2.5)
+    point = alignment.point(station, 2.5)
+    assert (point["x"], point["y"]) == pytest.approx((x[0], y[0]))
+
+
+def test_route_is_continuous_at_main_points(alignment):
+    for name, station in alignment.main_points().items():
+        x, y, azimuth = alignment.locate([station - 1e-7, station + 1e-7])
+        assert math.hypot(x[1] - x[0], y[1] - y[0]) < 1e-5, name
+        assert abs(math.remainder(azimuth[1] - azimuth[0], 2 * math.pi)) < 1e-6, name
+
+
+def test_fresnel_matches_series_for_flat_spirals():
+    l = np.linspace(0.0, 120.0, 61)
+    series = np.array(clothoid(l, 800.0, 120.0))
+    exact = np.array(clothoid(l, 800.0, 120.0, "fresnel"))
+    assert np.abs(series - exact).max() < 1e-9
+
+
+def test_fresnel_tangent_follows_spiral_angle_for_sharp_spirals():
+    # 缓和曲线角 l0/(2R) = 1.5 rad，超出级数展开的适用范围
+    R, l0 = 100.0, 300.0
+    l = np.linspace(1.0, l0, 300)
+    step = 1e-4
+    errors = {}
+    for method in ("fresnel", "series"):
+        x0, y0 = clothoid(l - step, R, l0, method)
+        x1, y1 = clothoid(l + step, R, l0, method)
+        errors[method] = np.abs(np.arctan2(y1 - y0, x1 - x0) - l * l / (2 * R * l0)).max()
+    assert errors["fresnel"] < 1e-6
+    assert errors["series"] > 1e-4
+
+
+def test_cumulative_stations_and_segment_lookup(alignment):
+    # 里程表首尾相接，总长为各线元长度之和
+    assert alignment.starts[1:] == pytest.approx(alignment.starts[:-1] + alignment.lengths[:-1], abs=1e-9)
+    assert alignment.describe()["segments"] == {"tangent": 4, "spiral_in": 2, "arc": 3, "spiral_out": 2}
+    index = alignment.segment_index(alignment.starts)
+    assert index.tolist() == list(range(len(alignment.starts)))
+    assert alignment.segment_index(alignment.starts[1:] - 1e-6).tolist() == list(range(len(alignment.starts) - 1))
+    with pytest.raises(ValueError, match="超出线路范围"):
+        alignment.locate([alignment.end_station + 1.0])
+
+
+def test_curves_meet_their_tangent_lines(alignment):
+    for curve, point in zip(alignment.curves, POINTS[1:-1]):
+        previous, following = POINTS[POINTS.index(point) - 1], POINTS[POINTS.index(point) + 1]
+        az_in = math.atan2(point["y"] - previous["y"], point["x"] - previous["x"])
+        az_out = math.atan2(following["y"] - point["y"], following["x"] - point["x"])
+        first, last = ("ZH", "HZ") if "ZH" in curve["main_points"] else ("ZY", "YZ")
+        x, y, azimuth = alignment.locate([curve["main_points"][first], curve["main_points"][last]])
+        # 曲线起终点位于交点前后切线长处，方向与前后直线一致
+        start = (point["x"] - curve["T_in"] * math.cos(az_in), point["y"] - curve["T_in"] * math.sin(az_in))
+        end = (point["x"] + curve["T_out"] * math.cos(az_out), point["y"] + curve["T_out"] * math.sin(az_out))
+        assert (x[0], y[0]) == pytest.approx(start, abs=1e-6)
+        assert (x[1], y[1]) == pytest.approx(end, abs=1e-6)
+        assert abs(math.remainder(azimuth[0] - az_in, 2 * math.pi)) < 1e-9
+        assert abs(math.remainder(azimuth[1] - az_out, 2 * math.pi)) < 1e-9
+    # 不等长缓和曲线的前后切线长不同
+    assert alignment.curves[1]["T_in"] != pytest.approx(alignment.curves[1]["T_out"], abs=1e-3)
+
+
+def test_arc_stations_lie_on_the_circle(alignment):
+    arcs = np.flatnonzero(alignment.kinds == 2)
+    for row in arcs:
+        stations = alignment.starts[row] + np.linspace(0.0, alignment.lengths[row], 25)
+        x, y, _ = alignment.locate(stations)
+        center = alignment.centers[row]
+        assert np.hypot(x - center[0], y - center[1]) == pytest.approx(alignment.radii[row], abs=1e-8)
+
+
+def test_collinear_jd_and_invalid_input():
+    straight = HorizontalAlignment.from_points(
+        [{"x": 0.0, "y": 0.0}, {"x": 100.0, "y": 0.0, "R": 500.0}, {"x": 300.0, "y": 0.0}]
+    )
+    assert straight.curves == [] and straight.end_station == pytest.approx(300.0)
+    x, y, _ = straight.locate(np.array([50.0, 150.0, 299.0]))
+    assert x == pytest.approx([50.0, 150.0, 299.0]) and y == pytest.approx([0.0, 0.0, 0.0])
+
+    bad = [
+        (dict(POINTS[1], R=0.0), "半径"),
+        (dict(POINTS[1], l0=-1.0), "不能为负"),
+        (dict(POINTS[1], R=80.0, l0=400.0), "缓和曲线过长"),
+        (dict(POINTS[1], R=20000.0), "重叠"),
+    ]
+    for jd, message in bad:
+        with pytest.raises(ValueError, match=message):
+            HorizontalAlignment.from_points([POINTS[0], jd, *POINTS[2:]])
+
+
+def test_alignment_design_endpoint_stakes_the_route():
+    from taomeasure import create_app
+
+    response = create_app().test_client().post(
+        "/api/curve-design",
+        json={
+            "curve_type": "alignment",
+            "parameters": {"points": POINTS, "start_mileage": 1000.0, "stations": {"interval": 100}},
+        },
+    )
+    data = response.get_json()["data"]
+    alignment = HorizontalAlignment.from_points(POINTS, start_station=1000.0)
+    mileages = np.array([row["mileage"] for row in data["design_points"]])
+    x, y, _ = alignment.locate(mileages)
+    assert len(data["curves"]) == 3 and data["main_points_mileage"]["EP"] == pytest.approx(alignment.end_station)
+    assert [row["center_x"] for row in data["design_points"]] == pytest.approx(x, abs=1e-9)
+    assert [row["center_y"] for row in data["design_points"]] == pytest.approx(y, abs=1e-9)
@@ -0,0 +1,46 @@
+"""Height-anomaly grid files (.tmag)."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.anomaly_grid import AnomalyGrid, AnomalyGridStore
+
+BOUNDS = {"min_lat": 30.0, "max_lat": 30.5, "min_lon": 114.0, "max_lon": 114.75}
+
+
+def _plane(lats, lons):
+    return 12.0 + 0.8 * (lats - 30.0) - 0.5 * (lons - 114.0)
+
+
+def test_save_open_round_trip(tmp_path):
+    grid = AnomalyGrid.build(_plane, BOUNDS, 1 / 60)
+    path = str(tmp_path / "plane.tmag")
+    grid.save(path)
+    opened = AnomalyGrid.open(path)
+
+    assert opened.shape == grid.shape
+    assert (opened.lat0, opened.lon0, opened.dlat, opened.dlon) == (grid.lat0, grid.lon0, grid.dlat, grid.dlon)
+    assert np.array_equal(np.asarray(opened.values), grid.values)
+    assert opened.describe() == grid.describe()
+
+    # 双线性内插对平面精确（float32 存储误差内），格网外为 NaN
+    rng = np.random.default_rng(2)
+    lats = rng.uniform(30.0, 30.5, 200)
+    lons = rng.uniform(114.0, 114.75, 200)
+    assert opened.interpolate(lats, lons) == pytest.approx(_plane(lats, lons), abs=1e-5)
+    assert np.isnan(opened.interpolate(np.array([29.9]), np.array([114.1])))[0]
+
+
+def test_store_imports_and_rejects_files(tmp_path):
+    grid = AnomalyGrid.build(_plane, BOUNDS, 1 / 30)
+    path = tmp_path / "source.tmag"
+    grid.save(str(path))
+    data = path.read_bytes()
+
+    store = AnomalyGridStore(str(tmp_path / "store"))
+    restored = store.get(store.import_bytes(data))
+    assert np.array_equal(np.asarray(restored.values), grid.values)
+    with pytest.raises(ValueError):
+        store.import_bytes(data[:-4])
+    with pytest.raises(ValueError):
+        store.import_bytes(b"XXXX" + data[4:])
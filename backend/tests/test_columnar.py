@@ -0,0 +1,26 @@
+"""Columnar response layout for coordinate results."""
+
+from taomeasure.domain.universal_coordinate import UniversalCoordinateService, columns_from_records
+
+
+def test_columns_keep_record_count_and_nest_objects():
+    records = [
+        {"name": "A", "source": {"x": 1.23456, "y": 2.0}, "lat": 30.123456789},
+        {"name": "B", "source": {"x": 3.0}, "extra": 7},
+    ]
+    columns = columns_from_records(records, decimals=3, exclude=("extra",))
+    assert columns == {
+        "name": ["A", "B"],
+        "source": {"x": [1.235, 3.0], "y": [2.0, None]},
+        "lat": [30.123, None],
+    }
+
+
+def test_batch_results_skip_dms_strings_on_request():
+    service = UniversalCoordinateService()
+    rows = [{"lat": 30.5, "lon": 114.25, "height": 20.0}]
+    with_dms = service.batch_geodetic_to_cartesian(rows, "CGCS2000")
+    without = service.batch_geodetic_to_cartesian(rows, "CGCS2000", include_dms=False)
+    (first,), (second,) = with_dms["results"], without["results"]
+    assert "lat_dms" in first and "lat_dms" not in second
+    assert {key: first[key] for key in second} == second
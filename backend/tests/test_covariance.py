@@ -0,0 +1,126 @@
+"""Jacobians of the covariance propagation against finite differences, and propagation through process."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.covariance import (
+    bursa_wolf_parameter_jacobian,
+    bursa_wolf_point_jacobian,
+    gauss_jacobian,
+    local_to_cartesian_jacobian,
+    propagate,
+)
+from taomeasure.domain.regional_transform import apply_bursa_wolf
+from taomeasure.domain.universal_coordinate import UniversalCoordinateService
+
+PARAMS = np.array([-85.3, 112.6, 47.9, 2.1e-5, -1.4e-5, 3.3e-5, 4.2e-6])
+XYZ = np.array([[-2266848.5, 5010223.6, 3169345.2], [-2148017.0, 4426721.8, 4045132.9]])
+SYSTEM = {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114}}
+
+
+@pytest.fixture(scope="module")
+def service():
+    return UniversalCoordinateService()
+
+
+def _numeric_jacobian(function, values, steps):
+    """Central differences of ``function`` (n, m) -> (n, k) per input column."""
+
+    columns = []
+    for column, step in enumerate(steps):
+        offset = np.zeros(values.shape[1])
+        offset[column] = step
+        columns.append((function(values + offset) - function(values - offset)) / (2 * step))
+    return np.stack(columns, axis=2)
+
+
+def test_bursa_wolf_point_jacobian():
+    rows = np.tile(PARAMS, (len(XYZ), 1))
+    numeric = _numeric_jacobian(lambda xyz: apply_bursa_wolf(xyz, rows), XYZ, [1.0] * 3)
+    assert np.allclose(bursa_wolf_point_jacobian(rows), numeric, rtol=0, atol=1e-9)
+
+
+def test_bursa_wolf_parameter_jacobian():
+    rows = np.tile(PARAMS, (len(XYZ), 1))
+    numeric = _numeric_jacobian(lambda p: apply_bursa_wolf(XYZ, p), rows, [1.0, 1.0, 1.0, 1e-6, 1e-6, 1e-6, 1e-6])
+    # 解析雅可比在参数初值处线性化，忽略尺度与旋转的乘积项（相对 ~1e-5）
+    assert np.allclose(bursa_wolf_parameter_jacobian(XYZ), numeric, rtol=1e-4, atol=1e-6)
+
+
+def test_local_to_cartesian_jacobian(service):
+    ellipsoid = service.build_system(SYSTEM, "test").ellipsoid
+    blh = service._xyz_to_blh_array(*XYZ.T, ellipsoid)
+    e2 = ellipsoid.first_eccentricity_squared
+    w = np.sqrt(1 - e2 * np.sin(np.radians(blh[:, 0])) ** 2)
+    meridian = ellipsoid.semi_major_axis * (1 - e2) / w**3 + blh[:, 2]
+    prime = (ellipsoid.semi_major_axis / w + blh[:, 2]) * np.cos(np.radians(blh[:, 0]))
+
+    def to_xyz(neu):
+        lat = blh[:, 0] + np.degrees(neu[:, 0] / meridian)
+        lon = blh[:, 1] + np.degrees(neu[:, 1] / prime)
+        return service._blh_to_xyz_array(lat, lon, blh[:, 2] + neu[:, 2], ellipsoid)
+
+    numeric = _numeric_jacobian(to_xyz, np.zeros((len(XYZ), 3)), [1.0] * 3)
+    assert np.allclose(local_to_cartesian_jacobian(blh[:, 0], blh[:, 1]), numeric, rtol=0, atol=1e-6)
+
+
+def test_gauss_jacobian(service):
+    system = service.build_system(SYSTEM, "test")
+    lat, lon = np.array([23.5, 45.0]), np.array([115.2, 112.9])
+    meridian_cm = np.full(2, 114.0)
+    _, _, point_scale, convergence = service._gauss_forward_array(
+        lat, lon, meridian_cm, system.projection, system.ellipsoid, with_factors=True
+    )
+    e2 = system.ellipsoid.first_eccentricity_squared
+    w = np.sqrt(1 - e2 * np.sin(np.radians(lat)) ** 2)
+    meridian = system.ellipsoid.semi_major_axis * (1 - e2) / w**3
+    prime = system.ellipsoid.semi_major_axis / w * np.cos(np.radians(lat))
+
+    def to_grid(ne):
+        x, y = service._gauss_forward_array(
+            lat + np.degrees(ne[:, 0] / meridian), lon + np.degrees(ne[:, 1] / prime),
+            meridian_cm, system.projection, system.ellipsoid,
+        )
+        return np.column_stack((x, y))
+
+    numeric = _numeric_jacobian(to_grid, np.zeros((2, 2)), [1.0, 1.0])
+    assert np.allclose(gauss_jacobian(point_scale, convergence), numeric, rtol=0, atol=1e-6)
+
+
+def test_propagation_matches_monte_carlo():
+    rng = np.random.default_rng(11)
+    sigma = np.diag([0.02, 0.03, 0.05]) ** 2
+    samples = rng.multivariate_normal(XYZ[0], sigma, 20000)
+    scatter = np.cov(apply_bursa_wolf(samples, PARAMS).T)
+    analytic = propagate(bursa_wolf_point_jacobian(PARAMS), sigma[None])[0]
+    assert np.allclose(scatter, analytic, rtol=0.05, atol=5e-5)
+
+
+def test_process_propagates_solved_parameter_and_point_covariance(service):
+    from taomeasure import create_app
+
+    rng = np.random.default_rng(2)
+    lat = np.radians(30.0 + rng.uniform(-1.0, 1.0, 20))
+    lon = np.radians(114.0 + rng.uniform(-1.0, 1.0, 20))
+    radius = 6378137.0 + rng.uniform(0.0, 500.0, 20)
+    source = np.column_stack((radius * np.cos(lat) * np.cos(lon), radius * np.cos(lat) * np.sin(lon), radius * np.sin(lat)))
+    target = apply_bursa_wolf(source, PARAMS) + rng.normal(0.0, 0.02, source.shape)
+    common = [{"name": f"C{i}", "source": dict(zip("XYZ", s)), "target": dict(zip("XYZ", t))}
+              for i, (s, t) in enumerate(zip(source.tolist(), target.tolist()))]
+    points = [{"name": "P0", **dict(zip("XYZ", XYZ[0])), "sigma": [0.01, 0.02, 0.03]},
+              {"name": "P1", **dict(zip("XYZ", XYZ[1]))}]
+
+    data = create_app().test_client().post(
+        "/api/coordinate/universal/process",
+        json={"source_system": SYSTEM, "target_system": SYSTEM, "common_points": common, "points": points},
+    ).get_json()["data"]
+
+    parameters = data["seven_parameters"]
+    rows = np.tile([parameters[key] for key in ("dx", "dy", "dz", "rx", "ry", "rz", "scale")], (2, 1))
+    sigma_theta = np.broadcast_to(np.asarray(parameters["covariance"]), (2, 7, 7))
+    expected = propagate(bursa_wolf_parameter_jacobian(XYZ), sigma_theta)
+    expected[0] += propagate(bursa_wolf_point_jacobian(rows[:1]), np.diag([0.01, 0.02, 0.03])[None] ** 2)[0]
+
+    for entry, covariance in zip(data["results"], expected):
+        assert np.allclose(entry["target"]["covariance"], covariance, rtol=1e-9, atol=1e-15)
+        assert entry["target"]["sigma_X"] == pytest.approx(np.sqrt(covariance[0, 0]))
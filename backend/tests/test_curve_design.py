@@ -0,0 +1,148 @@
+"""Curve stake-out: main points, segment classification and exit tangents."""
+
+import math
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.alignment import HorizontalAlignment
+from taomeasure.domain.curve_design import CurveDesign
+
+TRANSITION = {"alpha": 35.5, "R": 600, "l0": 120, "jd_mileage": 5000, "x_jd": 3000.0, "y_jd": 2000.0,
+              "azimuth_in": 40.0}
+CIRCULAR = {"alpha": 28.0, "R": 800, "jd_mileage": 5000, "x_jd": 3000.0, "y_jd": 2000.0, "azimuth_in": 40.0}
+
+
+@pytest.fixture(scope="module")
+def designer():
+    return CurveDesign()
+
+
+def _centers(result):
+    return np.array([[row["center_x"], row["center_y"]] for row in result["design_points"]])
+
+
+@pytest.mark.parametrize("params,design,end", [
+    (TRANSITION, "transition_curve_design", "HZ"),
+    (CIRCULAR, "circular_curve_design", "YZ"),
+])
+def test_exit_tangent_leaves_along_outgoing_azimuth(designer, params, design, end):
+    probe = getattr(designer, design)(dict(params, test_mileages=[0.0]))
+    end_mileage = probe["main_points_mileage"][end]
+    result = getattr(designer, design)(dict(params, test_mileages=[end_mileage + 10, end_mileage + 60]))
+    first, second = _centers(result)
+    azimuth_out = math.radians(params["azimuth_in"] + params["alpha"])
+    assert second - first == pytest.approx([50 * math.cos(azimuth_out), 50 * math.sin(azimuth_out)], abs=1e-9)
+
+
+@pytest.mark.parametrize("params,design,ends", [
+    (TRANSITION, "transition_curve_design", ("ZH", "HY", "YH", "HZ")),
+    (CIRCULAR, "circular_curve_design", ("ZY", "YZ")),
+])
+def test_stake_out_is_continuous_at_main_points(designer, params, design, ends):
+    probe = getattr(designer, design)(dict(params, test_mileages=[0.0]))
+    for name in ends:
+        mileage = probe["main_points_mileage"][name]
+        result = getattr(designer, design)(dict(params, test_mileages=[mileage - 1e-6, mileage + 1e-6]))
+        before, after = _centers(result)
+        assert np.hypot(*(after - before)) < 1e-4, name
+        # 边桩连续即法线方向连续
+        left = np.array([[row["left_x"], row["left_y"]] for row in result["design_points"]])
+        assert np.hypot(*(left[1] - left[0])) < 1e-4, name
+
+
+def test_batch_matches_single_mileages(designer):
+    probe = designer.transition_curve_design(dict(TRANSITION, test_mileages=[0.0]))
+    mileages = probe["main_points_mileage"]
+    # 乱序里程覆盖全部五段
+    stations = [mileages["HZ"] + 30, mileages["ZH"] - 25, mileages["HY"] + 40, mileages["ZH"] + 10,
+                mileages["YH"] + 5, mileages["HY"], "5000"]
+    batch = designer.transition_curve_design(dict(TRANSITION, test_mileages=stations))["design_points"]
+    for station, row in zip(stations, batch):
+        single = designer.transition_curve_design(dict(TRANSITION, test_mileages=[station]))["design_points"][0]
+        assert row == single
+
+
+def test_circular_stakes_lie_on_the_arc(designer):
+    result = designer.circular_curve_design(dict(CIRCULAR, stations={"interval": 20}))
+    mileages = result["main_points_mileage"]
+    centre = result["main_points_coords"]["Center"]
+    arc = [row for row in result["design_points"] if mileages["ZY"] <= row["mileage"] <= mileages["YZ"]]
+    assert len(arc) > 10
+    for row in arc:
+        assert math.hypot(row["center_x"] - centre["x"], row["center_y"] - centre["y"]) == pytest.approx(800)
+
+
+def test_transition_stakes_follow_the_alignment_geometry(designer):
+    result = designer.transition_curve_design(dict(TRANSITION, stations={"interval": 10}))
+    azimuth_in = math.radians(TRANSITION["azimuth_in"])
+    azimuth_out = math.radians(TRANSITION["azimuth_in"] + TRANSITION["alpha"])
+    points = [
+        {"x": 3000.0 - 1000 * math.cos(azimuth_in), "y": 2000.0 - 1000 * math.sin(azimuth_in)},
+        {"x": 3000.0, "y": 2000.0, "R": 600, "l0": 120},
+        {"x": 3000.0 + 1000 * math.cos(azimuth_out), "y": 2000.0 + 1000 * math.sin(azimuth_out)},
+    ]
+    alignment = HorizontalAlignment.from_points(points, start_station=4000.0)
+    mileages = np.array([row["mileage"] for row in result["design_points"]])
+    x, y, _ = alignment.locate(mileages)
+    # 两者缓和曲线级数的截断项不同，差异在 0.1 mm 量级
+    assert np.abs(x - [row["center_x"] for row in result["design_points"]]).max() < 1e-3
+    assert np.abs(y - [row["center_y"] for row in result["design_points"]]).max() < 1e-3
+    for name in ("ZH", "HY", "YH", "HZ"):
+        assert result["main_points_mileage"][name] == pytest.approx(alignment.main_points()[f"JD1.{name}"], abs=1e-3)
+
+
+SHARP = {"alpha": 120.0, "R": 80, "l0": 140, "jd_mileage": 1000, "x_jd": 500.0, "y_jd": 500.0, "azimuth_in": 10.0}
+
+
+@pytest.mark.parametrize("method", ["series", "fresnel"])
+def test_sharp_spiral_main_points_meet_the_stakes(designer, method):
+    params = dict(SHARP, spiral_method=method)
+    probe = designer.transition_curve_design(dict(params, test_mileages=[0.0]))
+    for name in ("HY", "YH", "HZ"):
+        mileage = probe["main_points_mileage"][name]
+        result = designer.transition_curve_design(dict(params, test_mileages=[mileage - 1e-6, mileage, mileage + 1e-6]))
+        centers = _centers(result)
+        point = probe["main_points_coords"][name]
+        assert np.hypot(*(centers[2] - centers[0])) < 1e-4, name
+        assert centers[1] == pytest.approx([point["x"], point["y"]], abs=1e-6), name
+
+
+def test_fresnel_curve_elements_match_the_exact_alignment(designer):
+    series = designer.transition_curve_design(dict(SHARP, test_mileages=[0.0]))
+    exact = designer.transition_curve_design(dict(SHARP, spiral_method="fresnel", test_mileages=[0.0]))
+    azimuth_in = math.radians(SHARP["azimuth_in"])
+    azimuth_out = math.radians(SHARP["azimuth_in"] + SHARP["alpha"])
+    points = [
+        {"x": 500.0 - 800 * math.cos(azimuth_in), "y": 500.0 - 800 * math.sin(azimuth_in)},
+        {"x": 500.0, "y": 500.0, "R": 80, "l0": 140},
+        {"x": 500.0 + 800 * math.cos(azimuth_out), "y": 500.0 + 800 * math.sin(azimuth_out)},
+    ]
+    alignment = HorizontalAlignment.from_points(points, start_station=200.0, spiral="fresnel")
+    for name in ("ZH", "HY", "YH", "HZ"):
+        station = alignment.main_points()[f"JD1.{name}"]
+        x, y, _ = alignment.locate([station])
+        assert exact["main_points_mileage"][name] == pytest.approx(station, abs=1e-6)
+        assert [exact["main_points_coords"][name]["x"], exact["main_points_coords"][name]["y"]] == pytest.approx(
+            [x[0], y[0]], abs=1e-6
+        )
+    # 缓和曲线角近 1 rad，两项级数的内移值与切线长已有厘米级误差
+    assert abs(series["curve_elements"]["T"] - exact["curve_elements"]["T"]) > 0.01
+
+
+def test_station_spec_treats_null_as_default(designer):
+    spec = {"interval": None, "method": None, "start": None, "end": None, "extra": None}
+    result = designer.transition_curve_design(dict(TRANSITION, stations=spec))
+    defaults = designer.transition_curve_design(dict(TRANSITION, stations={}))
+    assert result["design_points"] == defaults["design_points"]
+
+
+def test_invalid_station_spec_answers_400():
+    from taomeasure import create_app
+
+    client = create_app().test_client()
+    response = client.post("/api/curve-design", json={
+        "curve_type": "transition", "parameters": dict(TRANSITION, stations={"start": "abc"})
+    })
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
@@ -0,0 +1,78 @@
+"""Point scale factor, meridian convergence and batch ground/grid distance reduction."""
+
+import math
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.universal_coordinate import UniversalCoordinateService
+
+SYSTEM = {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114}}
+
+
+@pytest.fixture(scope="module")
+def service():
+    return UniversalCoordinateService()
+
+
+def test_factors_on_and_off_the_central_meridian(service):
+    rows = [{"name": "CM", "lat": 32.0, "lon": 114.0}, {"name": "E", "lat": 32.0, "lon": 115.2}]
+    on_meridian, east = service.batch_gauss_projection(rows, SYSTEM, "forward")["results"]
+    assert on_meridian["point_scale_factor"] == pytest.approx(1.0, abs=1e-12)
+    assert on_meridian["meridian_convergence"] == pytest.approx(0.0, abs=1e-12)
+
+    # m ≈ 1 + y²/(2R²)，γ ≈ Δλ·sinB，取至二阶项
+    system = service.build_system(SYSTEM, "test")
+    a, e2 = system.ellipsoid.semi_major_axis, system.ellipsoid.first_eccentricity_squared
+    sin_b = math.sin(math.radians(32.0))
+    radius = a * math.sqrt(1 - e2) / (1 - e2 * sin_b**2)
+    offset = east["y"] - 500000.0
+    assert east["point_scale_factor"] == pytest.approx(1 + offset**2 / (2 * radius**2), abs=2e-7)
+    assert east["meridian_convergence"] == pytest.approx(1.2 * sin_b, rel=2e-3)
+
+
+def test_inverse_projection_reports_the_same_factors(service):
+    rows = [{"lat": 28.3, "lon": 112.9}, {"lat": 41.0, "lon": 115.4}]
+    forward = service.batch_gauss_projection(rows, SYSTEM, "forward")["results"]
+    inverse = service.batch_gauss_projection([{"x": r["x"], "y": r["y"]} for r in forward], SYSTEM, "inverse")["results"]
+    for there, back in zip(forward, inverse):
+        assert back["point_scale_factor"] == pytest.approx(there["point_scale_factor"], abs=1e-10)
+        assert back["meridian_convergence"] == pytest.approx(there["meridian_convergence"], abs=1e-8)
+
+
+def test_ground_to_grid_matches_projected_coordinates(service):
+    # 高程为零时地面距离即椭球面距离，归算后的平面距离应等于两端点投影坐标之差
+    system = service.build_system(SYSTEM, "test")
+    starts = np.array([[30.0, 115.3], [36.5, 113.1], [25.2, 114.0]])
+    ends = starts + np.array([[0.004, 0.006], [-0.003, 0.008], [0.009, 0.0]])
+    xyz = [service._blh_to_xyz_array(p[:, 0], p[:, 1], np.zeros(3), system.ellipsoid) for p in (starts, ends)]
+    chord = np.linalg.norm(xyz[1] - xyz[0], axis=1)
+    pairs = [
+        {"name": f"L{i}", "from": {"lat": s[0], "lon": s[1], "H": 0.0}, "to": {"lat": e[0], "lon": e[1], "H": 0.0}, "distance": d}
+        for i, (s, e, d) in enumerate(zip(starts.tolist(), ends.tolist(), chord.tolist()))
+    ]
+    reduced = service.batch_reduce_distances(pairs, SYSTEM)["results"]
+
+    grid = [service.batch_gauss_projection([{"lat": s[0], "lon": s[1]}, {"lat": e[0], "lon": e[1]}], SYSTEM)["results"]
+            for s, e in zip(starts.tolist(), ends.tolist())]
+    for entry, (a, b) in zip(reduced, grid):
+        assert entry["height_factor"] == pytest.approx(1.0, abs=1e-15)
+        assert entry["grid_distance"] == pytest.approx(math.hypot(b["x"] - a["x"], b["y"] - a["y"]), abs=1e-5)
+
+
+def test_grid_to_ground_inverts_ground_to_grid(service):
+    pairs = [
+        {"name": "AB", "from": {"lat": 30.5, "lon": 115.1, "h": 850.0}, "to": {"lat": 30.52, "lon": 115.13, "h": 870.0}, "distance": 3600.0},
+        {"name": "CD", "from": {"lat": 31.0, "lon": 113.0}, "to": {"lat": 31.01, "lon": 113.02}},
+    ]
+    down = service.batch_reduce_distances(pairs, SYSTEM, "ground_to_grid")
+    assert down["count"] == 1 and "测量距离" in down["results"][1]["error"]
+
+    first = down["results"][0]
+    assert first["height_factor"] < 1.0
+    back = service.batch_reduce_distances([dict(pairs[0], distance=first["grid_distance"])], SYSTEM, "grid_to_ground")
+    assert back["results"][0]["ground_distance"] == pytest.approx(3600.0, abs=1e-9)
+
+    # 未给距离时由端点平面坐标反算
+    derived = service.batch_reduce_distances(pairs[1:], SYSTEM, "grid_to_ground")["results"][0]
+    assert derived["ground_distance"] * derived["combined_factor"] == pytest.approx(derived["grid_distance"])
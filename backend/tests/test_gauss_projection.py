@@ -0,0 +1,28 @@
+"""Gauss-Krüger forward/inverse round trips."""
+
+import pytest
+
+from taomeasure.domain.universal_coordinate import UniversalCoordinateService
+
+
+@pytest.fixture(scope="module")
+def service():
+    return UniversalCoordinateService()
+
+
+@pytest.fixture(scope="module")
+def system(service):
+    return service.build_system(
+        {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114, "zone_width": 3}}, "test"
+    )
+
+
+@pytest.mark.parametrize("lat", [1.0, 23.5, 45.0, 68.0])
+@pytest.mark.parametrize("dlon", [-1.5, -0.4, 0.0, 0.7, 1.5])
+def test_forward_inverse_round_trip(service, system, lat, dlon):
+    x, y = service._gauss_forward(lat, 114 + dlon, 114, system.projection, system.ellipsoid)
+    back_lat, back_lon = service._gauss_inverse(x, y, 114, system.projection, system.ellipsoid)
+    # 1e-8° ≈ 1 mm; without 1/cos(Bf) in the longitude series the error grew from
+    # ~2e-4° at 1°N to whole degrees at high latitude, 1.5° from the central meridian
+    assert back_lat == pytest.approx(lat, abs=1e-8)
+    assert back_lon == pytest.approx(114 + dlon, abs=1e-8)
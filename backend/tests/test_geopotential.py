@@ -0,0 +1,111 @@
+"""Spherical-harmonic height anomalies and remove-compute-restore GPS levelling fits."""
+
+import math
+
+import numpy as np
+import pytest
+from scipy.special import lpmv
+
+from taomeasure.domain.geopotential import GeopotentialModel, NormalField
+from taomeasure.domain.gps_altitude import GPSAltitudeConverter
+
+GM, RADIUS, DEGREE = 3.986004415e14, 6378136.3, 8
+
+
+def _write_gfc(path, degree=DEGREE, seed=1, zonal_only=False):
+    rng = np.random.default_rng(seed)
+    normal = NormalField.named("CGCS2000").zonal(degree, GM, RADIUS)
+    lines = ["product_type gravity_field", f"earth_gravity_constant {GM:.9e}", f"radius {RADIUS}",
+             f"max_degree {degree}", "norm fully_normalized", "key n m C S sigC sigS", "end_of_head"]
+    for n in range(degree + 1):
+        for m in range(n + 1):
+            c = normal[n] if m == 0 else 0.0
+            s = 0.0
+            if n >= 2 and not zonal_only:
+                c += rng.normal(0.0, 1e-6 / n**2)
+                s = rng.normal(0.0, 1e-6 / n**2) if m else 0.0
+            # Fortran 风格的 D 指数
+            lines.append(f"gfc {n} {m} {c:.15e} {s:.15e} 0 0".replace("e", "D"))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def _brute_force(model, lats, lons):
+    # 逐点按定义求和：T = GM/r·Σₙ(a/r)ⁿΣₘ(ΔC̄ cos mλ + S̄ sin mλ)P̄ₙₘ(sin φ̄) + ΔGM/r，ζ = T/γ
+    normal, C, S = model._disturbing("CGCS2000")
+    values = []
+    for lat, lon in zip(lats, lons):
+        phi, r = (value.item() for value in normal.geocentric(np.array([lat])))
+        lam = math.radians(lon)
+        total = 0.0
+        for n in range(2, model.max_degree + 1):
+            for m in range(n + 1):
+                norm = math.sqrt((2 - (m == 0)) * (2 * n + 1) * math.factorial(n - m) / math.factorial(n + m))
+                legendre = (-1) ** m * norm * lpmv(m, n, math.sin(phi))
+                total += (model.radius / r) ** n * legendre * (C[n, m] * math.cos(m * lam) + S[n, m] * math.sin(m * lam))
+        disturbing = model.gm / r * total + (model.gm - normal.gm) / r
+        values.append(disturbing / normal.gravity(np.array([lat])).item())
+    return np.array(values)
+
+
+@pytest.fixture(scope="module")
+def geoid_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("geoids")
+    _write_gfc(directory / "LOW.gfc")
+    _write_gfc(directory / "NORMAL.gfc", zonal_only=True)
+    return directory
+
+
+def test_clenshaw_evaluation_matches_the_direct_sum(geoid_dir):
+    model = GeopotentialModel.load(str(geoid_dir / "LOW.gfc"))
+    rng = np.random.default_rng(2)
+    lats = np.concatenate([rng.uniform(-89.0, 89.0, 20), [0.0, 89.999, -89.999]])
+    lons = rng.uniform(-180.0, 180.0, len(lats))
+    assert np.abs(model.height_anomaly(lats, lons) - _brute_force(model, lats, lons)).max() < 1e-9
+
+
+def test_rows_sharing_a_latitude_match_single_point_evaluation(geoid_dir):
+    model = GeopotentialModel.load(str(geoid_dir / "LOW.gfc"))
+    # 超过一个行块（64 个纬度）且同一纬度多点共用一次递推
+    lats = np.repeat(np.linspace(20.0, 40.0, 100), 3)
+    lons = np.tile([100.0, 110.0, 120.0], 100)
+    batched = model.height_anomaly(lats, lons)
+    single = np.array([model.height_anomaly([lat], [lon])[0] for lat, lon in zip(lats[::37], lons[::37])])
+    assert batched[::37] == pytest.approx(single, abs=1e-12)
+
+
+def test_truncation_and_normal_field(geoid_dir):
+    full = GeopotentialModel.load(str(geoid_dir / "LOW.gfc"))
+    truncated = GeopotentialModel.load(str(geoid_dir / "LOW.gfc"), max_degree=4)
+    assert truncated.max_degree == 4 and np.all(truncated.C[:5, :5] == full.C[:5, :5])
+    # 系数仅为正常场带谐项时扰动位只剩 GM 差引起的零阶项
+    normal = GeopotentialModel.load(str(geoid_dir / "NORMAL.gfc"))
+    lats, lons = np.array([10.0, 45.0, 80.0]), np.array([0.0, 90.0, -120.0])
+    field = NormalField.named("CGCS2000")
+    expected = (GM - field.gm) / field.geocentric(lats)[1] / field.gravity(lats)
+    assert normal.height_anomaly(lats, lons) == pytest.approx(expected, abs=1e-9)
+
+
+def test_remove_compute_restore_recovers_geoid_plus_surface(geoid_dir):
+    converter = GPSAltitudeConverter(geoid_dir=str(geoid_dir))
+    model = converter.geoids.get("LOW")
+    rng = np.random.default_rng(3)
+    lats, lons = 30.0 + rng.uniform(-1.0, 1.0, 25), 114.0 + rng.uniform(-1.0, 1.0, 25)
+    anomalies = model.height_anomaly(lats, lons) + 0.4 + 0.05 * (lats - 30.0) - 0.03 * (lons - 114.0)
+    known = [{"name": f"K{i}", "lat": a, "lon": b, "H": 60.0 + z, "anomaly": z}
+             for i, (a, b, z) in enumerate(zip(lats.tolist(), lons.tolist(), anomalies.tolist()))]
+    unknown = [{"name": "U0", "lat": 30.3, "lon": 113.6, "H": 70.0}, {"name": "U1", "lat": 29.5, "lon": 114.8, "H": 80.0}]
+
+    result = converter.surface_basis_fitting(known, unknown, {"model_type": "plane", "geoid": "LOW"})
+    assert np.abs(result["accuracy_assessment"]["residuals"]).max() < 1e-9
+    assert result["parameters"]["重力场模型"]["name"] == "LOW"
+    for point, row in zip(unknown, result["results"]):
+        restored = model.height_anomaly([point["lat"]], [point["lon"]])[0]
+        expected = restored + 0.4 + 0.05 * (point["lat"] - 30.0) - 0.03 * (point["lon"] - 114.0)
+        assert row["geoid_anomaly"] == pytest.approx(restored, abs=1e-12)
+        assert row["calculated_anomaly"] == pytest.approx(expected, abs=1e-9)
+
+    # 导出的模型按名称引用重力场模型，导入后预测一致
+    imported = converter.import_model(converter.export_model(result["model_id"]))
+    assert converter.predict(imported, unknown)["results"] == result["results"]
+    assert "未找到重力场模型" in converter.surface_basis_fitting(known, unknown, {"geoid": "EGM2008"})["error"]
@@ -0,0 +1,84 @@
+"""Fit-once, predict-many height anomaly models: registry, export and import."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.gps_altitude import GPSAltitudeConverter, HeightAnomalyModel, HeightAnomalyModelRegistry
+
+
+def _points(count, seed, with_anomaly=True):
+    rng = np.random.default_rng(seed)
+    lats = 30.0 + rng.uniform(-0.3, 0.3, count)
+    lons = 114.0 + rng.uniform(-0.3, 0.3, count)
+    anomalies = 12.0 + 0.8 * (lats - 30.0) - 0.5 * (lons - 114.0) + rng.normal(0.0, 0.01, count)
+    points = []
+    for i, (lat, lon, anomaly) in enumerate(zip(lats.tolist(), lons.tolist(), anomalies.tolist())):
+        point = {"name": f"P{i}", "lat": lat, "lon": lon, "H": 50.0 + anomaly}
+        if with_anomaly:
+            point["anomaly"] = anomaly
+        points.append(point)
+    return points
+
+
+@pytest.mark.parametrize(
+    "model,model_params",
+    [
+        ("vertical_translation", {}),
+        ("linear_basis", {"model_type": "quadratic"}),
+        ("surface_basis", {"model_type": "plane", "robust": "huber"}),
+        ("local_basis", {"model_type": "kriging"}),
+    ],
+)
+def test_exported_model_predicts_the_same_in_a_fresh_app(model, model_params):
+    from taomeasure import create_app
+
+    known, unknown = _points(16, 1), _points(30, 2, with_anomaly=False)
+    client = create_app().test_client()
+    fitted = client.post(
+        "/api/gps-altitude",
+        json={"known_points": known, "unknown_points": unknown, "model": model, "model_params": model_params},
+    ).get_json()
+    exported = client.get(f"/api/gps-altitude/models/{fitted['model_id']}").get_json()["data"]
+
+    # 另一个应用实例的登记表中没有该模型，导入文件内容后预测结果一致
+    other = create_app().test_client()
+    missing = other.post("/api/gps-altitude/predict", json={"model_id": fitted["model_id"], "unknown_points": unknown})
+    assert missing.status_code == 400
+    imported = other.post("/api/gps-altitude/models", json={"content": exported["content"]}).get_json()["data"]
+    assert imported["coefficients"] == exported["model"]["coefficients"]
+    predicted = other.post(
+        "/api/gps-altitude/predict", json={"model_id": imported["model_id"], "unknown_points": unknown}
+    ).get_json()
+    assert predicted["data"] == fitted["data"]
+    assert predicted["statistics"] == exported["model"]["statistics"]
+
+
+def test_registry_evicts_the_least_recently_used_model():
+    registry = HeightAnomalyModelRegistry(capacity=2)
+    first, second, third = (HeightAnomalyModel(model="vertical_translation", coefficients=[c]) for c in (1.0, 2.0, 3.0))
+    registry.register(first)
+    registry.register(second)
+    registry.get(first.model_id)
+    registry.register(third)
+    assert registry.get(first.model_id) is first and registry.get(third.model_id) is third
+    with pytest.raises(ValueError, match=second.model_id):
+        registry.get(second.model_id)
+
+
+@pytest.mark.parametrize(
+    "change,message",
+    [
+        ({"model": "spline"}, "未支持的模型"),
+        ({"model_type": "cubic"}, "不支持类型"),
+        ({"coefficients": [1.0, 2.0]}, "系数个数应为 3"),
+        ({"factor": [[1.0]]}, "factor"),
+        ({"azimuth": None}, "azimuth"),
+    ],
+)
+def test_import_rejects_inconsistent_definitions(change, message):
+    converter = GPSAltitudeConverter()
+    known = _points(10, 3)
+    model_id = converter.linear_basis_fitting(known, known[:1], {"model_type": "quadratic"})["model_id"]
+    definition = dict(converter.export_model(model_id), **change)
+    with pytest.raises(ValueError, match=message):
+        converter.import_model(definition)
@@ -0,0 +1,83 @@
+"""Leave-one-out scoring and automatic model selection for GPS levelling fits."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.gps_altitude import GPSAltitudeConverter, _global_solution
+
+
+@pytest.fixture(scope="module")
+def converter():
+    return GPSAltitudeConverter()
+
+
+def _known_points(count=30, outlier=None, seed=7):
+    rng = np.random.default_rng(seed)
+    lats = 30.0 + rng.uniform(-0.2, 0.2, count)
+    lons = 114.0 + rng.uniform(-0.2, 0.2, count)
+    anomalies = 12.0 + 0.8 * (lats - 30.0) - 0.5 * (lons - 114.0) + rng.normal(0.0, 0.01, count)
+    if outlier is not None:
+        anomalies[outlier] += 0.5
+    return [
+        {"name": f"P{i}", "lat": lat, "lon": lon, "H": 50.0 + anomaly, "anomaly": anomaly}
+        for i, (lat, lon, anomaly) in enumerate(zip(lats.tolist(), lons.tolist(), anomalies.tolist()))
+    ]
+
+
+@pytest.mark.parametrize("model,model_type", [("linear_basis", "quadratic"), ("surface_basis", "quadratic")])
+@pytest.mark.parametrize("robust", [None, "igg3"])
+def test_hat_matrix_loo_matches_brute_force_refit(converter, model, model_type, robust):
+    points = _known_points(outlier=3)
+    A = converter._candidate_design(points, model, model_type)
+    anomalies = np.array([point["anomaly"] for point in points])
+    solution = _global_solution(A, anomalies, robust)
+    loo = converter._leave_one_out(solution)
+
+    # 逐点删除后以收敛的等价权重新拟合
+    weights = solution["weights"]
+    for i in range(len(points)):
+        keep = np.arange(len(points)) != i
+        root = np.sqrt(weights[keep])
+        coefficients = np.linalg.lstsq(A[keep] * root[:, None], anomalies[keep] * root, rcond=None)[0]
+        assert loo[i] == pytest.approx(anomalies[i] - A[i] @ coefficients, abs=1e-9)
+
+
+def test_global_solution_factor_matches_normal_matrix():
+    points = _known_points()
+    A = GPSAltitudeConverter._candidate_design(points, "surface_basis", "quadratic")
+    anomalies = np.array([point["anomaly"] for point in points])
+    solution = _global_solution(A, anomalies, "huber")
+    R = np.asarray(solution["factor"])
+    normal = A.T @ (solution["weights"][:, None] * A)
+    assert np.allclose(R.T @ R, normal, rtol=1e-10, atol=1e-10 * np.abs(normal).max())
+
+
+def test_auto_selection_scores_with_robust_weights(converter):
+    points = _known_points(outlier=3)
+    params = {"robust": "igg3", "candidates": ["surface_basis:plane", "surface_basis:quadratic"]}
+    result = converter.auto_model_selection(points, points[:2], params)
+    comparison = result["selection"]["comparison"]
+    selected = next(entry for entry in comparison if entry["selected"])
+
+    # 最优模型与直接以相同设置拟合的结果一致
+    direct = converter.surface_basis_fitting(points, points[:2], dict(params, model_type=selected["model_type"]))
+    assert result["robust"]["weights"] == pytest.approx(direct["robust"]["weights"])
+    assert result["robust"]["downweighted"][0]["name"] == "P3"
+    assert result["unit_weight_error"] == pytest.approx(direct["unit_weight_error"])
+
+    # 被拒绝的粗差点不抬高留一中误差
+    plain = converter.auto_model_selection(points, points[:2], {"candidates": params["candidates"]})
+    plain_selected = next(entry for entry in plain["selection"]["comparison"] if entry["selected"])
+    assert selected["loo_rms"] < 0.5 * plain_selected["loo_rms"]
+
+
+def test_auto_selection_rejects_unknown_robust_method(converter):
+    assert "error" in converter.auto_model_selection(_known_points(), [], {"robust": "cauchy"})
+
+
+def test_auto_selection_with_too_few_points_for_local_candidates(converter):
+    points = _known_points(count=3)
+    result = converter.fit("auto", points, points[:1], {"candidates": ["vertical_translation", "local_basis:kriging"]})
+    comparison = {entry["model"]: entry for entry in result["selection"]["comparison"]}
+    assert comparison["local_basis"]["eligible"] is False
+    assert result["model"] == "vertical_translation"
@@ -0,0 +1,122 @@
+"""Unknown-point prediction of the global GPS levelling models."""
+
+import math
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.gps_altitude import GPSAltitudeConverter
+
+
+def _points(count, seed, with_anomaly=True):
+    rng = np.random.default_rng(seed)
+    lats = 30.0 + rng.uniform(-0.3, 0.3, count)
+    lons = 114.0 + 0.6 * (lats - 30.0) + rng.uniform(-0.05, 0.05, count)
+    anomalies = 12.0 + 0.8 * (lats - 30.0) - 0.5 * (lons - 114.0) + 0.3 * (lats - 30.0) ** 2 + rng.normal(0.0, 0.01, count)
+    points = []
+    for i, (lat, lon, anomaly) in enumerate(zip(lats.tolist(), lons.tolist(), anomalies.tolist())):
+        point = {"name": f"P{i}", "lat": lat, "lon": lon, "H": 50.0 + anomaly}
+        if with_anomaly:
+            point["anomaly"] = anomaly
+        points.append(point)
+    return points
+
+
+@pytest.fixture(scope="module")
+def converter():
+    return GPSAltitudeConverter()
+
+
+def _coefficients(result):
+    return [value for value in result["parameters"]["拟合系数"].values() if value is not None]
+
+
+def _line_anomaly(point, result, ref_lat, ref_lon):
+    # 逐点标量求值：线路坐标 y 与 ζ = a₀ + a₁y + a₂y²
+    azimuth = result["parameters"]["线路方位角"]
+    north = math.radians(point["lat"] - ref_lat) * 6371000
+    east = math.radians(point["lon"] - ref_lon) * 6371000 * math.cos(math.radians(ref_lat))
+    y = north * math.cos(azimuth) + east * math.sin(azimuth)
+    return y, sum(c * y**power for power, c in enumerate(_coefficients(result)))
+
+
+def _surface_anomaly(point, result):
+    ref = result["parameters"]["参考点坐标"]
+    dB, dL = point["lat"] - ref["纬度 B₀"], point["lon"] - ref["经度 L₀"]
+    terms = [1.0, dB, dB**2, dL, dL**2, dL * dB] if len(_coefficients(result)) == 6 else [1.0, dB, dL]
+    return dB, dL, sum(c * term for c, term in zip(_coefficients(result), terms))
+
+
+def test_vertical_translation_applies_the_mean_anomaly(converter):
+    known, unknown = _points(12, 1), _points(50, 2, with_anomaly=False)
+    result = converter.vertical_translation_model(known, unknown)
+    mean = np.mean([point["anomaly"] for point in known])
+    for point, row in zip(unknown, result["results"]):
+        assert row["calculated_anomaly"] == pytest.approx(mean, abs=1e-12)
+        assert row["normal_height"] == pytest.approx(point["H"] - mean, abs=1e-12)
+
+
+@pytest.mark.parametrize("model_type", ["linear", "quadratic"])
+def test_linear_basis_matches_pointwise_evaluation(converter, model_type):
+    known, unknown = _points(15, 3), _points(200, 4, with_anomaly=False)
+    result = converter.linear_basis_fitting(known, unknown, {"model_type": model_type})
+    ref_lat = np.mean([point["lat"] for point in known])
+    ref_lon = np.mean([point["lon"] for point in known])
+    for point, row in zip(unknown, result["results"]):
+        y, anomaly = _line_anomaly(point, result, ref_lat, ref_lon)
+        assert row["name"] == point["name"]
+        assert row["y_coord"] == pytest.approx(y, abs=1e-6)
+        assert row["calculated_anomaly"] == pytest.approx(anomaly, abs=1e-9)
+        assert row["normal_height"] == pytest.approx(point["H"] - anomaly, abs=1e-9)
+
+
+@pytest.mark.parametrize("model_type", ["plane", "quadratic"])
+def test_surface_basis_matches_pointwise_evaluation(converter, model_type):
+    known, unknown = _points(15, 5), _points(200, 6, with_anomaly=False)
+    result = converter.surface_basis_fitting(known, unknown, {"model_type": model_type})
+    for point, row in zip(unknown, result["results"]):
+        dB, dL, anomaly = _surface_anomaly(point, result)
+        assert (row["delta_B"], row["delta_L"]) == pytest.approx((dB, dL), abs=1e-12)
+        assert row["calculated_anomaly"] == pytest.approx(anomaly, abs=1e-9)
+
+
+def test_known_points_reproduce_the_fitted_anomalies(converter):
+    known = _points(15, 7)
+    result = converter.surface_basis_fitting(known, known, {"model_type": "quadratic"})
+    predicted = [row["calculated_anomaly"] for row in result["results"]]
+    assert predicted == pytest.approx(result["accuracy_assessment"]["fitted_anomalies"], abs=1e-9)
+    # 空待求点列表同样可用
+    assert converter.linear_basis_fitting(known, [], {"model_type": "linear"})["results"] == []
+
+
+@pytest.mark.parametrize(
+    "model,model_params",
+    [("linear_basis", {"model_type": "quadratic"}), ("surface_basis", {"model_type": "quadratic", "robust": "huber"})],
+)
+def test_prediction_std_matches_the_explicit_inverse(converter, model, model_params):
+    known, unknown = _points(15, 8), _points(100, 9, with_anomaly=False)
+    result = converter.fit(model, known, unknown, model_params)
+    fitted = converter.models.get(result["model_id"])
+    weights = np.array(result["robust"]["weights"]) if "robust" in result else np.ones(len(known))
+
+    # σ₀·sqrt(aᵀ(AᵀPA)⁻¹a)，逐点以显式逆矩阵计算
+    A_known, _ = fitted.design(np.array([p["lat"] for p in known]), np.array([p["lon"] for p in known]))
+    inverse = np.linalg.inv(A_known.T @ (weights[:, None] * A_known))
+    A_unknown, _ = fitted.design(np.array([p["lat"] for p in unknown]), np.array([p["lon"] for p in unknown]))
+    for a, row in zip(A_unknown, result["results"]):
+        assert row["normal_height_std"] == pytest.approx(result["unit_weight_error"] * math.sqrt(a @ inverse @ a), rel=1e-9)
+
+
+def test_vertical_translation_std_is_the_standard_error_of_the_mean(converter):
+    known = _points(16, 10)
+    result = converter.vertical_translation_model(known, _points(3, 11, with_anomaly=False))
+    expected = result["unit_weight_error"] / 4.0
+    assert [row["normal_height_std"] for row in result["results"]] == pytest.approx([expected] * 3)
+
+
+def test_rank_deficient_fit_omits_the_std_column(converter):
+    # 已知点共线时二次面设计矩阵秩亏，不输出预测中误差
+    known = [dict(point, lon=114.0) for point in _points(12, 12)]
+    result = converter.surface_basis_fitting(known, _points(3, 13, with_anomaly=False), {"model_type": "quadratic"})
+    assert all("normal_height_std" not in row for row in result["results"])
+    assert converter.models.get(result["model_id"]).factor is None
@@ -0,0 +1,88 @@
+"""Robust (IRLS) GPS levelling fits."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.gps_altitude import GPSAltitudeConverter, _robust_lstsq, _robust_weights
+
+
+def _known_points(count=20, seed=11):
+    rng = np.random.default_rng(seed)
+    lats = 30.0 + rng.uniform(-0.2, 0.2, count)
+    lons = 114.0 + rng.uniform(-0.2, 0.2, count)
+    anomalies = 12.0 + 0.8 * (lats - 30.0) - 0.5 * (lons - 114.0) + rng.normal(0.0, 0.01, count)
+    anomalies[5] += 1.0
+    return [
+        {"name": f"P{i}", "lat": lat, "lon": lon, "H": 50.0 + anomaly, "anomaly": anomaly}
+        for i, (lat, lon, anomaly) in enumerate(zip(lats.tolist(), lons.tolist(), anomalies.tolist()))
+    ]
+
+
+def test_weight_functions():
+    standardized = np.array([0.0, -1.5, 2.0, -2.5, 3.0, 3.5])
+    assert _robust_weights(standardized, "huber", 1.5, 3.0) == pytest.approx([1.0, 1.0, 0.75, 0.6, 0.5, 1.5 / 3.5])
+    # IGG-III：|v| ≤ k0 保权，k0 < |v| ≤ k1 按 k0/|v|·((k1-|v|)/(k1-k0))² 降权，|v| > k1 拒绝
+    igg3 = _robust_weights(standardized, "igg3", 1.5, 3.0)
+    assert igg3 == pytest.approx([1.0, 1.0, 0.75 * (1 / 1.5) ** 2, 0.6 * (0.5 / 1.5) ** 2, 0.0, 0.0])
+
+
+@pytest.mark.parametrize("method", ["huber", "igg3"])
+def test_irls_converges_to_a_reweighted_least_squares_fixed_point(method):
+    rng = np.random.default_rng(2)
+    A = np.column_stack((np.ones(30), rng.uniform(-1.0, 1.0, 30)))
+    observations = A @ [2.0, 0.5] + rng.normal(0.0, 0.01, 30)
+    observations[[3, 17]] += [0.4, -0.3]
+    coefficients, weights, iterations, sigma = _robust_lstsq(A, observations, method)
+    assert 0 < iterations < 50
+    assert set(np.argsort(weights)[:2]) == {3, 17} and weights.max() == 1.0
+    assert coefficients == pytest.approx([2.0, 0.5], abs=0.01)
+
+    # 以最终权重新加权最小二乘，系数不再变化
+    root = np.sqrt(_robust_weights((observations - A @ coefficients) / sigma, method, 1.5, 3.0))
+    refit = np.linalg.lstsq(A * root[:, None], observations * root, rcond=None)[0]
+    assert refit == pytest.approx(coefficients, abs=1e-8)
+
+
+def test_clean_data_keeps_unit_weights():
+    rng = np.random.default_rng(5)
+    A = np.column_stack((np.ones(10), np.arange(10.0)))
+    exact = A @ [1.0, 2.0]
+    coefficients, weights, iterations, sigma = _robust_lstsq(A, exact, "huber")
+    assert iterations == 0 and sigma < 1e-12 and np.all(weights == 1.0)
+    assert coefficients == pytest.approx([1.0, 2.0])
+
+    _, weights, _, _ = _robust_lstsq(A, exact + rng.normal(0.0, 0.01, 10), "huber", k0=10.0)
+    assert np.all(weights == 1.0)
+
+
+def test_robust_fit_flags_the_bad_benchmark():
+    points = _known_points()
+    converter = GPSAltitudeConverter()
+    plain = converter.linear_basis_fitting(points, points[:1], {"model_type": "linear"})
+    robust = converter.linear_basis_fitting(points, points[:1], {"model_type": "linear", "robust": "huber"})
+    assert "robust" not in plain
+    assert "P5" in [entry["name"] for entry in robust["robust"]["downweighted"]]
+    assert robust["robust"]["k1"] is None and len(robust["robust"]["weights"]) == len(points)
+    assert robust["unit_weight_error"] < plain["unit_weight_error"]
+
+    rejected = converter.surface_basis_fitting(points, points[:1], {"model_type": "plane", "robust": "igg3"})
+    assert [entry for entry in rejected["robust"]["downweighted"] if entry["rejected"]] == [
+        {"name": "P5", "residual": pytest.approx(1.0, abs=0.05), "weight": 0.0, "rejected": True}
+    ]
+    assert "不支持的抗差方法" in converter.surface_basis_fitting(points, points[:1], {"robust": "bisquare"})["error"]
+
+
+def test_rejected_points_do_not_count_as_redundant_observations():
+    points = _known_points()
+    result = GPSAltitudeConverter().surface_basis_fitting(
+        points, points[:3], {"model_type": "plane", "robust": "igg3"}
+    )
+    weights = np.array(result["robust"]["weights"])
+    residuals = np.array(result["accuracy_assessment"]["residuals"])
+    assert weights[5] == 0.0
+
+    # 多余观测数为有效观测数减参数个数，而非已知点总数减参数个数
+    redundancy = np.count_nonzero(weights > 0) - 3
+    expected = np.sqrt(np.sum(weights * residuals**2) / redundancy)
+    assert result["unit_weight_error"] == pytest.approx(expected)
+    assert all(row["normal_height_std"] < result["unit_weight_error"] for row in result["results"])
@@ -0,0 +1,112 @@
+"""Chunked GPS levelling file pipeline: reader, API endpoint and CLI."""
+
+import io
+import sys
+
+import numpy as np
+import pytest
+
+from taomeasure.cli import gps_stream as cli
+from taomeasure.domain.gps_altitude import GPSAltitudeConverter
+from taomeasure.domain.gps_stream import iter_chunks, read_points, stream_normal_heights
+
+
+def _lines(count, seed, with_anomaly=False):
+    rng = np.random.default_rng(seed)
+    lats = 30.0 + rng.uniform(-0.2, 0.2, count)
+    lons = 114.0 + rng.uniform(-0.2, 0.2, count)
+    lines = ["# name lat lon H", ""]
+    for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+        anomaly = 12.0 + 0.8 * (lat - 30.0) - 0.5 * (lon - 114.0)
+        line = f"P{i} {lat:.8f} {lon:.8f} {50.0 + anomaly:.4f}"
+        lines.append(line + (f" {anomaly:.4f}" if with_anomaly else ""))
+        if i % 4 == 3:
+            lines.append("   ")
+    return [line + "\n" for line in lines]
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    converter = GPSAltitudeConverter()
+    known = read_points(_lines(12, 1, with_anomaly=True), with_anomaly=True)
+    model_id = converter.surface_basis_fitting(known, [], {"model_type": "plane"})["model_id"]
+    return converter, model_id
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 10, 11, 1000])
+def test_output_does_not_depend_on_chunk_boundaries(fitted, chunk_size):
+    converter, model_id = fitted
+    lines = _lines(10, 2)
+    whole = "".join(converter.stream(lines, model_id=model_id, chunk_size=len(lines)))
+    assert "".join(converter.stream(lines, model_id=model_id, chunk_size=chunk_size)) == whole
+
+    header, *rows = whole.splitlines()
+    assert header == "# name lat lon H anomaly normal_height normal_height_std"
+    assert len(rows) == 10
+    # 输入字段原样保留，附加异常、正常高与中误差
+    first = rows[0].split()
+    assert first[:4] == _lines(10, 2)[2].split() and len(first) == 7
+    assert float(first[3]) - float(first[4]) == pytest.approx(float(first[5]), abs=2e-4)
+
+
+def test_chunks_are_predicted_before_the_rest_of_the_file_is_read():
+    consumed, seen = [], []
+
+    def source():
+        for line in _lines(9, 3):
+            consumed.append(line)
+            yield line
+
+    def predict(points):
+        seen.append(len(consumed))
+        return [{"calculated_anomaly": 0.0, "normal_height": point["H"]} for point in points]
+
+    assert [len(points) for _, points in iter_chunks(_lines(9, 3), 4)] == [4, 4, 1]
+    # 每块预测时只读入到该块最后一点为止（2 行表头与空行，每 4 点后 1 个空行）
+    output = list(stream_normal_heights(source(), predict, chunk_size=4))
+    assert seen == [6, 11, len(consumed)]
+    assert len(output) == 4 and output[0] == "# name lat lon H anomaly normal_height\n"
+
+
+def test_format_errors_report_the_line_number(fitted):
+    converter, model_id = fitted
+    lines = _lines(5, 4)
+    lines[4] = "P9 30.1 abc 50.0\n"
+    chunks = converter.stream(lines, model_id=model_id, chunk_size=2)
+    next(chunks)
+    with pytest.raises(ValueError, match="第 5 行"):
+        list(chunks)
+    with pytest.raises(ValueError, match="字段不足"):
+        read_points(["P1 30.0 114.0 50.0\n"], with_anomaly=True)
+
+
+def test_endpoint_fits_from_the_known_file_and_streams(fitted):
+    from taomeasure import create_app
+
+    converter, model_id = fitted
+    unknown = "".join(_lines(10, 2)).encode()
+    response = create_app().test_client().post(
+        "/api/gps-altitude/stream",
+        data={
+            "unknown_file": (io.BytesIO(unknown), "unknown.txt"),
+            "known_file": (io.BytesIO("".join(_lines(12, 1, with_anomaly=True)).encode()), "known.txt"),
+            "model": "surface_basis",
+            "model_params": '{"model_type": "plane"}',
+            "chunk_size": "3",
+        },
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200 and response.headers["X-Model-Id"]
+    assert response.get_data(as_text=True) == "".join(converter.stream(_lines(10, 2), model_id=model_id))
+
+
+def test_cli_streams_to_the_output_file(fitted, tmp_path, monkeypatch):
+    converter, model_id = fitted
+    (tmp_path / "known.txt").write_text("".join(_lines(12, 1, with_anomaly=True)), encoding="utf-8")
+    (tmp_path / "unknown.txt").write_text("".join(_lines(10, 2)), encoding="utf-8")
+    argv = ["gps_stream", str(tmp_path / "unknown.txt"), "-k", str(tmp_path / "known.txt"),
+            "-m", "surface_basis", "-t", "plane", "--chunk-size", "4", "-o", str(tmp_path / "out.txt")]
+    monkeypatch.setattr(sys, "argv", argv)
+    cli.main()
+    expected = "".join(converter.stream(_lines(10, 2), model_id=model_id))
+    assert (tmp_path / "out.txt").read_text(encoding="utf-8") == expected
@@ -0,0 +1,17 @@
+"""Local interpolation neighbourhood solves."""
+
+import numpy as np
+
+from taomeasure.domain.local_interpolation import _solve
+
+
+def test_singular_system_does_not_degrade_its_batch():
+    rng = np.random.default_rng(6)
+    matrix = rng.normal(size=(5, 4, 4)) + 4 * np.eye(4)
+    rhs = rng.normal(size=(5, 4))
+    matrix[2] = np.outer(np.arange(1.0, 5.0), np.ones(4))
+    solution = _solve(matrix, rhs)
+
+    for index in (0, 1, 3, 4):
+        assert np.array_equal(solution[index], np.linalg.solve(matrix[index], rhs[index]))
+    assert np.allclose(solution[2], np.linalg.lstsq(matrix[2], rhs[2], rcond=None)[0])
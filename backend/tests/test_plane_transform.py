@@ -0,0 +1,80 @@
+"""Affine and polynomial plane transformations, and their use in the process endpoint."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.plane_transform import PlaneTransformation
+
+
+def _grid(count=40, seed=4):
+    rng = np.random.default_rng(seed)
+    return np.column_stack((3_300_000.0 + rng.uniform(0.0, 5000.0, count), 500_000.0 + rng.uniform(-3000.0, 3000.0, count)))
+
+
+def _affine(xy):
+    x, y = xy[:, 0], xy[:, 1]
+    return np.column_stack((120.5 + 1.00002 * x - 3.1e-5 * y, -86.2 + 2.9e-5 * x + 0.99997 * y))
+
+
+def _quadratic(xy):
+    u = (xy[:, 0] - 3_302_500.0) / 1000.0
+    v = (xy[:, 1] - 500_000.0) / 1000.0
+    return _affine(xy) + np.column_stack((0.012 * u**2 - 0.004 * u * v, 0.008 * v**2 + 0.003 * u * v))
+
+
+@pytest.mark.parametrize("model,function", [("affine", _affine), ("polynomial2", _quadratic), ("polynomial3", _quadratic)])
+def test_fit_recovers_exact_models(model, function):
+    source = _grid()
+    transformation = PlaneTransformation.fit(source, function(source), model)
+    check = _grid(10, seed=8)
+    assert np.abs(transformation.apply(check) - function(check)).max() < 1e-6
+
+    rebuilt = PlaneTransformation.from_dict(transformation.to_dict())
+    assert np.allclose(rebuilt.apply(check), transformation.apply(check), rtol=0, atol=1e-9)
+
+
+def test_affine_cannot_follow_quadratic_distortion():
+    source = _grid()
+    _, rmse = PlaneTransformation.fit(source, _quadratic(source), "affine").residuals(source, _quadratic(source))
+    assert rmse["x"] > 1e-3
+
+
+@pytest.mark.parametrize(
+    "source,model,message",
+    [
+        (np.array([[0.0, 0.0], [1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]), "affine", "退化"),
+        (np.column_stack((np.arange(10.0), np.full(10, 5.0))), "polynomial2", "退化"),
+        (np.array([[0.0, 0.0], [1.0, 0.0]]), "affine", "至少需要 3"),
+        (np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]), "polynomial4", "未支持"),
+    ],
+)
+def test_fit_rejects_degenerate_input(source, model, message):
+    with pytest.raises(ValueError, match=message):
+        PlaneTransformation.fit(source, source, model)
+
+
+def test_process_takes_target_xy_from_the_plane_model():
+    from taomeasure import create_app
+
+    source = _grid(20)
+    target = _quadratic(source)
+    points = _grid(5, seed=12)
+    response = create_app().test_client().post(
+        "/api/coordinate/universal/process",
+        json={
+            "source_system": {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114}},
+            "target_system": {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114}},
+            "common_points": [
+                {"name": f"C{i}", "source": {"x": s[0], "y": s[1]}, "target": {"x": t[0], "y": t[1]}}
+                for i, (s, t) in enumerate(zip(source.tolist(), target.tolist()))
+            ],
+            "points": [{"name": f"P{i}", "x": p[0], "y": p[1]} for i, p in enumerate(points.tolist())],
+            "parameters": {"plane": {"model": "polynomial2"}},
+            "options": {"auto_parameters": True},
+        },
+    )
+    data = response.get_json()["data"]
+    assert data["plane_parameters"]["source"] == "computed"
+    converted = np.array([[entry["target"]["x"], entry["target"]["y"]] for entry in data["results"]])
+    assert np.abs(converted - _quadratic(points)).max() < 1e-6
+    assert any("polynomial2" in line for line in data["results"][0]["target"]["diagnostics"])
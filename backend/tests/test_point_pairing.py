@@ -0,0 +1,47 @@
+"""Nearest-neighbour point pairing."""
+
+import numpy as np
+
+from taomeasure.domain.point_pairing import match_nearest
+
+
+def _greedy_reference(source, target, tolerance):
+    gaps = np.linalg.norm(source[:, None, :] - target[None, :, :], axis=2)
+    candidates = sorted(
+        (gap, i, j) for (i, j), gap in np.ndenumerate(gaps) if gap <= tolerance and np.isfinite(gap)
+    )
+    used_source, used_target, pairs = set(), set(), []
+    for gap, i, j in candidates:
+        if i in used_source or j in used_target:
+            continue
+        used_source.add(i)
+        used_target.add(j)
+        pairs.append((i, j))
+    return sorted(pairs)
+
+
+def test_matches_brute_force_greedy_assignment():
+    rng = np.random.default_rng(9)
+    target = rng.uniform(0.0, 100.0, (400, 2))
+    # 成簇的源点竞争同一批目标点，迫使部分源点扩大 k 重新检索
+    source = np.concatenate([target[:300] + rng.normal(0.0, 0.3, (300, 2)), np.full((60, 2), 50.0)])
+    source[5] = np.nan
+    pairs = match_nearest(source, target, tolerance=5.0, k=2)
+    assert sorted((i, j) for i, j, _ in pairs) == _greedy_reference(source, target, 5.0)
+    assert len({j for _, j, _ in pairs}) == len(pairs)
+
+
+def test_saturated_source_is_decided_in_global_distance_order():
+    source = np.array([[0.0, 0.0], [1.0, 0.0], [20.0, 0.0]])
+    target = np.array([[0.0, 0.0], [10.0, 0.0]])
+    pairs = match_nearest(source, target, tolerance=15.0, k=1)
+    assert sorted((i, j) for i, j, _ in pairs) == [(0, 0), (1, 1)]
+
+
+def test_default_k_keeps_greedy_order_behind_a_dense_cluster():
+    cluster = np.column_stack([np.arange(8) * 1e-3, np.zeros(8)])
+    source = np.concatenate([cluster, [[0.5, 0.0], [20.0, 0.0]]])
+    target = np.concatenate([cluster, [[10.0, 0.0]]])
+    pairs = match_nearest(source, target, tolerance=15.0)
+    assert sorted((i, j) for i, j, _ in pairs) == _greedy_reference(source, target, 15.0)
+    assert (8, 8) in {(i, j) for i, j, _ in pairs}
@@ -0,0 +1,78 @@
+"""Central meridian × projection height search for local engineering projections."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.universal_coordinate import PointRecord, ProjectionParams, UniversalCoordinateService
+
+SYSTEM = {"ellipsoid": {"name": "CGCS2000"}, "projection": {"zone_width": 3}}
+
+
+@pytest.fixture(scope="module")
+def service():
+    return UniversalCoordinateService()
+
+
+def _project(count=60, seed=6):
+    rng = np.random.default_rng(seed)
+    lat = 25.0 + rng.uniform(-0.15, 0.15, count)
+    lon = 101.37 + rng.uniform(-0.2, 0.2, count)
+    height = 1980.0 + rng.uniform(-40.0, 40.0, count)
+    return [PointRecord(name=f"P{i}", B=b, L=l, H=h) for i, (b, l, h) in enumerate(zip(lat, lon, height))]
+
+
+def _distortion(service, points, meridian, height, system):
+    lat = np.array([p.B for p in points])
+    lon = np.array([p.L for p in points])
+    H = np.array([p.H for p in points])
+    scale, _ = service._gauss_point_factors(lat, lon, meridian, ProjectionParams(central_meridian=meridian), system.ellipsoid)
+    lift = service._projection_scale(ProjectionParams(projection_height=height), system.ellipsoid)
+    e2 = system.ellipsoid.first_eccentricity_squared
+    radius = system.ellipsoid.semi_major_axis * np.sqrt(1 - e2) / (1 - e2 * np.sin(np.radians(lat)) ** 2)
+    return lift * scale * radius / (radius + H) - 1.0
+
+
+def test_optimiser_meets_tolerance_and_beats_every_candidate(service):
+    points = _project()
+    result = service.optimise_local_projection(points, SYSTEM, meridian_step=0.05, height_step=50.0)
+    assert result["max_distortion_ppm"] < 25.0
+    assert result["within_tolerance_ratio"] == 1.0
+    assert 101.1 <= result["central_meridian"] <= 101.6
+    assert 1700.0 <= result["projection_height"] <= 2100.0
+
+    system = service.build_system(SYSTEM, "source")
+    best = _distortion(service, points, result["central_meridian"], result["projection_height"], system)
+    assert np.abs(best).max() * 1e6 == pytest.approx(result["max_distortion_ppm"], rel=1e-9)
+    assert result["distortion_map"]["distortion_ppm"] == pytest.approx((best * 1e6).tolist())
+
+    # 逐个候选暴力计算，最优解的最大变形不大于任何候选
+    for meridian in np.arange(101.15, 101.6, 0.05):
+        for height in np.arange(0.0, 2050.0, 50.0):
+            worst = np.abs(_distortion(service, points, meridian, height, system)).max() * 1e6
+            assert result["max_distortion_ppm"] <= worst + 1e-9
+
+
+def test_bounds_with_mean_elevation(service):
+    result = service.optimise_local_projection(
+        None,
+        SYSTEM,
+        bounds={"min_lat": 24.9, "max_lat": 25.1, "min_lon": 101.2, "max_lon": 101.5},
+        mean_elevation=1500.0,
+        height_step=25.0,
+        grid_size=11,
+    )
+    assert len(result["distortion_map"]["lat"]) == 121
+    assert result["max_distortion_ppm"] < 25.0
+    assert result["projection"]["central_meridian"] == result["central_meridian"]
+
+
+def test_endpoint_rejects_requests_without_area():
+    from taomeasure import create_app
+
+    client = create_app().test_client()
+    assert client.post("/api/coordinate/universal/projection-optimise", json={}).status_code == 400
+    response = client.post(
+        "/api/coordinate/universal/projection-optimise",
+        json={"points": [{"name": "A", "lat": 25.0, "lon": 101.3, "H": 1900}], "meridian_step": -1},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,76 @@
+"""Bursa-Wolf seven-parameter and regional piecewise transformations."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.regional_transform import RegionalTransformation, apply_bursa_wolf
+from taomeasure.domain.universal_coordinate import PointRecord, UniversalCoordinateService
+
+# dx, dy, dz (m), rx, ry, rz (rad), m
+KNOWN = np.array([-85.3, 112.6, 47.9, 2.1e-5, -1.4e-5, 3.3e-5, 4.2e-6])
+
+
+def _control_points(count=60, seed=1):
+    rng = np.random.default_rng(seed)
+    lat = np.radians(30.0 + rng.uniform(-1.0, 1.0, count))
+    lon = np.radians(114.0 + rng.uniform(-1.0, 1.0, count))
+    radius = 6378137.0 + rng.uniform(0.0, 500.0, count)
+    return np.column_stack((radius * np.cos(lat) * np.cos(lon), radius * np.cos(lat) * np.sin(lon), radius * np.sin(lat)))
+
+
+def test_vectorised_bursa_wolf_matches_scalar_service():
+    source = _control_points(5)
+    service = UniversalCoordinateService()
+    params = dict(zip(("dx", "dy", "dz", "rx", "ry", "rz", "scale"), KNOWN.tolist()))
+    expected = [service.apply_seven_parameters(PointRecord(X=x, Y=y, Z=z), params) for x, y, z in source.tolist()]
+    assert np.allclose(apply_bursa_wolf(source, KNOWN), expected, rtol=0, atol=1e-9)
+
+
+def test_seven_parameter_solution_recovers_known_set():
+    source = _control_points()
+    target = apply_bursa_wolf(source, KNOWN)
+    service = UniversalCoordinateService()
+    pairs = [(PointRecord(name=str(i), X=s[0], Y=s[1], Z=s[2]), PointRecord(X=t[0], Y=t[1], Z=t[2]))
+             for i, (s, t) in enumerate(zip(source.tolist(), target.tolist()))]
+    solved = service.solve_seven_parameters(pairs)
+    recovered = [solved[key] for key in ("dx", "dy", "dz", "rx", "ry", "rz", "scale")]
+    # 线性化模型忽略尺度与旋转的乘积项，残余在 1e-4 m 量级
+    assert recovered[:3] == pytest.approx(KNOWN[:3], abs=1e-2)
+    assert recovered[3:] == pytest.approx(KNOWN[3:], abs=1e-9)
+
+
+@pytest.mark.parametrize("leaf_size", [None, 1000])
+def test_regional_transformation_reproduces_known_set(leaf_size):
+    source = _control_points()
+    target = apply_bursa_wolf(source, KNOWN)
+    regional = RegionalTransformation.fit(source, target, "seven", leaf_size=leaf_size)
+    assert np.abs(regional.apply(source) - target).max() < 1e-3
+    if leaf_size:
+        assert regional.parameters[0] == pytest.approx(KNOWN, rel=1e-3, abs=1e-9)
+
+
+@pytest.mark.parametrize("blend", [1, 3])
+def test_process_endpoint_applies_regional_parameters_to_all_points(blend):
+    from taomeasure import create_app
+
+    source = _control_points()
+    target = apply_bursa_wolf(source, KNOWN) + np.random.default_rng(5).normal(0.0, 0.01, source.shape)
+    points = _control_points(8, seed=9)
+    common = [{"name": f"C{i}", "source": dict(zip("XYZ", s)), "target": dict(zip("XYZ", t))}
+              for i, (s, t) in enumerate(zip(source.tolist(), target.tolist()))]
+    system = {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114}}
+    response = create_app().test_client().post(
+        "/api/coordinate/universal/process",
+        json={
+            "source_system": system,
+            "target_system": system,
+            "common_points": common,
+            "points": [{"name": f"P{i}", **dict(zip("XYZ", p))} for i, p in enumerate(points.tolist())],
+            "parameters": {"regional": {"model": "seven", "leaf_size": 12, "blend": blend}},
+        },
+    )
+    results = response.get_json()["data"]["results"]
+
+    regional = RegionalTransformation.fit(source, target, "seven", leaf_size=12, blend=blend)
+    converted = np.array([[entry["target"][axis] for axis in "XYZ"] for entry in results])
+    assert np.abs(converted - regional.apply(points)).max() < 1e-6
@@ -0,0 +1,70 @@
+"""Batch conversions give the same output whether kernels run in-process or in the shard pool."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.universal_coordinate import UniversalCoordinateService, parse_column, parse_angle
+
+SYSTEM = {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114}}
+
+
+@pytest.fixture(scope="module")
+def services():
+    sharded = UniversalCoordinateService(shard_workers=2, shard_threshold=1)
+    yield UniversalCoordinateService(shard_workers=1), sharded
+    sharded._sharding.shutdown()
+
+
+def _rows(count=257, seed=3):
+    rng = np.random.default_rng(seed)
+    lat = 30.0 + rng.uniform(-1.0, 1.0, count)
+    lon = 114.0 + rng.uniform(-1.4, 1.4, count)
+    rows = [{"name": f"P{i}", "lat": a, "lon": b, "height": 50.0, "sigma": 0.01} for i, (a, b) in enumerate(zip(lat, lon))]
+    rows[5]["lat"] = None
+    rows[9]["lon"] = "114°30′15.25″"
+    return rows
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_sharded_batches_match_in_process(services, columnar):
+    local, sharded = services
+    rows = _rows()
+    options = {"columnar": columnar, "decimals": 4 if columnar else None}
+
+    def both(method, *args):
+        return [getattr(service, method)(*args, **options) for service in (local, sharded)]
+
+    first, second = both("batch_geodetic_to_cartesian", rows, "CGCS2000")
+    assert second == first
+    assert second["count"] == len(rows) - 1
+
+    xyz_rows = [{"name": row["name"], "X": row["x"], "Y": row["y"], "Z": row["z"], "sigma": 0.01}
+                for row in local.batch_geodetic_to_cartesian(rows, "CGCS2000")["results"] if "error" not in row]
+    first, second = both("batch_cartesian_to_geodetic", xyz_rows, "CGCS2000")
+    assert second == first
+
+    forward, forward_sharded = both("batch_gauss_projection", rows, SYSTEM, "forward")
+    assert forward_sharded == forward
+
+    grid_rows = [{"name": row["name"], "x": row["x"], "y": row["y"]}
+                 for row in local.batch_gauss_projection(rows, SYSTEM, "forward")["results"] if "error" not in row]
+    first, second = both("batch_gauss_projection", grid_rows, SYSTEM, "inverse")
+    assert second == first
+
+
+def test_columnar_results_match_transposed_records(services):
+    local, _ = services
+    records = local.batch_gauss_projection(_rows(), SYSTEM, "forward")["results"]
+    columns = local.batch_gauss_projection(_rows(), SYSTEM, "forward", columnar=True)["results"]
+    assert len(columns["name"]) == len(records)
+    assert columns["error"][5] == records[5]["error"] and columns["x"][5] is None
+    assert columns["x"][0] == records[0]["x"] and columns["sigma_x"][0] == records[0]["sigma_x"]
+    assert columns["covariance"][0] == records[0]["covariance"]
+
+
+def test_parse_column_falls_back_for_mixed_input():
+    rows = [{"a": 1}, {"b": "2.5"}, {"a": None, "b": "1,000"}, {"a": "30°30′"}, {}]
+    assert parse_column(rows[:2], ("a", "b")).tolist() == [1.0, 2.5]
+    column = parse_column(rows, ("a", "b"), parse_angle)
+    assert column[:2].tolist() == [1.0, 2.5] and column[3] == pytest.approx(30.5) and np.isnan(column[4])
+    assert parse_column(rows[2:3], ("a", "b")).tolist() == [1000.0]
@@ -0,0 +1,59 @@
+"""Canonicalised, id-addressable coordinate-system cache."""
+
+import dataclasses
+
+import pytest
+
+from taomeasure.domain.universal_coordinate import UniversalCoordinateService
+
+SYSTEM = {"name": "工程系", "ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114, "projection_height": 50}}
+
+
+def test_equal_payloads_share_one_frozen_config():
+    service = UniversalCoordinateService()
+    first = service.build_system(SYSTEM, "source")
+    reordered = {"projection": {"projection_height": 50, "central_meridian": 114}, "ellipsoid": {"name": "CGCS2000"}, "name": "工程系"}
+    assert service.build_system(reordered, "source") is first
+    assert service.build_system({**SYSTEM, "id": "ignored"}, "source") is first
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.name = "changed"
+
+    other = service.build_system({**SYSTEM, "projection": {"central_meridian": 117}}, "source")
+    assert other.system_id != first.system_id
+
+
+def test_systems_are_referenced_by_id():
+    service = UniversalCoordinateService()
+    system = service.build_system(SYSTEM, "source")
+    assert service.build_system(system.system_id, "target") is system
+    assert service.build_system({"id": system.system_id}, "target") is system
+    with pytest.raises(ValueError, match="未找到坐标系统"):
+        service.build_system("0000000000000000", "target")
+
+
+def test_least_recently_used_system_is_evicted():
+    service = UniversalCoordinateService(system_cache_size=2)
+    ids = [service.build_system({**SYSTEM, "projection": {"central_meridian": meridian}}, "source").system_id
+           for meridian in (111, 114)]
+    service.build_system(ids[0], "source")  # 访问后 111 成为最近使用
+    service.build_system({**SYSTEM, "projection": {"central_meridian": 117}}, "source")
+    assert service.build_system(ids[0], "source").projection.central_meridian == 111
+    with pytest.raises(ValueError):
+        service.build_system(ids[1], "source")
+
+
+def test_registered_id_is_accepted_by_batch_endpoints():
+    from taomeasure import create_app
+
+    client = create_app().test_client()
+    registered = client.post("/api/coordinate/universal/systems", json={"system": SYSTEM}).get_json()["data"]
+    by_id = client.post(
+        "/api/coordinate/batch/gauss-forward",
+        json={"system": registered["id"], "points": [{"lat": 30.5, "lon": 114.3}]},
+    ).get_json()["data"]
+    inline = client.post(
+        "/api/coordinate/batch/gauss-forward",
+        json={"system": SYSTEM, "points": [{"lat": 30.5, "lon": 114.3}]},
+    ).get_json()["data"]
+    assert by_id["system"]["id"] == registered["id"]
+    assert by_id["results"] == inline["results"]
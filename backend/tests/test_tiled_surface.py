@@ -0,0 +1,46 @@
+"""Tiled height-anomaly surfaces."""
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.tiled_surface import TiledSurface, _design, _recentered
+
+
+def _evaluate(surface, lats, lons):
+    center = surface["center"]
+    return _design(lats - center[0], lons - center[1]) @ np.asarray(surface["coefficients"])
+
+
+def test_recentered_background_is_the_same_surface():
+    rng = np.random.default_rng(3)
+    background = {"center": [30.1, 114.2], "coefficients": rng.normal(size=6).tolist()}
+    shifted = {"center": [30.4, 113.9], "coefficients": _recentered(background, (30.4, 113.9)).tolist()}
+    lats = 30.0 + rng.uniform(0, 0.6, 50)
+    lons = 113.8 + rng.uniform(0, 0.6, 50)
+    assert np.allclose(_evaluate(shifted, lats, lons), _evaluate(background, lats, lons), atol=1e-12)
+
+
+def test_failed_tile_blends_into_background():
+    rng = np.random.default_rng(5)
+    lats = np.append(rng.uniform(0.0, 4.0, 6000), 0.0)
+    lons = np.append(rng.uniform(0.0, 4.0, 6000), 0.0)
+    # 挖空分块 (2, 1) 的整个加宽窗口，只留两个点，不足以拟合平面
+    hole = (lats >= 1.75) & (lats < 3.25) & (lons >= 0.75) & (lons < 2.25)
+    keep = ~hole | (np.cumsum(hole) <= 2)
+    lats, lons = lats[keep], lons[keep]
+    anomalies = 10.0 + 0.3 * lats + 0.2 * np.sin(lons * 2.0)
+    surface = TiledSurface.fit(lats, lons, anomalies, model_type="plane", tile_size=1.0, overlap=0.25)
+
+    assert [2, 1] in surface.describe()["failed_tiles"]
+    assert surface.tiles[(2, 1)]["fallback"] is True
+
+    # 穿过空洞的剖面连续，空洞中心取全区曲面
+    line = np.linspace(1.5, 3.5, 2001)
+    profile = surface.predict(line, np.full_like(line, 1.5))
+    assert np.max(np.abs(np.diff(profile))) < 1e-3
+    assert surface.predict([2.5], [1.5])[0] == pytest.approx(
+        _evaluate(surface.background, np.array([2.5]), np.array([1.5]))[0]
+    )
+
+    restored = TiledSurface.from_dict(surface.to_dict())
+    assert restored.describe()["failed_tiles"] == surface.describe()["failed_tiles"]
@@ -0,0 +1,93 @@
+"""Fourteen-parameter (Bursa-Wolf + rates) transformation with epoch and velocity propagation."""
+
+import math
+
+import numpy as np
+import pytest
+
+from taomeasure.domain.regional_transform import SEVEN_PARAMETER_KEYS, apply_bursa_wolf
+from taomeasure.domain.universal_coordinate import UniversalCoordinateService
+
+STATIC = dict(zip(SEVEN_PARAMETER_KEYS, [0.012, -0.008, 0.021, 1.2e-9, -0.8e-9, 2.1e-9, 1.4e-9]))
+RATES = dict(zip(SEVEN_PARAMETER_KEYS, [0.0011, 0.0005, -0.0019, 0.4e-9, 0.2e-9, -0.3e-9, 0.1e-9]))
+PARAMS = {**STATIC, "rates": RATES, "reference_epoch": 2010.0}
+XYZ = np.array([[-2266848.5, 5010223.6, 3169345.2], [-2148017.0, 4426721.8, 4045132.9]])
+
+
+@pytest.fixture(scope="module")
+def service():
+    return UniversalCoordinateService()
+
+
+def _parameters_at(epoch):
+    return np.array([STATIC[key] + RATES[key] * (epoch - 2010.0) for key in SEVEN_PARAMETER_KEYS])
+
+
+def test_parameters_follow_their_rates_per_point_epoch(service):
+    epochs = np.array([2015.5, 2003.25])
+    transformed = service.apply_time_dependent_parameters(XYZ, PARAMS, epochs=epochs)
+    for row, epoch, expected in zip(XYZ, epochs, transformed):
+        assert expected == pytest.approx(apply_bursa_wolf(row[None], _parameters_at(epoch))[0], abs=1e-9)
+
+    # 无观测历元时取参考历元的参数
+    at_reference = service.apply_time_dependent_parameters(XYZ, PARAMS)
+    assert np.allclose(at_reference, apply_bursa_wolf(XYZ, _parameters_at(2010.0)), rtol=0, atol=1e-9)
+
+
+def test_velocities_move_points_to_the_target_epoch(service):
+    velocity = np.array([[-0.031, -0.009, -0.012], [np.nan, np.nan, np.nan]])
+    transformed, moved, rows = service.apply_time_dependent_parameters(
+        XYZ, PARAMS, epochs=[2005.0, 2005.0], velocities=velocity, target_epoch=2020.0, return_parameters=True
+    )
+    assert moved[0] == pytest.approx(XYZ[0] + 15.0 * velocity[0], abs=1e-9)
+    assert moved[1] == pytest.approx(XYZ[1], abs=0)  # 缺速度的点不外推
+    assert np.allclose(rows, _parameters_at(2020.0), rtol=0, atol=1e-15)
+    assert np.allclose(transformed, apply_bursa_wolf(moved, _parameters_at(2020.0)), rtol=0, atol=1e-9)
+
+
+def test_rates_require_a_reference_epoch(service):
+    with pytest.raises(ValueError, match="reference_epoch"):
+        service.apply_time_dependent_parameters(XYZ, {**STATIC, "rates": RATES}, epochs=[2015.0, 2015.0])
+
+
+def test_batch_endpoint_converts_rate_units(service):
+    from taomeasure import create_app
+
+    to_arcsec = 180 / math.pi * 3600
+    body = {
+        "points": [{"name": f"P{i}", "X": x, "Y": y, "Z": z, "epoch": 2016.0} for i, (x, y, z) in enumerate(XYZ.tolist())],
+        "parameters": {
+            **{key: STATIC[key] * (to_arcsec if key in ("rx", "ry", "rz") else 1) for key in ("dx", "dy", "dz", "rx", "ry", "rz")},
+            "scale_ppm": STATIC["scale"] * 1e6,
+            "rates": {
+                **{key: RATES[key] * (to_arcsec if key in ("rx", "ry", "rz") else 1) for key in ("dx", "dy", "dz", "rx", "ry", "rz")},
+                "scale_ppm": RATES["scale"] * 1e6,
+            },
+            "reference_epoch": 2010.0,
+        },
+        "target_epoch": 2016.0,
+    }
+    data = create_app().test_client().post("/api/coordinate/batch/time-dependent", json=body).get_json()["data"]
+    converted = np.array([[entry[axis] for axis in "XYZ"] for entry in data["results"]])
+    assert np.allclose(converted, apply_bursa_wolf(XYZ, _parameters_at(2016.0)), rtol=0, atol=1e-6)
+    assert [entry["epoch"] for entry in data["results"]] == [2016.0, 2016.0]
+
+
+def test_process_endpoint_uses_the_fourteen_parameter_path(service):
+    from taomeasure import create_app
+
+    system = {"ellipsoid": {"name": "CGCS2000"}, "projection": {"central_meridian": 114}}
+    manual = {"mode": "manual", **{key: STATIC[key] for key in ("dx", "dy", "dz", "rx", "ry", "rz", "scale")},
+              "rotation_unit": "rad", "rates": dict(RATES), "reference_epoch": 2010.0}
+    body = {
+        "source_system": system,
+        "target_system": system,
+        "points": [{"name": "P0", "X": XYZ[0, 0], "Y": XYZ[0, 1], "Z": XYZ[0, 2], "epoch": 2004.0,
+                    "VX": -0.03, "VY": -0.01, "VZ": -0.01}],
+        "parameters": {"seven": manual},
+        "options": {"target_epoch": 2022.0, "auto_parameters": False},
+    }
+    (entry,) = create_app().test_client().post("/api/coordinate/universal/process", json=body).get_json()["data"]["results"]
+    moved = XYZ[0] + 18.0 * np.array([-0.03, -0.01, -0.01])
+    assert [entry["target"][axis] for axis in "XYZ"] == pytest.approx(apply_bursa_wolf(moved[None], _parameters_at(2022.0))[0], abs=1e-6)
+    assert entry["target"]["epoch"] == 2022.0